@@ -0,0 +1 @@
+"""Reproducible pipeline benchmarks on deterministic synthetic tick data."""
@@ -0,0 +1,192 @@
+"""Time each pipeline stage on synthetic tick data and record its peak memory.
+
+    python -m benchmarks.run_benchmarks --rows 1M 10M 100M
+    python -m benchmarks.run_benchmarks --rows 1M --compare benchmarks/results/<commit>.json
+
+Results are written to benchmarks/results/<commit>.json (one file per commit, runs of
+other sizes merged in), so any two commits can be compared stage by stage.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ticker_analysis.config import config
+from ticker_analysis.instrumentation import count_rows, reset_peak_rss, rss_bytes
+
+from .synthetic import generate_tick_csvs, parse_rows
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+DATA_ROOT = os.path.expanduser('~/.cache/ticker_analysis/benchmarks')
+
+def _stage_functions(data_dir, engine, cache_dir):
+    """(name, function of the results so far) for each benchmarked stage, in order"""
+    from ticker_analysis.bars import build_bars
+    from ticker_analysis.loading import read_and_combine_csv_files_gpu
+    from ticker_analysis.returns import analyze_returns_statistics, calculate_daily_returns
+    from ticker_analysis.scaling import scale_data, scale_log_data
+    from ticker_analysis.splits import adjust_for_splits
+
+    # Imported up front so first-use import time is not charged to a stage
+    import scipy.stats  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+
+    return [
+        ('load', lambda r: read_and_combine_csv_files_gpu(data_dir, engine=engine,
+                                                          cache_dir=cache_dir)),
+        ('adjust', lambda r: adjust_for_splits(r['load'])),
+        ('returns', lambda r: calculate_daily_returns(r['adjust'])),
+        ('stats', lambda r: analyze_returns_statistics(r['returns'])),
+        ('scale', lambda r: scale_data(r['adjust'])),
+        ('log', lambda r: scale_log_data(r['adjust'])),
+        ('volatility', lambda r: build_bars(r['adjust'], freq=config.VOLATILITY_RESAMPLE_FREQ)),
+    ]
+
+def benchmark_rows(n_rows, data_root=DATA_ROOT, engine='cpu', cache_dir=None, repeat=1,
+                   seed=0, verbose=False):
+    """Generate (or reuse) n_rows of synthetic ticks and time every stage on them
+
+    Each stage is run `repeat` times on the same inputs; the fastest wall time is
+    kept, with the highest peak RSS seen.
+    """
+    from ticker_analysis.features import feature_cache
+
+    data_dir = os.path.join(data_root, f"{n_rows}_rows_seed{seed}")
+    started = time.perf_counter()
+    generate_tick_csvs(data_dir, n_rows, seed=seed)
+    print(f"{n_rows:,} rows ready in {data_dir} ({time.perf_counter() - started:.1f}s)")
+
+    results, records = {}, []
+    for stage, run in _stage_functions(data_dir, engine, cache_dir):
+        best = None
+        for _ in range(repeat):
+            inputs = dict(results)
+            feature_cache.clear()
+            gc.collect()
+            rss_before = rss_bytes()
+            tracked = reset_peak_rss()
+            output = io.StringIO()
+            with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(output):
+                wall, cpu = time.perf_counter(), time.process_time()
+                value = run(inputs)
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = rss_bytes('VmHWM') if tracked else rss_bytes()
+            if best is None or wall < best['seconds']:
+                best = {'rows': n_rows, 'stage': stage, 'seconds': wall, 'cpu_seconds': cpu,
+                        'rows_per_sec': n_rows / wall if wall else None,
+                        'rows_out': count_rows(value), 'peak_rss_bytes': peak,
+                        'peak_rss_delta_bytes': peak - rss_before}
+            else:
+                best['peak_rss_bytes'] = max(best['peak_rss_bytes'], peak)
+                best['peak_rss_delta_bytes'] = max(best['peak_rss_delta_bytes'],
+                                                   peak - rss_before)
+        results[stage] = value
+        if stage == 'adjust':
+            # Like the pipeline, keep only the adjusted frame from here on
+            del results['load'], inputs, value
+        records.append(best)
+        print(f"  {stage:<11}{best['seconds']:>9.3f}s {best['rows_per_sec'] / 1e6:>9.2f}M rows/s "
+              f"peak {best['peak_rss_bytes'] / 2**20:>9.0f} MiB "
+              f"(+{best['peak_rss_delta_bytes'] / 2**20:.0f})")
+    return records
+
+def _git_commit():
+    """Short commit hash of the working tree (with '-dirty' when modified), or 'unknown'"""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=root, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+def _environment():
+    import numpy
+    import pandas
+    import pyarrow
+
+    return {
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'machine': platform.machine(), 'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__, 'pandas': pandas.__version__,
+        'pyarrow': pyarrow.__version__,
+    }
+
+def save_results(records, results_dir=RESULTS_DIR, commit=None):
+    """Merge records into the results file of the current commit and return its path"""
+    commit = commit or _git_commit()
+    path = Path(results_dir) / f"{commit}.json"
+    report = json.loads(path.read_text()) if path.exists() else {'runs': []}
+    sizes = {record['rows'] for record in records}
+    report['runs'] = [run for run in report['runs'] if run['rows'] not in sizes] + records
+    report.update(commit=commit, environment=_environment(),
+                  updated=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=1))
+    return path
+
+def compare_results(baseline_path, records, threshold=1.10):
+    """Print stage timings against a saved baseline; return the regressed (rows, stage)s"""
+    baseline = {(run['rows'], run['stage']): run
+                for run in json.loads(Path(baseline_path).read_text())['runs']}
+    regressions = []
+    print(f"\nComparison with {baseline_path} (regression above {threshold:.2f}x):")
+    print(f"{'rows':>14} {'stage':<11}{'base s':>9}{'now s':>9}{'ratio':>8}{'mem ratio':>11}")
+    for record in records:
+        base = baseline.get((record['rows'], record['stage']))
+        if base is None:
+            continue
+        ratio = record['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        mem_ratio = record['peak_rss_bytes'] / base['peak_rss_bytes']
+        flag = '  <-- slower' if ratio > threshold else ''
+        print(f"{record['rows']:>14,} {record['stage']:<11}{base['seconds']:>9.3f}"
+              f"{record['seconds']:>9.3f}{ratio:>8.2f}{mem_ratio:>11.2f}{flag}")
+        if ratio > threshold:
+            regressions.append((record['rows'], record['stage']))
+    return regressions
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run_benchmarks',
+        description='Time the pipeline stages on deterministic synthetic tick data.')
+    parser.add_argument('--rows', nargs='+', default=['1M'],
+                        help="dataset sizes, e.g. 1M 10M 100M 1B (default: %(default)s)")
+    parser.add_argument('--data-root', default=DATA_ROOT,
+                        help='where generated datasets are kept (default: %(default)s)')
+    parser.add_argument('--engine', default='cpu', choices=['auto', 'gpu', 'cpu'],
+                        help='ingestion engine (default: %(default)s)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='parsed file cache for the load stage (default: cold parse)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per stage (fastest kept)')
+    parser.add_argument('--seed', type=int, default=0, help='synthetic data seed')
+    parser.add_argument('--results-dir', default=RESULTS_DIR, help='where results are saved')
+    parser.add_argument('--compare', default=None, help='baseline results file to compare with')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help='slowdown ratio counted as a regression (default: %(default)s)')
+    parser.add_argument('--verbose', action='store_true', help="show the stages' own output")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    records = []
+    for rows in args.rows:
+        records += benchmark_rows(parse_rows(rows), args.data_root, args.engine, args.cache_dir,
+                                  args.repeat, args.seed, args.verbose)
+    print(f"\nResults saved to {save_results(records, args.results_dir)}")
+    if args.compare and compare_results(args.compare, records, args.threshold):
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""Deterministic synthetic tick CSVs in the exact Config.CSV_COLUMNS layout (optionally
+with an MBO order_id column).
+
+Rows are spread evenly over consecutive trading sessions (13:30-20:00 UTC on business
+days). Prices follow a split-adjusted log random walk that is multiplied back into
+each split era from the corporate actions registry, so raw price levels jump at the
+splits the way the real feed does. Actions, sides, sizes and flags are mixed. Every
+chunk is drawn from its own seeded generator, so the same (rows, seed, layout) always
+writes byte-identical files, whatever machine runs it.
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from ticker_analysis.config import config
+from ticker_analysis.corporate_actions import get_split_history
+from ticker_analysis.splits import split_adjustment_table
+
+SESSION_OPEN_NS = (13 * 3600 + 30 * 60) * 10**9
+SESSION_LENGTH_NS = int(6.5 * 3600) * 10**9
+
+# MBO actions and their frequencies ('R' book clears are rare)
+ACTIONS = np.array(['A', 'C', 'T', 'F', 'M', 'R'])
+ACTION_WEIGHTS = np.array([0.44, 0.38, 0.06, 0.06, 0.0595, 0.0005])
+FLAGS = np.array([0, 128, 130], dtype=np.uint8)
+
+MANIFEST_NAME = 'synthetic.json'
+
+def parse_rows(value):
+    """Row count from an int or a '1M' / '250K' / '1B' style string"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    text = str(value).strip().upper()
+    multiplier = {'K': 10**3, 'M': 10**6, 'B': 10**9}.get(text[-1:], 1)
+    return int(float(text.rstrip('KMB')) * multiplier)
+
+def _session_days(start, n_days):
+    """Midnight UTC (int64 ns) of n_days consecutive business days from start"""
+    import pandas as pd
+
+    return pd.bdate_range(start, periods=n_days, tz='UTC').as_unit('ns').asi8
+
+def _block_ranks(positions, groups, block=32):
+    """Positions and a (group, rank within group) key for each, for pairing events
+
+    groups: non-decreasing group number of every row, each group at most block rows.
+    """
+    blocks = groups[positions]
+    first = np.searchsorted(blocks, blocks, side='left')
+    return positions, blocks * block + (np.arange(len(positions)) - first)
+
+def _pairing_groups(index, day, era, block=32):
+    """Group number of every row: short blocks that never cross a session or split era"""
+    keys = (index // block, day, era)
+    change = np.zeros(len(index), dtype=bool)
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.cumsum(change)
+
+def _live_orders(positions, add_pos, remove_pos, groups):
+    """Index into the add/remove pairs of the order resting at each position
+
+    That is the pair of the latest add before it in the same group, or -1 when that
+    order has already been removed.
+    """
+    by_add = np.argsort(add_pos)
+    latest = np.searchsorted(add_pos[by_add], positions) - 1
+    pair = by_add[np.maximum(latest, 0)]
+    live = (latest >= 0) & (groups[add_pos[pair]] == groups[positions]) & \
+        (remove_pos[pair] > positions)
+    return np.where(live, pair, -1)
+
+def _chunk_columns(rng, first, n, n_rows, days, log_price, era_bounds, era_factors,
+                   ticker, sequence, order_ids=False):
+    """Columns of rows [first, first + n) of the whole dataset, their session day
+    numbers and the last log price"""
+    index = np.arange(first, first + n, dtype=np.int64)
+    n_days = len(days)
+    day = index * n_days // n_rows
+    # Rows of a session are evenly spaced with jitter, so timestamps strictly increase
+    day_first = -(-day * n_rows // n_days)
+    day_rows = -(-(day + 1) * n_rows // n_days) - day_first
+    offset = (index - day_first + rng.random(n)) / day_rows
+    ts_event = days[day] + SESSION_OPEN_NS + (offset * SESSION_LENGTH_NS).astype(np.int64)
+
+    # Split-adjusted log random walk with about 2% daily volatility
+    step = 0.02 / math.sqrt(max(n_rows / n_days, 1))
+    walk = log_price + np.cumsum(rng.normal(0.0, step, n))
+    era = np.searchsorted(era_bounds, ts_event, side='right')
+    era_factor = era_factors[era]
+    mid = np.exp(walk) * era_factor
+
+    action = ACTIONS[rng.choice(len(ACTIONS), size=n, p=ACTION_WEIGHTS)]
+    # Within each short block of events, cancels and fills take out the adds first in,
+    # first out. Pairs are ordered add first and unpaired events become modifies, so
+    # orders live only briefly and no level is left stale as the price walks away.
+    # Blocks never cross a session day or split, so no order outlives either.
+    groups = _pairing_groups(index, day, era)
+    adds = _block_ranks(np.flatnonzero(action == 'A'), groups)
+    removes = _block_ranks(np.flatnonzero((action == 'C') | (action == 'F')), groups)
+    _, a, r = np.intersect1d(adds[1], removes[1], assume_unique=True, return_indices=True)
+    add_pos = np.minimum(adds[0][a], removes[0][r])
+    remove_pos = np.maximum(adds[0][a], removes[0][r])
+    remove_action = action[removes[0][r]]
+    action[np.setdiff1d(np.concatenate([adds[0], removes[0]]),
+                        np.concatenate([add_pos, remove_pos]))] = 'M'
+    action[add_pos] = 'A'
+    action[remove_pos] = remove_action
+
+    side = np.where(rng.random(n) < 0.5, 'B', 'A')
+    side = np.where((action == 'T') & (rng.random(n) < 0.2), 'N', side)
+    side = np.where(action == 'R', 'N', side)
+    if order_ids:
+        # Modifies move the order resting at that point; the others are new orders
+        modifies = np.flatnonzero(action == 'M')
+        moved = _live_orders(modifies, add_pos, remove_pos, groups)
+        modifies, moved = modifies[moved >= 0], add_pos[moved[moved >= 0]]
+        side[modifies] = side[moved]
+    # Resting orders sit a few ticks away from the mid on their own side
+    ticks = rng.geometric(0.3, n) * np.where(side == 'B', -1, 1)
+    price = np.round(mid + np.where(np.isin(action, ['A', 'M']), ticks, 0) * 0.01, 2)
+    size = np.minimum(rng.geometric(0.01, n) / era_factor, 2**32 - 1).astype(np.uint32) + 1
+    side[remove_pos] = side[add_pos]
+    price[remove_pos] = price[add_pos]
+    size[remove_pos] = size[add_pos]
+
+    ts_in_delta = rng.integers(1_000, 40_000, n, dtype=np.int32)
+    ts_recv = ts_event + ts_in_delta + rng.integers(0, 5_000, n)
+    columns = {
+        'ts_recv': ts_recv, 'ts_event': ts_event,
+        'rtype': np.full(n, 160, dtype=np.uint8),
+        'publisher_id': np.full(n, 2, dtype=np.uint16),
+        'instrument_id': np.full(n, 11667, dtype=np.uint32),
+        'action': action, 'side': side,
+        'depth': np.zeros(n, dtype=np.uint8),
+        'price': price, 'size': size,
+        'flags': FLAGS[rng.integers(0, len(FLAGS), n)],
+        'ts_in_delta': ts_in_delta,
+        'sequence': (sequence + np.arange(n)).astype(np.uint32),
+        'symbol': np.full(n, ticker),
+    }
+    if order_ids:
+        # Row numbers in the whole dataset, shared by every event of one order
+        order_id = index.astype(np.uint64)
+        order_id[remove_pos] = order_id[add_pos]
+        order_id[modifies] = order_id[moved]
+        size[modifies] = size[moved]
+        columns['order_id'] = order_id
+    return columns, day, float(walk[-1])
+
+def _digits(values, width):
+    """ASCII digits of non-negative ints as a (n, width) uint8 matrix, zero-padded"""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (values[:, None] // powers % 10 + ord('0')).astype(np.uint8)
+
+def _session_dates(days):
+    """'YYYY-MM-DDT' prefix of each session day as an (n_days, 11) uint8 matrix"""
+    dates = np.datetime_as_string(days.view('datetime64[ns]'), unit='D').astype('S10')
+    return np.char.add(dates, b'T').view(np.uint8).reshape(-1, 11)
+
+def _iso_timestamps(ts_ns, days, dates, day):
+    """'YYYY-MM-DDTHH:MM:SS.nnnnnnnnnZ' strings built as fixed-width bytes
+
+    Formatting per row through datetime objects costs microseconds; here only the
+    session dates are formatted and the time of day is assembled from digit columns.
+    """
+    n = len(ts_ns)
+    out = np.empty((n, 30), dtype=np.uint8)
+    out[:, :11] = dates[day]
+    ns_of_day = ts_ns - days[day]
+    seconds, nanos = np.divmod(ns_of_day, 10**9)
+    hours, rest = np.divmod(seconds, 3600)
+    minutes, secs = np.divmod(rest, 60)
+    out[:, 11:13] = _digits(hours, 2)
+    out[:, 14:16] = _digits(minutes, 2)
+    out[:, 17:19] = _digits(secs, 2)
+    out[:, 20:29] = _digits(nanos, 9)
+    out[:, [13, 16]] = ord(':')
+    out[:, 19] = ord('.')
+    out[:, 29] = ord('Z')
+    return pa.array(out.view('S30').reshape(n)).cast(pa.string())
+
+def _csv_columns(order_ids=False):
+    """Header of the generated files: Config.CSV_COLUMNS, with order_id before flags"""
+    if not order_ids:
+        return config.CSV_COLUMNS
+    at = config.CSV_COLUMNS.index('flags')
+    return config.CSV_COLUMNS[:at] + ['order_id'] + config.CSV_COLUMNS[at:]
+
+def _to_table(columns, days, dates, day, names):
+    """Arrow table of the CSV columns in header order"""
+    arrays = []
+    for name in names:
+        values = columns[name]
+        if name in ('ts_recv', 'ts_event'):
+            arrays.append(_iso_timestamps(values, days, dates, day))
+        elif values.dtype.kind == 'U':
+            # Fixed-width bytes convert to Arrow far faster than numpy unicode
+            arrays.append(pa.array(values.astype('S')).cast(pa.string()))
+        else:
+            arrays.append(pa.array(values))
+    return pa.Table.from_arrays(arrays, names=names)
+
+def generate_tick_csvs(directory, n_rows, seed=0, start='2021-06-01', n_days=800,
+                       rows_per_file=1 << 22, chunk_rows=1 << 20,
+                       ticker=config.TICKER_SYMBOL, order_ids=False):
+    """Write n_rows synthetic ticks as CSV files into directory and return their paths
+
+    Sessions run over n_days business days from start (the default spans NVDA's 2021
+    and 2024 splits). Files hold rows_per_file rows each and are generated chunk by
+    chunk, so memory stays bounded at any size. order_ids adds an MBO order_id column
+    (before flags) linking each order's add, modifies and cancel or fill. A manifest of
+    the parameters is written alongside; when it already matches, the existing files
+    are reused.
+    """
+    directory = Path(directory)
+    params = dict(n_rows=int(n_rows), seed=seed, start=start, n_days=n_days,
+                  rows_per_file=rows_per_file, chunk_rows=chunk_rows, ticker=ticker)
+    if order_ids:
+        params['order_ids'] = True
+    manifest = directory / MANIFEST_NAME
+    n_files = max(-(-params['n_rows'] // rows_per_file), 1)
+    paths = [directory / f"synthetic_{i:05d}.csv" for i in range(n_files)]
+    if manifest.exists() and json.loads(manifest.read_text()) == params \
+            and all(p.exists() for p in paths):
+        return paths
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob('synthetic_*.csv'):
+        stale.unlink()
+    days = _session_days(start, n_days)
+    dates = _session_dates(days)
+    era_bounds, era_factors = split_adjustment_table(get_split_history(
+        ticker, start=days[0], end=days[-1] + 86_400 * 10**9))
+    log_price = math.log(15.0)
+    names = _csv_columns(order_ids)
+
+    for file_index, path in enumerate(paths):
+        file_first = file_index * rows_per_file
+        file_rows = min(rows_per_file, params['n_rows'] - file_first)
+        tmp = path.with_suffix('.csv.tmp')
+        with open(tmp, 'wb') as f:
+            f.write((','.join(names) + '\n').encode())
+            writer = None
+            for offset in range(0, file_rows, chunk_rows):
+                n = min(chunk_rows, file_rows - offset)
+                rng = np.random.default_rng([seed, file_index, offset // chunk_rows])
+                columns, day, log_price = _chunk_columns(
+                    rng, file_first + offset, n, params['n_rows'], days, log_price,
+                    era_bounds, era_factors, ticker, offset, order_ids)
+                table = _to_table(columns, days, dates, day, names)
+                if writer is None:
+                    writer = pa_csv.CSVWriter(f, table.schema, write_options=pa_csv.WriteOptions(
+                        include_header=False, quoting_style='none'))
+                writer.write_table(table)
+            writer.close()
+        os.replace(tmp, path)
+
+    manifest.write_text(json.dumps(params, indent=1))
+    return paths
@@ -0,0 +1,98 @@
+"""Tick data analysis: loading, split adjustment, returns statistics, scaling and plots.
+
+Submodules (and their heavy dependencies: pandas, pyarrow, cuDF, scipy, scikit-learn,
+matplotlib) are only imported when one of their names is first accessed.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'Config': 'config',
+    'config': 'config',
+    'error_msgs': 'config',
+    'plot_colors': 'config',
+    'plot_labels': 'config',
+    'get_split_history': 'corporate_actions',
+    'update_corporate_actions': 'corporate_actions',
+    'read_and_combine_csv_files_cpu': 'loading',
+    'read_and_combine_csv_files_gpu': 'loading',
+    'evict_cache': 'cache',
+    'make_row_filter': 'time_index',
+    'load_time_index': 'time_index',
+    'load_cache_manifest': 'cache',
+    'adjust_for_splits': 'splits',
+    'apply_split_factors': 'splits',
+    'split_adjustment_table': 'splits',
+    'build_bars': 'bars',
+    'build_bars_chunked': 'bars',
+    'iter_bars': 'bars',
+    'calculate_daily_returns': 'returns',
+    'analyze_returns_statistics': 'returns',
+    'print_returns_statistics': 'returns',
+    'ReturnsAccumulator': 'online_stats',
+    'QuantileSketch': 'online_stats',
+    'accumulate_returns': 'online_stats',
+    'load_returns_matrix': 'multi_ticker',
+    'analyze_returns_matrix': 'multi_ticker',
+    'rolling_risk_metrics': 'rolling',
+    'print_rolling_summary': 'rolling',
+    'bootstrap_statistics': 'bootstrap',
+    'bootstrap_replicates': 'bootstrap',
+    'print_bootstrap_summary': 'bootstrap',
+    'reconstruct_book': 'orderbook',
+    'MicrostructureAccumulator': 'microstructure',
+    'microstructure_features': 'microstructure',
+    'realized_measures': 'microstructure',
+    'volatility_signature': 'microstructure',
+    'render_volatility_signature': 'microstructure',
+    'FeatureCache': 'features',
+    'feature_cache': 'features',
+    'cached_bars': 'features',
+    'cached_log_prices': 'features',
+    'WindowDataset': 'dataset',
+    'build_window_datasets': 'dataset',
+    'write_series_memmap': 'dataset',
+    'PriceTransform': 'transforms',
+    'scale_log_data': 'scaling',
+    'scale_data': 'scaling',
+    'verify_scaling': 'scaling',
+    'log_transform_data': 'scaling',
+    'downsample_for_plotting': 'plotting',
+    'minmax_indices': 'downsampling',
+    'lttb_indices': 'downsampling',
+    'DownsamplePyramid': 'downsampling',
+    'visualize_price_data': 'plotting',
+    'visualize_log_price_data': 'plotting',
+    'PanelAggregator': 'report',
+    'aggregate_panels': 'report',
+    'render_report': 'report',
+    'render_reports': 'report',
+    'run_pipeline': 'pipeline',
+    'TickStore': 'server',
+    'AnalysisServer': 'server',
+    'query_server': 'server',
+    'serve_directory': 'server',
+    'StageMetrics': 'instrumentation',
+    'SamplingProfiler': 'instrumentation',
+    'ingest_latency': 'timestamps',
+    'print_latency_summary': 'timestamps',
+    'TickFrame': 'ticks',
+    'compact_ticks': 'ticks',
+    'ingest_incremental': 'incremental',
+    'drop_duplicate_ticks': 'incremental',
+    'sequence_gaps': 'incremental',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
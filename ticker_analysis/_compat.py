@@ -0,0 +1,23 @@
+"""Lazy access to optional heavy dependencies (cuDF, cupy, torch)."""
+
+import importlib
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def optional_import(name):
+    """Import a module on first use, or return None if it is not installed"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+def gpu_available():
+    """True when cuDF is installed and (if torch is present) a CUDA device is visible"""
+    if optional_import('cudf') is None:
+        return False
+    torch = optional_import('torch')
+    return torch is None or torch.cuda.is_available()
+
+def is_gpu_frame(df):
+    """True for cuDF objects, checked without importing cuDF"""
+    return type(df).__module__.split('.')[0] == 'cudf'
@@ -0,0 +1,149 @@
+"""Single-pass OHLCV bar building from int64 timestamp buckets, in memory or chunk by chunk."""
+
+import numpy as np
+import pandas as pd
+
+from .config import config
+
+NS_PER_DAY = 86_400 * 10**9
+
+# Per-bar fields carried between chunks (mean/m2 hold the within-bar price moments)
+_BAR_FIELDS = ('bucket', 'open', 'high', 'low', 'close', 'volume', 'pv', 'trades', 'mean', 'm2')
+
+def freq_ns(freq):
+    """Fixed bar width in ns for a pandas frequency string ('1s', '1min', 'h', '1D', ...)"""
+    return pd.tseries.frequencies.to_offset(freq).nanos
+
+def _is_session_freq(width_ns):
+    """Whole-day bars follow session days rather than UTC midnight"""
+    return width_ns % NS_PER_DAY == 0
+
+def bucket_ids(ts_ns, width_ns, session_tz=config.SESSION_TIMEZONE,
+               day_start=config.SESSION_DAY_START):
+    """Bar number for each timestamp (session-local for whole-day bars, UTC otherwise)"""
+    if not _is_session_freq(width_ns):
+        return ts_ns // width_ns
+
+    # Session days: shift to local wall-clock time (DST aware), then by the session start
+    local_ns = (pd.DatetimeIndex(ts_ns.view('datetime64[ns]'), tz='UTC')
+                .tz_convert(session_tz).tz_localize(None).asi8)
+    return (local_ns - pd.Timedelta(day_start).value) // width_ns
+
+def _frame_arrays(df, price_col='price', size_col='size', trades_only=False):
+    """Timestamp (int64 ns), price and size arrays from a ts-indexed frame"""
+    if trades_only and 'action' in df.columns:
+        df = df[df['action'].isin(config.TRADE_ACTIONS)]
+    ts_ns = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else \
+        df['ts_event'].to_numpy().view('int64')
+    price = df[price_col].to_numpy(dtype=np.float64)
+    size = df[size_col].to_numpy(dtype=np.float64) if size_col in df.columns else None
+    return ts_ns, price, size
+
+def bar_arrays(ts_ns, price, size=None, freq='1min', session_tz=config.SESSION_TIMEZONE,
+               day_start=config.SESSION_DAY_START):
+    """Aggregate ticks into per-bucket arrays in one vectorized pass (see _BAR_FIELDS)"""
+    buckets = bucket_ids(np.asarray(ts_ns, dtype=np.int64), freq_ns(freq), session_tz, day_start)
+    if size is None:
+        size = np.zeros(len(price))
+
+    # Tick data is normally time-ordered already; only sort when it is not
+    if len(buckets) and np.any(buckets[1:] < buckets[:-1]):
+        order = np.argsort(buckets, kind='stable')
+        buckets, price, size = buckets[order], price[order], size[order]
+
+    if not len(buckets):
+        return {field: np.empty(0) for field in _BAR_FIELDS}
+
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    counts = np.diff(np.append(starts, len(buckets)))
+    mean = np.add.reduceat(price, starts) / counts
+    return {
+        'bucket': buckets[starts],
+        'open': price[starts],
+        'high': np.maximum.reduceat(price, starts),
+        'low': np.minimum.reduceat(price, starts),
+        'close': price[starts + counts - 1],
+        'volume': np.add.reduceat(size, starts),
+        'pv': np.add.reduceat(price * size, starts),
+        'trades': counts,
+        'mean': mean,
+        'm2': np.add.reduceat((price - np.repeat(mean, counts)) ** 2, starts),
+    }
+
+def _merge_boundary(left, right):
+    """Combine the last bar of `left` with the first bar of `right` when they share a bucket"""
+    if not len(left['bucket']) or not len(right['bucket']) or \
+            left['bucket'][-1] != right['bucket'][0]:
+        return {field: np.concatenate([left[field], right[field]]) for field in _BAR_FIELDS}
+
+    a = {field: left[field][-1] for field in _BAR_FIELDS}
+    b = {field: right[field][0] for field in _BAR_FIELDS}
+    n = a['trades'] + b['trades']
+    delta = b['mean'] - a['mean']
+    merged = {
+        'bucket': a['bucket'], 'open': a['open'], 'close': b['close'],
+        'high': max(a['high'], b['high']), 'low': min(a['low'], b['low']),
+        'volume': a['volume'] + b['volume'], 'pv': a['pv'] + b['pv'], 'trades': n,
+        'mean': a['mean'] + delta * b['trades'] / n,
+        'm2': a['m2'] + b['m2'] + delta ** 2 * a['trades'] * b['trades'] / n,
+    }
+    return {
+        field: np.concatenate([left[field][:-1], [merged[field]], right[field][1:]])
+        for field in _BAR_FIELDS
+    }
+
+def bar_index(buckets, freq='1min', day_start=config.SESSION_DAY_START):
+    """Bar start labels for bucket ids: session dates for daily bars, UTC times otherwise"""
+    width = freq_ns(freq)
+    starts = np.asarray(buckets).astype(np.int64) * width
+    if _is_session_freq(width):
+        return pd.DatetimeIndex((starts + pd.Timedelta(day_start).value).view('datetime64[ns]'),
+                                name='date').normalize()
+    return pd.DatetimeIndex(starts.view('datetime64[ns]'), tz='UTC', name='ts')
+
+def bars_to_frame(bars, freq='1min', day_start=config.SESSION_DAY_START):
+    """Turn bar arrays into an OHLCV DataFrame indexed by bar start (session date for daily bars)"""
+    index = bar_index(bars['bucket'], freq, day_start)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(bars['volume'] > 0, bars['pv'] / bars['volume'], np.nan)
+        std = np.where(bars['trades'] > 1, np.sqrt(bars['m2'] / (bars['trades'] - 1)), np.nan)
+    return pd.DataFrame({
+        'open': bars['open'], 'high': bars['high'], 'low': bars['low'], 'close': bars['close'],
+        'volume': bars['volume'], 'vwap': vwap, 'trades': bars['trades'].astype(np.int64),
+        'std': std,
+    }, index=index)
+
+def build_bars(df, freq='1min', price_col='price', size_col='size',
+               trades_only=config.BARS_TRADES_ONLY):
+    """Build OHLCV + VWAP + trade-count (+ intrabar std) bars from a ts-indexed frame"""
+    ts_ns, price, size = _frame_arrays(df, price_col, size_col, trades_only)
+    return bars_to_frame(bar_arrays(ts_ns, price, size, freq), freq)
+
+def iter_bars(chunks, freq='1min', price_col='price', size_col='size',
+              trades_only=config.BARS_TRADES_ONLY):
+    """Build bars over time-ordered chunks (frames) that need not fit in memory together
+
+    Yields one DataFrame of completed bars per chunk; the last, possibly partial, bar
+    of each chunk is carried over and merged into the next.
+    """
+    carry = None
+    for chunk in chunks:
+        bars = bar_arrays(*_frame_arrays(chunk, price_col, size_col, trades_only), freq=freq)
+        if carry is not None:
+            bars = _merge_boundary(carry, bars)
+        if not len(bars['bucket']):
+            continue
+        carry = {field: bars[field][-1:] for field in _BAR_FIELDS}
+        done = {field: bars[field][:-1] for field in _BAR_FIELDS}
+        if len(done['bucket']):
+            yield bars_to_frame(done, freq)
+    if carry is not None:
+        yield bars_to_frame(carry, freq)
+
+def build_bars_chunked(chunks, freq='1min', **kwargs):
+    """Concatenate iter_bars output into a single bar frame"""
+    frames = list(iter_bars(chunks, freq, **kwargs))
+    if not frames:
+        return bars_to_frame({field: np.empty(0) for field in _BAR_FIELDS}, freq)
+    return pd.concat(frames)
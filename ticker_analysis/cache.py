@@ -0,0 +1,171 @@
+"""Persistent cache of parsed tick files, stored as per-trading-date Arrow IPC partitions.
+
+Partitions follow session days in Config.SESSION_TIMEZONE (bars.bucket_ids at
+Config.DAILY_BAR_FREQ), the same days the daily bars and returns use, so a window of
+session days maps onto whole partitions. Entries written before this partitioned by
+UTC date; they are read the same way, since every entry lists its own partitions.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import feather
+
+from .config import config, error_msgs
+from .time_index import filter_columns, filter_table, partition_matches, partition_summary
+
+def _file_fingerprint(file):
+    """Cache key for a source file, derived from its path, size and mtime"""
+    st = Path(file).stat()
+    ident = f"{Path(file).resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(ident.encode()).hexdigest()[:20]
+
+def _partition_path(cache_dir, date, key):
+    """Location of one file's rows for one trading date"""
+    return Path(cache_dir) / f"date={date}" / f"{key}.arrow"
+
+def load_cache_manifest(cache_dir=config.CACHE_DIR):
+    """Read the cache manifest ({key: entry}), or an empty one"""
+    path = Path(cache_dir) / 'manifest.json'
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        print(error_msgs.CACHE_MANIFEST_ERROR.format(path, e))
+        return {}
+
+def save_cache_manifest(manifest, cache_dir=config.CACHE_DIR):
+    """Atomically write the cache manifest"""
+    path = Path(cache_dir) / 'manifest.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps(manifest, indent=1))
+    os.replace(tmp, path)
+
+def write_cached_table(file, table, cache_dir=config.CACHE_DIR):
+    """Write a parsed file to the cache, one Arrow IPC file per session date"""
+    from .bars import bucket_ids, freq_ns
+
+    key = _file_fingerprint(file)
+    days = bucket_ids(table.column('ts_event').to_numpy().view(np.int64),
+                      freq_ns(config.DAILY_BAR_FREQ))
+
+    # Group rows by day (tick files are normally already time-ordered)
+    if len(days) and np.any(days[1:] < days[:-1]):
+        order = np.argsort(days, kind='stable')
+        table, days = table.take(order), days[order]
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(days)) + 1, [len(days)]])
+
+    partitions, index, n_bytes = [], {}, 0
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if start == end:
+            continue
+        date = str(np.datetime64(int(days[start]), 'D'))
+        path = _partition_path(cache_dir, date, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        part = table.slice(start, end - start)
+        feather.write_feather(part, tmp, compression=config.CACHE_COMPRESSION)
+        os.replace(tmp, path)
+        partitions.append(date)
+        index[date] = partition_summary(part)
+        n_bytes += path.stat().st_size
+
+    st = Path(file).stat()
+    return {
+        'key': key,
+        'source': str(Path(file).resolve()),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'columns': table.column_names,
+        'partitions': partitions,
+        'index': index,
+        'bytes': n_bytes,
+        'last_used': time.time()
+    }
+
+def index_cached_entry(entry, cache_dir=config.CACHE_DIR):
+    """Backfill the time index of an entry written before partitions were indexed"""
+    if 'index' not in entry:
+        entry['index'] = {
+            date: partition_summary(feather.read_table(
+                _partition_path(cache_dir, date, entry['key']), memory_map=True))
+            for date in entry['partitions']
+        }
+    return entry
+
+def matching_partitions(entry, row_filter):
+    """Partitions of a cached file that the time index cannot rule out"""
+    index = entry.get('index') or {}
+    return [date for date in entry['partitions']
+            if partition_matches(index.get(date), row_filter)]
+
+def iter_cached_tables(entry, columns, cache_dir=config.CACHE_DIR, row_filter=None):
+    """The requested columns of one cached file, one (memory-mapped) partition at a time
+
+    With a row filter, partitions outside it are never opened and the rest are
+    filtered in Arrow.
+    """
+    read_columns = list(dict.fromkeys(list(columns) + filter_columns(row_filter)))
+    for date in matching_partitions(entry, row_filter):
+        table = feather.read_table(_partition_path(cache_dir, date, entry['key']),
+                                   columns=read_columns, memory_map=True)
+        yield filter_table(table, row_filter).select(list(columns))
+
+def read_cached_table(entry, columns, cache_dir=config.CACHE_DIR, row_filter=None):
+    """Read (memory-mapped) the requested columns of one cached file (see iter_cached_tables)"""
+    tables = list(iter_cached_tables(entry, columns, cache_dir, row_filter))
+    if not tables:
+        from .loading import _arrow_column_types
+
+        return pa.table({col: pa.array([], type=t)
+                         for col, t in _arrow_column_types(columns).items()})
+    return pa.concat_tables(tables)
+
+def lookup_cached_files(manifest, files, columns, cache_dir=config.CACHE_DIR):
+    """Return {file: entry} for the files whose current fingerprint is cached"""
+    hits = {}
+    now = time.time()
+    for file in files:
+        entry = manifest.get(_file_fingerprint(file))
+        if entry is None or not set(columns) <= set(entry['columns']):
+            continue
+        if not all(_partition_path(cache_dir, d, entry['key']).exists()
+                   for d in entry['partitions']):
+            continue
+        entry['last_used'] = now
+        hits[file] = entry
+    return hits
+
+def _drop_cache_entry(manifest, key, cache_dir):
+    """Remove one entry and its partition files"""
+    entry = manifest.pop(key)
+    for date in entry['partitions']:
+        _partition_path(cache_dir, date, key).unlink(missing_ok=True)
+    return entry['bytes']
+
+def prune_stale_cache_entries(manifest, files, cache_dir=config.CACHE_DIR):
+    """Drop entries for source files that have since changed on disk"""
+    current = {str(Path(f).resolve()): _file_fingerprint(f) for f in files}
+    stale = [key for key, entry in manifest.items()
+             if entry['source'] in current and current[entry['source']] != key]
+    for key in stale:
+        _drop_cache_entry(manifest, key, cache_dir)
+    return len(stale)
+
+def evict_cache(manifest, cache_dir=config.CACHE_DIR, max_bytes=config.CACHE_MAX_BYTES):
+    """Evict least recently used entries until the cache fits in max_bytes"""
+    total = sum(entry['bytes'] for entry in manifest.values())
+    evicted = 0
+    for key in sorted(manifest, key=lambda k: manifest[k]['last_used']):
+        if total <= max_bytes:
+            break
+        total -= _drop_cache_entry(manifest, key, cache_dir)
+        evicted += 1
+    return evicted
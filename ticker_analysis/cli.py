@@ -0,0 +1,74 @@
+"""Command line entry point: ``python -m ticker_analysis --stages stats``."""
+
+import argparse
+
+from .config import config
+from .instrumentation import StageMetrics
+from .pipeline import PIPELINE_STAGES, run_pipeline
+from .time_index import make_row_filter
+
+def build_parser():
+    """Argument parser for the pipeline CLI"""
+    parser = argparse.ArgumentParser(
+        prog='python -m ticker_analysis',
+        description='Load, split-adjust and analyze tick data.')
+    parser.add_argument('--data-dir', default=config.DATA_DIR,
+                        help='directory of tick CSV files (default: %(default)s)')
+    parser.add_argument('--stages', nargs='+', default=list(PIPELINE_STAGES),
+                        choices=list(PIPELINE_STAGES), metavar='STAGE',
+                        help=f"stages to run, prerequisites included "
+                             f"({', '.join(PIPELINE_STAGES)}; default: all)")
+    parser.add_argument('--engine', default=config.INGEST_ENGINE, choices=['auto', 'gpu', 'cpu'],
+                        help='ingestion engine (default: %(default)s)')
+    parser.add_argument('--cache-dir', default=config.CACHE_DIR,
+                        help='parsed file cache directory (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='disable the parsed file cache')
+    parser.add_argument('--window', choices=['train', 'test'], default=None,
+                        help='load only the Config train or test date range')
+    parser.add_argument('--start', default=None, help='load rows from this ts_event on (inclusive)')
+    parser.add_argument('--end', default=None, help='load rows up to this ts_event (inclusive)')
+    parser.add_argument('--actions', nargs='+', default=None,
+                        help="load only these event actions (e.g. T F for trade prints)")
+    parser.add_argument('--tickers', nargs='+', default=None,
+                        help='symbols for the universe stage (default: every symbol found)')
+    parser.add_argument('--freq', default=config.DAILY_BAR_FREQ,
+                        help='bar frequency of the universe returns matrix (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='process pool size for sharded universe scoring and bootstrap chunks')
+    parser.add_argument('--compact', action='store_true', default=config.COMPACT_TICKS,
+                        help='hold the adjusted ticks as a compact TickFrame '
+                             f"(prices as {config.TICK_PRICE_DTYPE})")
+    parser.add_argument('--serve', action='store_true',
+                        help='load and adjust once, then answer bar/stats/series queries over '
+                             'local HTTP instead of running stages')
+    parser.add_argument('--host', default=config.SERVER_HOST,
+                        help='server bind address (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT,
+                        help='server port (default: %(default)s)')
+    parser.add_argument('--metrics', default=config.METRICS_PATH, metavar='PATH',
+                        help='append per-stage metrics to this JSON lines file')
+    parser.add_argument('--profile', default=config.PROFILE_STAGE, choices=list(PIPELINE_STAGES),
+                        metavar='STAGE', help='sample-profile this stage (collapsed stacks '
+                                              'written under Config.PROFILE_DIR)')
+    parser.add_argument('--profile-interval', type=float, default=config.PROFILE_INTERVAL,
+                        help='seconds between profiler samples (default: %(default)s)')
+    return parser
+
+def main(argv=None):
+    """Run the requested pipeline stages"""
+    args = build_parser().parse_args(argv)
+    row_filter = make_row_filter(args.window, args.start, args.end, actions=args.actions)
+    if args.serve:
+        from .server import serve_directory
+        serve_directory(args.data_dir, host=args.host, port=args.port, engine=args.engine,
+                        cache_dir=None if args.no_cache else args.cache_dir,
+                        row_filter=row_filter, compact=args.compact)
+        return 0
+    run_pipeline(args.stages, directory_path=args.data_dir, engine=args.engine,
+                 cache_dir=None if args.no_cache else args.cache_dir,
+                 tickers=args.tickers, freq=args.freq, max_workers=args.workers,
+                 row_filter=row_filter,
+                 metrics=StageMetrics(args.metrics, profile_stage=args.profile,
+                                      profile_interval=args.profile_interval),
+                 compact=args.compact)
+    return 0
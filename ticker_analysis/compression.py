@@ -0,0 +1,175 @@
+"""Streaming decompression of .csv.gz / .csv.zst tick archives for the loaders.
+
+Each compressed file gets a producer thread. It decompresses the file with pyarrow's
+gzip or zstd codec, in Config.DECOMPRESS_CHUNK_BYTES pieces, into a queue of at most
+Config.DECOMPRESS_QUEUE_CHUNKS pieces. The CSV parser reads from the consumer side of
+the queue. The codecs release the GIL, so decompression runs ahead while the parser
+works. Memory per file stays bounded whatever the archive size, and nothing is written
+to scratch disk. The loaders already parse files concurrently, so decompression of one
+file also overlaps with the parsing of the others.
+"""
+
+import io
+import queue
+import threading
+from pathlib import Path
+
+from .config import config
+
+# File suffix -> pyarrow codec name
+COMPRESSION_CODECS = {'.gz': 'gzip', '.zst': 'zstd'}
+CSV_PATTERNS = ('*.csv', '*.csv.gz', '*.csv.zst')
+
+def compression_of(path):
+    """pyarrow codec name for a compressed CSV path, or None for plain files"""
+    return COMPRESSION_CODECS.get(Path(path).suffix.lower())
+
+# zstd frame magic number, and Frame_Content_Size field widths by FCS flag
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_ZSTD_FCS_BYTES = (0, 2, 4, 8)
+_ZSTD_DICT_ID_BYTES = (0, 1, 2, 4)
+
+def _gzip_content_size(path):
+    """Uncompressed size from a gzip trailer (ISIZE, modulo 4 GiB), or None"""
+    with open(path, 'rb') as f:
+        if f.read(2) != b'\x1f\x8b':
+            return None
+        f.seek(-4, 2)
+        return int.from_bytes(f.read(4), 'little')
+
+def _zstd_content_size(path):
+    """Uncompressed size from the first zstd frame header, or None when not recorded
+
+    The zstd CLI records it for files; streaming compressors usually leave it out.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(18)
+    if len(header) < 5 or header[:4] != ZSTD_MAGIC:
+        return None
+    descriptor = header[4]
+    fcs_flag, single_segment = descriptor >> 6, (descriptor >> 5) & 1
+    n_bytes = _ZSTD_FCS_BYTES[fcs_flag] or single_segment
+    if not n_bytes:
+        return None
+    start = 5 + (not single_segment) + _ZSTD_DICT_ID_BYTES[descriptor & 3]
+    field = header[start:start + n_bytes]
+    if len(field) < n_bytes:
+        return None
+    return int.from_bytes(field, 'little') + (256 if n_bytes == 2 else 0)
+
+def estimated_csv_bytes(path):
+    """Uncompressed size estimate, used to pre-size the loaders' column buffers
+
+    Archives are sized from the gzip trailer or the zstd frame header. When the size
+    is not recorded (or a gzip file is over 4 GiB), Config.CSV_COMPRESSION_RATIO is
+    assumed instead.
+    """
+    size = Path(path).stat().st_size
+    codec = compression_of(path)
+    if codec is None:
+        return size
+    if codec == 'gzip':
+        content = _gzip_content_size(path)
+        # ISIZE wraps at 4 GiB: trust it only when it is at least the archive size
+        if content is not None and content >= size:
+            return content
+    else:
+        content = _zstd_content_size(path)
+        if content is not None:
+            return content
+    return size * config.CSV_COMPRESSION_RATIO
+
+def read_csv_header(path, max_bytes=1 << 16):
+    """Column names in the first line of a CSV (plain or compressed)"""
+    import pyarrow as pa
+
+    codec = compression_of(path)
+    if codec is None:
+        with open(path, 'rb') as f:
+            first = f.readline(max_bytes)
+    else:
+        with pa.CompressedInputStream(str(path), codec) as source:
+            first = source.read(max_bytes).split(b'\n', 1)[0]
+    return [name.strip() for name in first.decode().rstrip('\r\n').split(',')]
+
+class DecompressingReader(io.RawIOBase):
+    """Read-only stream of a compressed file, decompressed ahead on a background thread
+
+    The queue holds at most max_chunks decompressed pieces, so the producer blocks
+    (and memory stays fixed) while the consumer falls behind. Errors raised while
+    decompressing are re-raised from read().
+    """
+
+    def __init__(self, path, chunk_bytes=config.DECOMPRESS_CHUNK_BYTES,
+                 max_chunks=config.DECOMPRESS_QUEUE_CHUNKS):
+        super().__init__()
+        self.path = Path(path)
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._stop = threading.Event()
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, args=(chunk_bytes,),
+                                        name=f'decompress-{self.path.name}', daemon=True)
+        self._thread.start()
+
+    def _produce(self, chunk_bytes):
+        import pyarrow as pa
+
+        try:
+            with pa.CompressedInputStream(str(self.path), compression_of(self.path)) as source:
+                while not self._stop.is_set():
+                    chunk = source.read(chunk_bytes)
+                    if not chunk:
+                        break
+                    self._put(chunk)
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(None)
+
+    def _put(self, item):
+        """Block until there is room in the queue, or the reader is closed"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is None or isinstance(item, Exception):
+                self._eof = True
+                if item is None:
+                    return 0
+                raise item
+            self._pending = memoryview(item)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        """Stop the producer (unblocking it if the queue is full) and release the buffers"""
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._pending = memoryview(b'')
+        super().close()
+
+def open_csv_source(path, chunk_bytes=config.DECOMPRESS_CHUNK_BYTES,
+                    max_chunks=config.DECOMPRESS_QUEUE_CHUNKS):
+    """What the CSV parsers read: the path for plain files, a buffered stream otherwise
+
+    Close the returned stream when done; paths are returned unchanged.
+    """
+    if compression_of(path) is None:
+        return path
+    return io.BufferedReader(DecompressingReader(path, chunk_bytes, max_chunks),
+                             buffer_size=chunk_bytes)
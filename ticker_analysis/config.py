@@ -0,0 +1,256 @@
+"""Configuration constants, plot styling, labels and error messages.
+
+Kept free of heavy imports so every other module (and worker process) can read it cheaply.
+"""
+
+import math
+import os
+
+class Config:
+    # Data Directory Settings
+    DATA_DIR = os.environ.get('TICKER_DATA_DIR',
+                              '/content/drive/My Drive/data for training/NVDA data')
+
+    # Data Processing Settings
+    CSV_COLUMNS = [
+        'ts_recv', 'ts_event', 'rtype', 'publisher_id', 'instrument_id',
+        'action', 'side', 'depth', 'price', 'size', 'flags',
+        'ts_in_delta', 'sequence', 'symbol'
+    ]
+
+    # Fixed column types used by the CPU loader (timestamps are parsed as UTC ns)
+    CSV_DTYPES = {
+        'ts_recv': 'datetime64[ns]', 'ts_event': 'datetime64[ns]',
+        'rtype': 'uint8', 'publisher_id': 'uint16', 'instrument_id': 'uint32',
+        'action': 'category', 'side': 'category', 'depth': 'uint8',
+        'price': 'float64', 'size': 'uint32', 'flags': 'uint8',
+        'ts_in_delta': 'int32', 'sequence': 'uint32', 'symbol': 'category',
+        'order_id': 'uint64'
+    }
+
+    # MBO columns loaded (by header name) when every file has them
+    CSV_OPTIONAL_COLUMNS = ['order_id']
+
+    # Ingestion Settings
+    INGEST_ENGINE = 'auto'  # 'auto', 'gpu' or 'cpu'
+    CPU_EXECUTOR = 'thread'  # 'thread' or 'process'
+    CPU_MAX_WORKERS = os.cpu_count()
+    CPU_BLOCK_SIZE = 64 << 20  # bytes per parser block
+    CSV_BYTES_PER_ROW = 110  # used to pre-size the combined column buffers
+    TIMESTAMP_CHUNK_ROWS = 1 << 16  # rows per fixed-format timestamp parsing block
+    INGEST_LATENCY = False  # add latency_ns/venue_latency_ns columns while loading
+    DEDUP_TICKS = False  # drop rows repeated across overlapping exports
+    DECOMPRESS_CHUNK_BYTES = 4 << 20  # decompressed bytes per piece handed to the parser
+    DECOMPRESS_QUEUE_CHUNKS = 4  # pieces buffered ahead per compressed file
+    CSV_COMPRESSION_RATIO = 4  # archive expansion assumed when its size is not recorded
+
+    # Incremental Ingestion Settings (watermarks, daily bars and returns statistics)
+    INCREMENTAL_DIR = os.path.expanduser('~/.cache/ticker_analysis/incremental')
+
+    # Parsed File Cache Settings
+    CACHE_DIR = os.path.expanduser('~/.cache/ticker_analysis')  # None disables the cache
+    CACHE_MAX_BYTES = 50 << 30
+    CACHE_COMPRESSION = 'lz4'
+
+    # Time Settings
+    TRAIN_START_DATE = "2018-05-02T08:44:39.292059872Z"
+    TRAIN_END_DATE = "2024-10-21T08:00:00.143369486Z"
+    TEST_START_DATE = "2024-03-07T09:00:00.785957501Z"
+    TEST_END_DATE = "2024-10-21T23:59:51.581176405Z"
+
+    # Corporate Actions Settings (local registry, refreshed explicitly from yfinance)
+    CORPORATE_ACTIONS_PATH = os.path.join(os.path.dirname(__file__), 'data',
+                                          'corporate_actions.csv')
+    CORPORATE_ACTIONS_COLUMNS = ['ticker', 'date', 'action', 'ratio']
+
+    # Visualization Settings
+    PLOT_FIGSIZE = (15, 20)
+    DOWNSAMPLE_TARGET_POINTS = 10000
+    DOWNSAMPLE_METHOD = 'minmax'  # 'minmax' keeps per-bucket extremes, or 'lttb' / 'stride'
+    DOWNSAMPLE_PYRAMID_FACTOR = 8  # rows per min/max pair between pyramid levels
+    HISTOGRAM_BINS = 50
+    PLOT_ALPHA = 0.7
+    SPLIT_LINE_COLORS = ['g', 'purple']
+
+    # Report Rendering Settings (headless panels drawn from full-data aggregates)
+    REPORT_DIR = os.environ.get('TICKER_REPORT_DIR', 'reports')
+    REPORT_FORMAT = 'png'
+    REPORT_DPI = 100
+    REPORT_FIGSIZE = (15, 5)
+    REPORT_WORKERS = None  # panel rendering processes (None: one per CPU)
+    REPORT_TIME_BIN = 'h'  # time resolution of the price envelope, density and volatility
+    REPORT_PRICE_RESOLUTION = 0.0005  # relative width of the price histogram keys
+    REPORT_DENSITY_COLUMNS = 1000
+    REPORT_DENSITY_ROWS = 200
+    REPORT_CHUNK_ROWS = 1 << 22
+
+    # Data Scaling Settings
+    SCALER_BUFFER_FACTOR = 0.1
+    SCALER_FEATURE_RANGE = (0, 1)
+
+    # Fused Transform Settings
+    TRANSFORM_CHUNK_ROWS = 1 << 22  # rows per in-place transform chunk (bounds extra memory)
+    TRANSFORM_DIR = os.path.expanduser('~/.cache/ticker_analysis/transforms')  # fitted params
+
+    # Volatility Settings
+    VOLATILITY_RESAMPLE_FREQ = 'h'
+
+    # Bar Settings (whole-day bars roll over at SESSION_DAY_START, local session time)
+    SESSION_TIMEZONE = 'America/New_York'
+    SESSION_DAY_START = '0h'
+    DAILY_BAR_FREQ = '1D'
+    TRADE_ACTIONS = ['T']  # MBO trade prints ('F' fills repeat them per resting order)
+    BARS_TRADES_ONLY = False
+
+    # Training Dataset Settings (sliding windows over the scaled prices)
+    DATASET_DIR = os.path.expanduser('~/.cache/ticker_analysis/datasets')  # None keeps data in RAM
+    DATASET_DTYPE = 'float32'
+    DATASET_WINDOW_SIZE = 256
+    DATASET_HORIZON = 1
+    DATASET_BATCH_SIZE = 512
+    DATASET_SHUFFLE_BLOCK = 1 << 20  # windows shuffled together (bounds index memory)
+    DATASET_PREFETCH_BATCHES = 8
+    DATASET_WORKERS = 2
+
+    # Compact Tick Settings (struct-of-arrays TickFrame after split adjustment)
+    COMPACT_TICKS = False
+    TICK_PRICE_DTYPE = 'float32'  # 'float32', 'fixed' (int64 / TICK_PRICE_SCALE) or 'float64'
+    TICK_PRICE_SCALE = 10**9  # fixed-point units per dollar (the feed's native 1e-9)
+    COMPACT_BLOCK_SIZE = 4 << 20  # parser block size when compact loads stream each file
+    COMPACT_BLOCK_ROWS = 1 << 20  # rows split-adjusted and encoded at a time
+
+    # Microstructure Settings (realized measures per sampling frequency, activity bins)
+    MICROSTRUCTURE_FREQS = ['1s', '5s', '15s', '30s', '1min', '5min', '15min', '30min']
+    MICROSTRUCTURE_BIN_FREQ = '5min'  # VWAP and trade intensity bins
+    MICROSTRUCTURE_CHUNK_ROWS = 1 << 22
+
+    # Order Book Settings
+    BOOK_CHUNK_EVENTS = 1 << 20  # events per top-of-book sparse table (bounds its memory)
+
+    # Derived Feature Cache Settings (in-memory, per process)
+    FEATURE_CACHE_MAX_BYTES = 4 << 30
+    FEATURE_FINGERPRINT_ROWS = None  # set to hash a strided row sample (faster, may go stale)
+
+    # Instrumentation Settings (per-stage metrics and the opt-in sampling profiler)
+    METRICS_PATH = os.environ.get('TICKER_METRICS_PATH')  # JSON lines file; None only prints
+    PROFILE_STAGE = os.environ.get('TICKER_PROFILE_STAGE')  # stage to sample-profile, or None
+    PROFILE_INTERVAL = 0.005  # seconds between stack samples
+    PROFILE_DIR = os.path.expanduser('~/.cache/ticker_analysis/profiles')
+
+    # Multi-Ticker Settings
+    MULTI_TICKER_SHARD_SIZE = 512  # ticker columns per worker task
+
+    # Rolling Metrics Settings (ints are row counts, strings are time offsets)
+    ROLLING_WINDOWS = [21, 63, 252]
+    ROLLING_PERIODS_PER_YEAR = 252  # annualization factor for rolling volatility and Sharpe
+
+    # Streaming Statistics Settings
+    STATS_SKETCH_ACCURACY = 0.005  # relative accuracy of the VaR/median quantile sketch
+
+    # Analysis Server Settings (resident ticks answering local HTTP queries)
+    SERVER_HOST = '127.0.0.1'
+    SERVER_PORT = int(os.environ.get('TICKER_SERVER_PORT', 8765))
+    SERVER_MAX_ROWS = 200_000  # most bars or series points returned by one query
+
+    # Bootstrap Settings (confidence intervals for Sharpe, VaR and the moments)
+    BOOTSTRAP_REPLICATES = 2000
+    BOOTSTRAP_CONFIDENCE = 0.95
+    BOOTSTRAP_BLOCK_LENGTH = None  # None: IID; int or 'auto': circular block bootstrap
+    BOOTSTRAP_SEED = 0
+    BOOTSTRAP_CHUNK_ELEMENTS = 1 << 23  # resampled values held per chunk of replicates
+
+    # Stock Settings
+    TICKER_SYMBOL = 'NVDA'
+
+    # Debug and Verification Settings
+    TEST_PRICE_POINTS = [[50.0], [100.0], [150.0]]
+    SAMPLE_SCALE_POINTS = [[0.5], [1.0]]
+
+    # Log Transform Settings
+    LOG_BASE = math.e  # natural log
+    LOG_EPSILON = 1e-10  # small constant to avoid log(0)
+
+# Create color schemes for consistent plotting
+class PlotColors:
+    TRAINING = 'blue'
+    TESTING = 'red'
+    VOLATILITY = 'green'
+    SPLIT_LINES = ['red', 'purple']
+
+# Create standardized plot labels
+class PlotLabels:
+    class TimeSeries:
+        ADJUSTED = 'NVDA Split-Adjusted Price Time Series'
+        UNADJUSTED = 'NVDA Unadjusted Price Time Series'
+        X_LABEL = 'Time'
+        Y_LABEL = 'Price ($)'
+
+    class Distribution:
+        ADJUSTED = 'Split-Adjusted Price Distribution'
+        UNADJUSTED = 'Unadjusted Price Distribution'
+        X_LABEL = 'Price ($)'
+        Y_LABEL = 'Count'
+
+    class Returns:
+        TITLE = 'Daily Returns Distribution'
+        X_LABEL = 'Daily Return (%)'
+        Y_LABEL = 'Count'
+
+    class Volatility:
+        TITLE = 'Hourly Price Volatility'
+        X_LABEL = 'Date'
+        Y_LABEL = 'Standard Deviation'
+
+    class LogTimeSeries:
+        ADJUSTED = 'NVDA Log-Transformed Price Time Series'
+        X_LABEL = 'Time'
+        Y_LABEL = 'Log Price'
+
+    class LogDistribution:
+        ADJUSTED = 'Log-Transformed Price Distribution'
+        X_LABEL = 'Log Price'
+        Y_LABEL = 'Count'
+
+    class LogReturns:
+        TITLE = 'Log-Transformed Daily Returns Distribution'
+        X_LABEL = 'Log Return (%)'
+        Y_LABEL = 'Count'
+
+    class LogVolatility:
+        TITLE = 'Log-Transformed Price Volatility'
+        X_LABEL = 'Date'
+        Y_LABEL = 'Log Standard Deviation'
+
+    class Signature:
+        TITLE = 'Volatility Signature'
+        X_LABEL = 'Sampling Interval (s)'
+        Y_LABEL = 'Annualized Volatility (%)'
+
+# Error Messages
+class ErrorMessages:
+    DIR_NOT_FOUND = "Directory not found: {}"
+    NO_FILES_READ = "No files were successfully read from the directory"
+    FILE_READ_ERROR = "Error reading {}: {}"
+    SPLIT_DATA_ERROR = "Error fetching split data: {}"
+    CACHE_MANIFEST_ERROR = "Ignoring unreadable cache manifest {}: {}"
+    CORPORATE_ACTIONS_NOT_FOUND = "Corporate actions registry not found: {}"
+    UNSORTED_TICKS = "Ticks must be sorted by ts_event (split-adjust them first)"
+    INVALID_PRICE_DTYPE = "Unknown tick price dtype: {} (use 'float32', 'fixed' or 'float64')"
+    LENGTH_MISMATCH = "Column {} has {} values for {} rows"
+    TRANSFORM_ROWS_UNKNOWN = ("Transforming a chunk iterable needs its row count: pass n_rows "
+                              "or a preallocated out array")
+    TRANSFORM_ROWS_MISMATCH = "Transform source yielded {} rows, expected {}"
+    BOOK_NEEDS_ORDER_IDS = ("Order book replay needs an order_id column: without it, modifies "
+                            "cannot be moved off their previous price level")
+    BOOK_CHUNK_TOO_SMALL = "Book range-max chunk must be at least 2 events, not {}"
+    BOOK_CROSSED = "Warning: {:,} of {:,} book states are crossed (bid above ask); see 'crossed'"
+    SERVER_BAD_REQUEST = "Malformed HTTP request line"
+    SERVER_BAD_METHOD = "Only GET is supported, not {}"
+    SERVER_UNKNOWN_ROUTE = "Unknown route {} (expected one of {})"
+    SERVER_TOO_MANY_ROWS = "Query matches {} bars, more than the limit of {} (narrow the window)"
+
+# Create a config instance for easy access
+config = Config()
+plot_colors = PlotColors()
+plot_labels = PlotLabels()
+error_msgs = ErrorMessages()
@@ -0,0 +1,70 @@
+"""Local corporate-actions registry: memoized split lookups with an explicit yfinance refresh."""
+
+import csv
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+from .config import config, error_msgs
+
+def _utc_timestamp(value):
+    """Parse a date/time as a UTC pandas Timestamp (naive values are taken as UTC)"""
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tz is None else value
+
+@lru_cache(maxsize=None)
+def _load_corporate_actions(path=config.CORPORATE_ACTIONS_PATH):
+    """Read the registry once into {ticker: ((date, ratio), ...)} sorted by date"""
+    actions = {}
+    if not os.path.exists(path):
+        print(error_msgs.CORPORATE_ACTIONS_NOT_FOUND.format(path))
+        return actions
+
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            if row['action'] != 'split':
+                continue
+            actions.setdefault(row['ticker'].upper(), []).append(
+                (f"{row['date']}T00:00:00Z", float(row['ratio'])))
+    return {ticker: tuple(sorted(rows)) for ticker, rows in actions.items()}
+
+@lru_cache(maxsize=4096)
+def get_split_history(ticker=config.TICKER_SYMBOL,
+                     start=config.TRAIN_START_DATE,
+                     end=config.TEST_END_DATE,
+                     path=config.CORPORATE_ACTIONS_PATH):
+    """Get stock splits for a ticker within [start, end] as ((date, ratio), ...)"""
+    start, end = _utc_timestamp(start), _utc_timestamp(end)
+    return tuple(
+        (date, ratio) for date, ratio in _load_corporate_actions(path).get(ticker.upper(), ())
+        if start <= _utc_timestamp(date) <= end
+    )
+
+def update_corporate_actions(tickers, path=config.CORPORATE_ACTIONS_PATH):
+    """Refresh the registry for the given tickers from yfinance (the only network access)"""
+    import yfinance as yf
+
+    rows = []
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    tickers = {t.upper() for t in tickers}
+    for ticker in tickers:
+        try:
+            splits = yf.Ticker(ticker).splits
+        except Exception as e:
+            print(error_msgs.SPLIT_DATA_ERROR.format(e))
+            continue
+        rows = [r for r in rows if not (r['ticker'] == ticker and r['action'] == 'split')]
+        rows.extend({'ticker': ticker, 'date': str(date.date()), 'action': 'split',
+                     'ratio': float(ratio)} for date, ratio in splits.items())
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=config.CORPORATE_ACTIONS_COLUMNS)
+        writer.writeheader()
+        writer.writerows(sorted(rows, key=lambda r: (r['ticker'], r['date'])))
+
+    _load_corporate_actions.cache_clear()
+    get_split_history.cache_clear()
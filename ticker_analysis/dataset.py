@@ -0,0 +1,140 @@
+"""Zero-copy sliding-window datasets over the scaled price series, for model training.
+
+Windows are strided views (sliding_window_view) over one flat array, usually a
+memory-mapped .npy file, so no window is materialized until it is batched. Shuffling
+permutes blocks of window starts and then starts within a block, so the index memory
+stays bounded and reads stay local however many ticks there are.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ._compat import optional_import
+from .config import config
+from .time_index import make_row_filter, to_epoch_ns
+
+def write_series_memmap(values, path, dtype=config.DATASET_DTYPE, chunk_rows=1 << 24):
+    """Write a 1-D series to a .npy file chunk by chunk and return it memory-mapped"""
+    values = np.asarray(values).reshape(-1)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp.npy')
+    out = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtype, shape=(len(values),))
+    for start in range(0, len(values), chunk_rows):
+        out[start:start + chunk_rows] = values[start:start + chunk_rows]
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode='r')
+
+class WindowDataset:
+    """Sliding (input window, target horizon) pairs over one series between two dates
+
+    Item i is (values[s:s + window], values[s + window:s + window + horizon]) with
+    s = first + i * stride; both are views. Only windows entirely inside
+    [start, end] are included, so train and test windows never overlap the boundary.
+    """
+
+    def __init__(self, values, ts_ns=None, window=config.DATASET_WINDOW_SIZE,
+                 horizon=config.DATASET_HORIZON, stride=1, start=None, end=None):
+        self.values = values.reshape(-1) if values.ndim > 1 else values
+        self.window = window
+        self.horizon = horizon
+        self.stride = stride
+        span = window + horizon
+
+        lo, hi = 0, len(self.values)
+        if ts_ns is not None:
+            if start is not None:
+                lo = int(np.searchsorted(ts_ns, to_epoch_ns(start), side='left'))
+            if end is not None:
+                hi = int(np.searchsorted(ts_ns, to_epoch_ns(end), side='right'))
+        self.first = lo
+        self.n_windows = max((hi - lo - span) // stride + 1, 0)
+        # One strided view over the selected range: row s is the span starting at lo + s
+        self._spans = np.lib.stride_tricks.sliding_window_view(
+            self.values[lo:hi], span) if hi - lo >= span else np.empty((0, span), self.values.dtype)
+
+    @classmethod
+    def from_series(cls, values, index, split='train', **kwargs):
+        """Dataset for the Config train or test date range over a ts-indexed series"""
+        bounds = make_row_filter(split)
+        ts_ns = index.as_unit('ns').asi8
+        return cls(values, ts_ns, start=bounds['start'], end=bounds['end'], **kwargs)
+
+    def __len__(self):
+        return self.n_windows
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.n_windows:
+            raise IndexError(i)
+        span = self._spans[i * self.stride]
+        return span[:self.window], span[self.window:]
+
+    def _batch(self, positions):
+        """Gather one batch (the only copy made) as float arrays [batch, window], [batch, horizon]"""
+        spans = self._spans[positions * self.stride]
+        return spans[:, :self.window], spans[:, self.window:]
+
+    def _batch_positions(self, batch_size, shuffle, seed, drop_last):
+        """Window numbers per batch, shuffled block by block"""
+        rng = np.random.default_rng(seed)
+        block = max(config.DATASET_SHUFFLE_BLOCK // batch_size, 1) * batch_size
+        starts = np.arange(0, self.n_windows, block)
+        if shuffle:
+            rng.shuffle(starts)
+        for block_start in starts:
+            positions = np.arange(block_start, min(block_start + block, self.n_windows))
+            if shuffle:
+                rng.shuffle(positions)
+            for b in range(0, len(positions), batch_size):
+                batch = positions[b:b + batch_size]
+                if len(batch) == batch_size or not drop_last:
+                    yield batch
+
+    def iter_batches(self, batch_size=config.DATASET_BATCH_SIZE, shuffle=True, seed=None,
+                     drop_last=False, prefetch=config.DATASET_PREFETCH_BATCHES,
+                     workers=config.DATASET_WORKERS, as_torch=False):
+        """Yield (inputs, targets) mini-batches, gathered ahead on background threads
+
+        At most `prefetch` batches are in flight, so memory stays bounded; with
+        as_torch the batches are returned as torch tensors (zero-copy from numpy).
+        """
+        torch = optional_import('torch') if as_torch else None
+        batches = self._batch_positions(batch_size, shuffle, seed, drop_last)
+
+        def convert(batch):
+            inputs, targets = self._batch(batch)
+            if torch is not None:
+                return torch.from_numpy(inputs), torch.from_numpy(targets)
+            return inputs, targets
+
+        if not prefetch:
+            for batch in batches:
+                yield convert(batch)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(convert, batch))
+                if len(pending) >= prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+def build_window_datasets(scaled_data, index, name='scaled', dataset_dir=config.DATASET_DIR,
+                          **kwargs):
+    """Back the scaled series with a memmap file and return (train, test) window datasets"""
+    values = np.asarray(scaled_data).reshape(-1)
+    if dataset_dir:
+        values = write_series_memmap(values, Path(dataset_dir) / f"{config.TICKER_SYMBOL}_{name}.npy")
+    train = WindowDataset.from_series(values, index, 'train', **kwargs)
+    test = WindowDataset.from_series(values, index, 'test', **kwargs)
+    print(f"\nWindow datasets ({name}): {len(train):,} train / {len(test):,} test windows "
+          f"of {train.window} + {train.horizon} ticks")
+    return train, test
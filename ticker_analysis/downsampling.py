@@ -0,0 +1,120 @@
+"""Shape-preserving downsampling (min/max per bucket, LTTB) and a multi-resolution pyramid."""
+
+import numpy as np
+
+from .config import config
+
+def minmax_indices(values, target_points=config.DOWNSAMPLE_TARGET_POINTS):
+    """Row positions of the min and max of each equal-count bucket, in time order
+
+    Keeps every spike: each bucket of consecutive rows contributes its extremes, so at
+    most target_points rows are returned.
+    """
+    n = len(values)
+    if n <= target_points:
+        return np.arange(n)
+
+    size = -(-n // max(target_points // 2, 1))
+    n_buckets = -(-n // size)
+    padded = np.empty(n_buckets * size)
+    padded[:n] = values
+
+    # Pad the last bucket so it never wins the min or the max
+    base = np.arange(n_buckets) * size
+    padded[n:] = np.inf
+    lows = base + np.argmin(padded.reshape(n_buckets, size), axis=1)
+    padded[n:] = -np.inf
+    highs = base + np.argmax(padded.reshape(n_buckets, size), axis=1)
+    return np.unique(np.concatenate([lows, highs]))
+
+def lttb_indices(x, y, target_points=config.DOWNSAMPLE_TARGET_POINTS):
+    """Row positions picked by Largest-Triangle-Three-Buckets (keeps first and last rows)"""
+    n = len(y)
+    if n <= target_points or target_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64) - float(x[0])
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, target_points - 1).astype(np.int64)
+    counts = np.diff(edges)
+    # Bucket centroids, plus the last row as the centroid after the final bucket
+    mean_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts, y[-1])
+
+    picked = np.empty(target_points, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(target_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+def downsample_indices(values, target_points=config.DOWNSAMPLE_TARGET_POINTS,
+                       method=config.DOWNSAMPLE_METHOD, x=None):
+    """Row positions to plot for one series ('minmax' or 'lttb'; 'stride' is every k-th row)"""
+    if method == 'minmax':
+        return minmax_indices(values, target_points)
+    if method == 'lttb':
+        return lttb_indices(np.arange(len(values)) if x is None else x, values, target_points)
+    if method == 'stride':
+        return np.arange(0, len(values), max(len(values) // target_points, 1))
+    raise ValueError(f"Unknown downsampling method: {method!r}")
+
+def _to_ns(value):
+    """Epoch ns for a Timestamp, string or int (naive times are taken as UTC)"""
+    import pandas as pd
+
+    ts = pd.Timestamp(value)
+    return (ts.tz_localize('UTC') if ts.tz is None else ts).value
+
+class DownsamplePyramid:
+    """Progressively coarser min/max levels over one series, for zoomed views
+
+    Level 0 is the raw series; each level keeps the min/max of every `factor` points of
+    the level below (extremes of extremes are still the extremes). A view over any time
+    range picks the finest level that fits and decimates only that slice.
+    """
+
+    def __init__(self, ts_ns, values, factor=config.DOWNSAMPLE_PYRAMID_FACTOR,
+                 target_points=config.DOWNSAMPLE_TARGET_POINTS):
+        self.target_points = target_points
+        self.factor = factor
+        ts_ns = np.asarray(ts_ns, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+
+        # (row positions into the raw series, their ts, their values), finest first
+        self.levels = [(np.arange(len(values)), ts_ns, values)]
+        while len(self.levels[-1][0]) > target_points:
+            positions, level_ts, level_values = self.levels[-1]
+            keep = minmax_indices(level_values, 2 * len(level_values) // factor)
+            self.levels.append((positions[keep], level_ts[keep], level_values[keep]))
+
+    @classmethod
+    def from_frame(cls, df, column='price', **kwargs):
+        """Pyramid over one column of a ts-indexed frame"""
+        return cls(df.index.as_unit('ns').asi8, df[column].to_numpy(dtype=np.float64), **kwargs)
+
+    def view_indices(self, start=None, end=None, target_points=None):
+        """Raw row positions for [start, end] (ns, Timestamps or strings) within the budget"""
+        target_points = target_points or self.target_points
+        start = None if start is None else _to_ns(start)
+        end = None if end is None else _to_ns(end)
+
+        # Coarsest first, then refine while the next finer level still fits the budget
+        # within a factor, so the final decimation touches at most factor * budget points
+        chosen = None
+        for positions, level_ts, level_values in reversed(self.levels):
+            lo = 0 if start is None else np.searchsorted(level_ts, start, side='left')
+            hi = len(level_ts) if end is None else np.searchsorted(level_ts, end, side='right')
+            if chosen is not None and hi - lo > self.factor * target_points:
+                break
+            chosen = (positions[lo:hi], level_values[lo:hi])
+        positions, values = chosen
+        return positions[minmax_indices(values, target_points)]
+
+    def view(self, df, start=None, end=None, target_points=None):
+        """Rows of the frame the pyramid was built from, downsampled for [start, end]"""
+        return df.iloc[self.view_indices(start, end, target_points)]
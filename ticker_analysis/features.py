@@ -0,0 +1,180 @@
+"""Memoized derived features (bars, log prices, returns) shared across pipeline stages.
+
+Entries are keyed by a fingerprint of the input columns a feature reads (and the
+index) plus the transform parameters, and evicted least-recently-used past
+Config.FEATURE_CACHE_MAX_BYTES. Inputs that cannot change in place (TickFrames,
+read-only arrays) are hashed once per object. Cached results are shared between
+callers, so treat them as read-only.
+"""
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from .config import config
+
+def _column_values(values):
+    """Plain numpy values for hashing (categoricals by code, datetimes as int64)"""
+    if hasattr(values, 'cat'):
+        return values.cat.codes.to_numpy()
+    # pandas datetime columns and indexes (tz-aware ones would otherwise become objects)
+    asi8 = getattr(getattr(values, 'array', values), 'asi8', None)
+    if asi8 is not None:
+        return asi8
+    values = np.asarray(values)
+    return values.view('int64') if values.dtype.kind in 'mM' else values
+
+def data_fingerprint(data, sample_rows=config.FEATURE_FINGERPRINT_ROWS, columns=None):
+    """Content fingerprint of a frame, series or array
+
+    Hashes the shape, column names and dtypes, and every value (index included)
+    straight from the column buffers, so any change to the data changes the key.
+    columns limits a frame to the columns a feature reads (missing ones are skipped).
+    sample_rows (opt-in) hashes only a strided sample of about that many rows plus
+    the last one. That is much faster on hundreds of millions of rows, but an edit
+    between sampled rows keeps the old key and returns a stale cached result.
+    """
+    digest = hashlib.sha256()
+    n = len(data)
+    step = max(n // sample_rows, 1) if sample_rows else 1
+    digest.update(f"{type(data).__name__}|{n}|{step}".encode())
+
+    from .ticks import TickFrame
+
+    if isinstance(data, TickFrame):
+        # The encoded arrays, so nothing is decoded just to be hashed
+        selected = [(name, values) for name, values in data.arrays.items()
+                    if columns is None or name in columns]
+    elif hasattr(data, 'columns'):
+        selected = [(name, data[name]) for name in data.columns
+                    if columns is None or name in columns]
+    elif hasattr(data, 'index'):
+        selected = [(data.name, data)]
+    else:
+        selected = [(None, data)]
+    if hasattr(data, 'index'):
+        selected.append(('__index__', data.index))
+
+    for name, values in selected:
+        values = _column_values(values)
+        digest.update(f"|{name}|{values.dtype}".encode())
+        if not n:
+            continue
+        if step > 1:
+            values = np.concatenate([values[::step], values[-1:]])
+        if values.dtype == object:
+            # Hash the objects themselves, not their addresses
+            import pandas as pd
+
+            values = pd.util.hash_array(values)
+        digest.update(memoryview(np.ascontiguousarray(values)).cast('B'))
+    return digest.hexdigest()[:20]
+
+def result_nbytes(value):
+    """Approximate in-memory size of a result (frame, series, array or tuple of them)"""
+    if hasattr(value, 'memory_usage'):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if isinstance(value, tuple):
+        return sum(result_nbytes(item) for item in value)
+    return int(getattr(value, 'nbytes', 0))
+
+class FeatureCache:
+    """Size-bounded LRU of derived results keyed by (name, input fingerprint, params)
+
+    Safe to share between threads: the entries are locked, the computations are not.
+    """
+
+    def __init__(self, max_bytes=config.FEATURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, data, columns=None):
+        """data_fingerprint, memoized per object for inputs that cannot change in place
+
+        TickFrames and read-only arrays are hashed once and remembered until they are
+        garbage collected; frames and writable arrays are hashed on every call.
+        """
+        from .ticks import TickFrame
+
+        immutable = isinstance(data, TickFrame) or \
+            (isinstance(data, np.ndarray) and not data.flags.writeable)
+        if not immutable:
+            return data_fingerprint(data, columns=columns)
+        key = (id(data), None if columns is None else tuple(columns))
+        with self._lock:
+            fingerprint = self._fingerprints.get(key)
+        if fingerprint is None:
+            fingerprint = data_fingerprint(data, columns=columns)
+            with self._lock:
+                if key not in self._fingerprints:
+                    weakref.finalize(data, self._fingerprints.pop, key, None)
+                self._fingerprints[key] = fingerprint
+        return fingerprint
+
+    def get_or_compute(self, name, data, params, compute, fingerprint=None, columns=None):
+        """Return the cached result for this input and params, computing it on a miss
+
+        columns: the input columns compute reads; only they (and the index) are hashed.
+        fingerprint: data_fingerprint(data) computed once by a caller whose data does
+        not change, so repeated lookups skip hashing it.
+        """
+        fingerprint = fingerprint or self.fingerprint(data, columns)
+        key = (name, fingerprint, tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        size = result_nbytes(value)
+        if size <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = (value, size)
+                    self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.nbytes -= evicted
+        return value
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+# Shared by every stage in the process
+feature_cache = FeatureCache()
+
+def cached_bars(df, freq='1min', price_col='price', size_col='size',
+                trades_only=config.BARS_TRADES_ONLY):
+    """build_bars, memoized on the columns it reads and the bar parameters"""
+    from .bars import build_bars
+
+    columns = [price_col, size_col] + (['action'] if trades_only else [])
+    params = dict(freq=freq, price_col=price_col, size_col=size_col, trades_only=trades_only)
+    return feature_cache.get_or_compute('bars', df, params,
+                                        lambda: build_bars(df, **params), columns=columns)
+
+def cached_log_prices(df, log_base=config.LOG_BASE, epsilon=config.LOG_EPSILON):
+    """log(price + epsilon) in the given base as a Series, memoized"""
+    def compute():
+        return np.log(df['price'] + epsilon) / np.log(log_base)
+
+    return feature_cache.get_or_compute('log_prices', df,
+                                        dict(log_base=log_base, epsilon=epsilon), compute,
+                                        columns=['price'])
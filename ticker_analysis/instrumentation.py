@@ -0,0 +1,219 @@
+"""Per-stage metrics (time, rows, bytes, memory) and an opt-in sampling profiler.
+
+StageMetrics wraps each pipeline stage and records wall and CPU time, rows in and
+out, bytes read, rows/sec and peak RSS. Records are appended as JSON lines to
+Config.METRICS_PATH (when set) and summarized after the run. Naming a stage in
+Config.PROFILE_STAGE (or --profile) samples its call stacks on a background thread.
+The stacks are written in collapsed format, which flamegraph.pl and speedscope read.
+"""
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .config import config
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS mark for this process (Linux only); True on success"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def rss_bytes(field='VmRSS'):
+    """Current (VmRSS) or peak (VmHWM) resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Elsewhere only the lifetime peak is known (KiB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def read_bytes():
+    """Bytes this process has read through read() calls so far (None where unknown)"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def count_rows(value):
+    """Row count of a stage input or output (the first item of a tuple), or None"""
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    if value is None or isinstance(value, (str, bytes, dict)):
+        return None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+class SamplingProfiler:
+    """Samples one thread's Python call stack at a fixed interval from a background thread
+
+    Overhead is one stack walk per interval. Time spent in C code that releases the
+    GIL (numpy, Arrow) is attributed to the Python line that called into it.
+    """
+
+    def __init__(self, interval=config.PROFILE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).stem}.{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name='sampling-profiler',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def top(self, n=15):
+        """[(frame, self samples, total samples)] of the n frames with most total samples"""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return [(frame, own[frame], count) for frame, count in total.most_common(n)]
+
+    def write_collapsed(self, path):
+        """Write 'frame;frame;frame count' lines (flamegraph.pl / speedscope input)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(''.join(f"{stack} {count}\n" for stack, count in self.stacks.items()))
+        return path
+
+class StageMetrics:
+    """Records one metrics dict per pipeline stage and emits each as a JSON line"""
+
+    def __init__(self, path=config.METRICS_PATH, profile_stage=config.PROFILE_STAGE,
+                 profile_dir=config.PROFILE_DIR, profile_interval=config.PROFILE_INTERVAL):
+        self.path = path
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.profile_interval = profile_interval
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None, step=None, steps=None):
+        """Measure the enclosed block; set record['rows_out'] inside it when known"""
+        from .features import result_nbytes
+
+        record = {'run_id': self.run_id, 'stage': name, 'step': step, 'steps': steps,
+                  'rows_in': rows_in, 'rows_out': None}
+        profiler = None
+        if self.profile_stage == name:
+            profiler = SamplingProfiler(self.profile_interval).start()
+        rss_before = rss_bytes()
+        peak_tracked = reset_peak_rss()
+        read_before = read_bytes()
+        started = datetime.now(timezone.utc)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            if profiler is not None:
+                profiler.stop()
+            read_after = read_bytes()
+            peak = rss_bytes('VmHWM') if peak_tracked else rss_bytes()
+            output = record.pop('output', None)
+            # A stage that produced nothing (e.g. skipped) has no throughput
+            rows = None if record['rows_out'] is None else \
+                max(record['rows_in'] or 0, record['rows_out'])
+            record.update(
+                started=started.isoformat(timespec='milliseconds'),
+                wall_s=round(wall, 6), cpu_s=round(cpu, 6),
+                bytes_read=None if read_before is None else read_after - read_before,
+                bytes_out=result_nbytes(output) if output is not None else None,
+                rows_per_sec=round(rows / wall, 1) if rows and wall else None,
+                peak_rss_bytes=peak, rss_delta_bytes=rss_bytes() - rss_before)
+            if profiler is not None:
+                record['profile'] = str(self._write_profile(name, profiler))
+            self.records.append(record)
+            self.emit(record)
+
+    def _write_profile(self, name, profiler):
+        path = profiler.write_collapsed(
+            Path(self.profile_dir) / f"{self.run_id}_{name}.collapsed")
+        print(f"\nSampling profile of '{name}' ({profiler.samples:,} samples every "
+              f"{self.profile_interval * 1000:g} ms) written to {path}")
+        print(f"{'self':>7} {'total':>7}  frame")
+        for frame, own, total in profiler.top():
+            print(f"{own / profiler.samples:>7.1%} {total / profiler.samples:>7.1%}  {frame}")
+        return path
+
+    def emit(self, record):
+        """Append one record as a JSON line to the metrics file (if any)"""
+        if not self.path:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def print_summary(self):
+        """One line per recorded stage"""
+        if not self.records:
+            return
+        print(f"\nStage metrics (run {self.run_id}):")
+        print(f"{'stage':<15}{'wall s':>9}{'cpu s':>9}{'rows in':>14}{'rows out':>14}"
+              f"{'rows/s':>13}{'read MiB':>10}{'peak MiB':>10}")
+        for r in self.records:
+            print(f"{r['stage']:<15}{r['wall_s']:>9.3f}{r['cpu_s']:>9.3f}"
+                  f"{_fmt_int(r['rows_in']):>14}{_fmt_int(r['rows_out']):>14}"
+                  f"{_fmt_int(r['rows_per_sec']):>13}{_fmt_mib(r['bytes_read']):>10}"
+                  f"{_fmt_mib(r['peak_rss_bytes']):>10}")
+        if self.path:
+            print(f"Metrics appended to {os.path.abspath(self.path)}")
+
+def _fmt_int(value):
+    return '-' if value is None else f"{int(value):,}"
+
+def _fmt_mib(value):
+    return '-' if value is None else f"{value / 2**20:,.0f}"
@@ -0,0 +1,545 @@
+"""CSV ingestion: parallel CPU engine (pyarrow) and GPU engine (cuDF)."""
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from tqdm.auto import tqdm
+
+from ._compat import gpu_available, optional_import
+from .cache import (evict_cache, index_cached_entry, iter_cached_tables, load_cache_manifest,
+                    lookup_cached_files, matching_partitions, prune_stale_cache_entries,
+                    read_cached_table, save_cache_manifest, write_cached_table)
+from .compression import (CSV_PATTERNS, compression_of, estimated_csv_bytes, open_csv_source,
+                          read_csv_header)
+from .config import config, error_msgs
+from .ticks import TickFrame, narrow_int_dtype
+from .time_index import filter_columns, filter_table
+from .timestamps import (ISO_NS_WIDTH, LATENCY_DTYPES, LATENCY_INPUTS, latency_columns,
+                         parse_iso_ns_chars)
+
+def _arrow_column_types(columns, tz='UTC'):
+    """Map Config.CSV_DTYPES onto pyarrow types for the requested columns"""
+    types = {}
+    for col in columns:
+        dtype = config.CSV_DTYPES[col]
+        if dtype == 'datetime64[ns]':
+            types[col] = pa.timestamp('ns', tz=tz)
+        elif dtype == 'category':
+            types[col] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            types[col] = pa.from_numpy_dtype(np.dtype(dtype))
+    return types
+
+def _csv_column_names(file):
+    """Names of a file's columns, by header when it has them all, else by position
+
+    A header naming every Config.CSV_COLUMNS column is used as is, so optional MBO
+    columns (order_id) load by name in any order. Other headers are ignored and the
+    columns are taken to be Config.CSV_COLUMNS.
+    """
+    header = read_csv_header(file)
+    return header if set(config.CSV_COLUMNS) <= set(header) else config.CSV_COLUMNS
+
+def _loadable_columns(names):
+    """Config.CSV_COLUMNS plus the optional columns present among a file's names"""
+    return config.CSV_COLUMNS + [col for col in config.CSV_OPTIONAL_COLUMNS if col in names]
+
+def _default_columns(files):
+    """Config.CSV_COLUMNS plus the optional columns every file has"""
+    names = [set(_csv_column_names(file)) for file in files]
+    return config.CSV_COLUMNS + [col for col in config.CSV_OPTIONAL_COLUMNS
+                                 if all(col in n for n in names)]
+
+def _csv_options(columns, names, block_size):
+    """pyarrow read and convert options for the given columns of a file"""
+    return dict(read_options=pa_csv.ReadOptions(skip_rows=1,
+                                                column_names=names,
+                                                block_size=block_size),
+                convert_options=pa_csv.ConvertOptions(include_columns=columns,
+                                                      column_types=_arrow_column_types(columns)))
+
+def _parse_csv_table(file, columns, names=None, block_size=config.CPU_BLOCK_SIZE):
+    """Parse one CSV file (plain, or streamed out of a .gz/.zst) into an arrow table"""
+    names = names or _csv_column_names(file)
+    source = open_csv_source(file)
+    try:
+        return pa_csv.read_csv(source, **_csv_options(columns, names, block_size))
+    finally:
+        if source is not file:
+            source.close()
+
+def _stream_csv_batches(file, columns, names=None, block_size=config.COMPACT_BLOCK_SIZE):
+    """Parse one CSV file as a stream of arrow record batches of block_size bytes of text"""
+    names = names or _csv_column_names(file)
+    source = open_csv_source(file)
+    try:
+        yield from pa_csv.open_csv(source, **_csv_options(columns, names, block_size))
+    finally:
+        if source is not file:
+            source.close()
+
+def _table_to_arrays(table, columns):
+    """Convert an arrow table into typed numpy arrays (categoricals as codes + categories)"""
+    table = table.unify_dictionaries().combine_chunks()
+
+    arrays = {}
+    for col in columns:
+        chunk = table.column(col).chunk(0) if table.column(col).num_chunks else None
+        if config.CSV_DTYPES[col] == 'category':
+            if chunk is None:
+                arrays[col] = (np.empty(0, dtype=np.int32), [])
+            else:
+                arrays[col] = (chunk.indices.to_numpy(zero_copy_only=False),
+                               chunk.dictionary.to_pylist())
+        elif chunk is None:
+            arrays[col] = np.empty(0, dtype=config.CSV_DTYPES[col])
+        else:
+            arrays[col] = chunk.to_numpy(zero_copy_only=False)
+    return arrays
+
+def _add_latency(arrays):
+    """Add the ingest latency columns, computed from the freshly parsed timestamps"""
+    arrays.update(latency_columns(arrays['ts_recv'].view(np.int64),
+                                  arrays['ts_event'].view(np.int64),
+                                  arrays['ts_in_delta'].astype(np.int64)))
+    return arrays
+
+def _read_csv_file_cpu(file, columns, cache_dir=None, cache_entry=None, row_filter=None,
+                       latency=False):
+    """Load one file from the cache, or parse it (and cache it); returns (arrays, new entry)"""
+    if cache_entry is not None:
+        table = read_cached_table(cache_entry, columns, cache_dir, row_filter)
+        arrays = _table_to_arrays(table, columns)
+        return (_add_latency(arrays) if latency else arrays), None
+
+    # Cache misses parse every column so the entry can serve any later projection
+    names = _csv_column_names(file)
+    parse_columns = _loadable_columns(names) if cache_dir else \
+        list(dict.fromkeys(list(columns) + filter_columns(row_filter)))
+    table = _parse_csv_table(file, parse_columns, names)
+    entry = write_cached_table(file, table, cache_dir) if cache_dir else None
+    arrays = _table_to_arrays(filter_table(table, row_filter), columns)
+    return (_add_latency(arrays) if latency else arrays), entry
+
+def _iter_file_tables(file, columns, cache_dir=None, cache_entry=None, row_filter=None,
+                      manifest=None):
+    """One file's requested columns as a series of arrow tables, for the compact loader
+
+    Cached files come one partition at a time and uncached ones are streamed in
+    Config.COMPACT_BLOCK_SIZE batches, so only a block of full-width rows is held at
+    once. A cache miss with a cache directory is parsed whole, so its entry can be
+    written (and added to manifest).
+    """
+    if cache_entry is not None:
+        yield from iter_cached_tables(cache_entry, columns, cache_dir, row_filter)
+        return
+    names = _csv_column_names(file)
+    if cache_dir:
+        table = _parse_csv_table(file, _loadable_columns(names), names)
+        entry = write_cached_table(file, table, cache_dir)
+        manifest[entry['key']] = entry
+        yield filter_table(table, row_filter).select(columns)
+        return
+    parse_columns = list(dict.fromkeys(list(columns) + filter_columns(row_filter)))
+    for batch in _stream_csv_batches(file, parse_columns, names):
+        yield filter_table(pa.Table.from_batches([batch]), row_filter).select(columns)
+
+def _plan_cached_reads(files, cache_hits, row_filter, cache_dir=None):
+    """Drop cached files the time index rules out; estimate the rows left to load"""
+    skipped, est_rows = [], 0
+    for file in files:
+        entry = cache_hits.get(file)
+        if entry is None:
+            est_rows += estimated_csv_bytes(file) // config.CSV_BYTES_PER_ROW
+            continue
+        if row_filter is not None:
+            index_cached_entry(entry, cache_dir)
+        dates = matching_partitions(entry, row_filter)
+        if not dates:
+            skipped.append(file)
+        index = entry.get('index') or {}
+        est_rows += sum(index[d]['rows'] if d in index else
+                        estimated_csv_bytes(file) // config.CSV_BYTES_PER_ROW //
+                        len(entry['partitions'])
+                        for d in dates)
+    return [f for f in files if f not in skipped], len(skipped), est_rows
+
+class _ColumnBuffer:
+    """Growable column used to combine per-file results without a final concat
+
+    narrow integer (and categorical code) buffers start one byte wide and are widened
+    only as far as the values appended need.
+    """
+
+    def __init__(self, dtype, capacity, categorical=False, narrow=False):
+        self.categorical = categorical
+        self.narrow = narrow
+        self.categories = {}
+        self.size = 0
+        if narrow:
+            dtype = np.int8 if categorical else np.uint8
+        elif categorical:
+            dtype = np.int32
+        self.data = np.empty(max(int(capacity), 1), dtype=dtype)
+
+    def append(self, values):
+        """Copy one file's values onto the end of the buffer"""
+        if self.categorical:
+            codes, categories = values
+            # Remap this file's dictionary codes onto the global category list
+            lookup = np.array([self.categories.setdefault(c, len(self.categories))
+                               for c in categories], dtype=np.int32)
+            values = lookup[codes] if len(codes) else codes
+        if self.narrow and len(values):
+            fits = np.array([-1, len(self.categories)]) if self.categorical else values
+            dtype = np.promote_types(self.data.dtype, narrow_int_dtype(fits))
+            if dtype != self.data.dtype:
+                self.data = self.data.astype(dtype)
+
+        end = self.size + len(values)
+        if end > len(self.data):
+            grown = np.empty(max(end, int(len(self.data) * 1.5)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+    def finalize(self):
+        """Return the filled part of the buffer, releasing over-allocated capacity"""
+        data = self.data[:self.size]
+        if len(self.data) > self.size * 1.1:
+            data = data.copy()
+        self.data = None
+        if self.categorical:
+            return pd.Categorical.from_codes(data, categories=list(self.categories))
+        return data
+
+def _read_files_parallel(files, columns, out_columns, buffers, max_workers, executor,
+                         cache_dir=None, cache_hits=None, row_filter=None, latency=False,
+                         manifest=None):
+    """Parse files in a thread or process pool, appending each to buffers as it completes
+
+    Returns the number of files read.
+    """
+    pool_cls = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    n_read = 0
+    with pool_cls(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_read_csv_file_cpu, file, columns, cache_dir, cache_hits.get(file),
+                        row_filter, latency): file
+            for file in files
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Reading CSVs"):
+            file = futures.pop(future)
+            try:
+                arrays, entry = future.result()
+            except Exception as e:
+                print(error_msgs.FILE_READ_ERROR.format(file.name, e))
+                continue
+            if entry is not None:
+                manifest[entry['key']] = entry
+
+            # Append and drop the per-file arrays straight away
+            for col in out_columns:
+                buffers[col].append(arrays[col])
+            del arrays
+            n_read += 1
+    return n_read
+
+def _compact_buffer(column, dtype, capacity):
+    """Column buffer holding one loaded column the way a TickFrame stores it"""
+    if dtype == 'category':
+        return _ColumnBuffer(None, capacity, categorical=True, narrow=True)
+    if column == 'ts_event':
+        return _ColumnBuffer(np.int64, capacity)
+    if np.dtype(dtype).kind == 'f':
+        return _ColumnBuffer(dtype, capacity)
+    # Integers, and other timestamps as offsets from ts_event
+    return _ColumnBuffer(None, capacity, narrow=True)
+
+def _read_files_compact(files, columns, out_columns, dtypes, est_rows, cache_dir=None,
+                        cache_hits=None, row_filter=None, latency=False, manifest=None):
+    """Stream files one after another into compact buffers; returns (TickFrame, files read)
+
+    Each table's columns are appended as TickFrame stores them (see ticks.py), so no
+    full-width frame of every row is ever built. Prices stay float64 until
+    adjust_for_splits encodes them.
+    """
+    buffers = {col: _compact_buffer(col, dtypes[col], est_rows) for col in out_columns}
+    n_read = 0
+    for file in tqdm(files, desc="Reading CSVs"):
+        sizes = {col: buffer.size for col, buffer in buffers.items()}
+        try:
+            for table in _iter_file_tables(file, columns, cache_dir, cache_hits.get(file),
+                                           row_filter, manifest):
+                arrays = _table_to_arrays(table, columns)
+                del table
+                if latency:
+                    _add_latency(arrays)
+                ts_event = arrays['ts_event'].view(np.int64)
+                for col in out_columns:
+                    values = arrays.pop(col)
+                    if getattr(values, 'dtype', None) is not None and values.dtype.kind == 'M':
+                        values = values.view(np.int64)
+                        if col != 'ts_event':
+                            values = values - ts_event
+                    buffers[col].append(values)
+        except Exception as e:
+            # Drop the rows of a file that failed part way through
+            for col, buffer in buffers.items():
+                buffer.size = sizes[col]
+            print(error_msgs.FILE_READ_ERROR.format(file.name, e))
+            continue
+        n_read += 1
+
+    ts_ns = buffers.pop('ts_event').finalize()
+    arrays, encodings = {}, {}
+    for col in list(buffers):
+        values = buffers.pop(col).finalize()
+        if isinstance(values, pd.Categorical):
+            arrays[col], encodings[col] = values.codes, ('category', values.categories)
+        else:
+            arrays[col] = values
+            # Naive, like the timestamp columns of the frame the parallel path returns
+            encodings[col] = ('ts_offset', None) if np.dtype(dtypes[col]).kind == 'M' \
+                else ('plain', None)
+    return TickFrame.from_encoded(ts_ns, arrays, encodings), n_read
+
+def _list_csv_files(directory_path):
+    """CSV files (plain, .csv.gz or .csv.zst) in the data directory (defaults to Config.DATA_DIR)"""
+    directory_path = directory_path or config.DATA_DIR
+    if not Path(directory_path).is_dir():
+        raise ValueError(error_msgs.DIR_NOT_FOUND.format(directory_path))
+    return sorted(file for pattern in CSV_PATTERNS for file in Path(directory_path).glob(pattern))
+
+def read_and_combine_csv_files_cpu(directory_path=None, columns=None,
+                                   max_workers=config.CPU_MAX_WORKERS,
+                                   executor=config.CPU_EXECUTOR,
+                                   cache_dir=config.CACHE_DIR, row_filter=None,
+                                   latency=config.INGEST_LATENCY, files=None,
+                                   dedup=config.DEDUP_TICKS, compact=False):
+    """Load and combine CSV files in parallel on the CPU
+
+    row_filter (see make_row_filter) is pushed down: cached files and partitions
+    outside it are skipped using the time index, the rest are filtered in Arrow.
+    With latency, each file's ingest latency columns (see timestamps.latency_columns)
+    are computed right after it is parsed and appended as columns. files restricts
+    the load to those paths; dedup drops rows repeated across overlapping files.
+    With compact, a TickFrame is returned instead of a DataFrame. Files are then read
+    one at a time, streamed in small blocks straight into narrow columns, which bounds
+    the peak memory rather than parsing files in parallel.
+    """
+    files = _list_csv_files(directory_path) if files is None else [Path(f) for f in files]
+    if not files:
+        raise ValueError(error_msgs.NO_FILES_READ)
+    columns = list(columns or _default_columns(files))
+    if compact and 'ts_event' not in columns:
+        columns.insert(0, 'ts_event')
+    latency = latency and all(col in columns for col in LATENCY_INPUTS)
+    out_columns = columns + list(LATENCY_DTYPES) if latency else columns
+    dtypes = {**config.CSV_DTYPES, **LATENCY_DTYPES}
+
+    manifest = load_cache_manifest(cache_dir) if cache_dir else {}
+    cache_hits = {}
+    if cache_dir:
+        prune_stale_cache_entries(manifest, files, cache_dir)
+        cache_hits = lookup_cached_files(manifest, files, columns, cache_dir)
+
+    # Pre-size the combined columns from the rows that can pass the filter
+    files, n_skipped, est_rows = _plan_cached_reads(files, cache_hits, row_filter, cache_dir)
+    if compact:
+        ticks, n_read = _read_files_compact(files, columns, out_columns, dtypes, est_rows,
+                                            cache_dir, cache_hits, row_filter, latency, manifest)
+    else:
+        buffers = {
+            col: _ColumnBuffer(dtypes[col], est_rows, categorical=dtypes[col] == 'category')
+            for col in out_columns
+        }
+        n_read = _read_files_parallel(files, columns, out_columns, buffers, max_workers,
+                                      executor, cache_dir, cache_hits, row_filter, latency,
+                                      manifest)
+
+    if not n_read and not n_skipped:
+        raise ValueError(error_msgs.NO_FILES_READ)
+    # Hand the parse buffers Arrow's allocator keeps cached back to the OS
+    pa.default_memory_pool().release_unused()
+
+    if cache_dir:
+        evict_cache(manifest, cache_dir)
+        save_cache_manifest(manifest, cache_dir)
+
+    if compact:
+        combined_df = ticks
+    else:
+        # Each column keeps its own buffer (no consolidating copy), so it can be freed alone
+        combined_df = pd.DataFrame({col: buffers.pop(col).finalize() for col in out_columns},
+                                   copy=False)
+    n_duplicates = 0
+    if dedup:
+        from .incremental import drop_duplicate_ticks
+
+        combined_df, n_duplicates = drop_duplicate_ticks(combined_df)
+        if not compact:
+            combined_df = combined_df.reset_index(drop=True)
+    print(f"\nProcessed {n_read} files ({len(cache_hits) - n_skipped} from cache, "
+          f"{n_skipped} skipped by the time index), {len(combined_df):,} total rows"
+          + (f" ({n_duplicates:,} duplicates dropped)" if dedup else ""))
+    if compact:
+        print(f"Time range: {combined_df.index.min()} to {combined_df.index.max()}")
+    elif 'ts_event' in combined_df:
+        print(f"Time range: {combined_df['ts_event'].min()} to {combined_df['ts_event'].max()}")
+
+    return combined_df
+
+"""# GPU data loading"""
+
+def _parse_timestamps_gpu(values):
+   """Parse a cuDF string column of fixed-format timestamps on the GPU
+
+   The characters are decoded as an (n, 30) digit matrix in cupy; columns of any
+   other shape go through cudf.to_datetime.
+   """
+   cudf, cupy = optional_import('cudf'), optional_import('cupy')
+   if len(values) and bool((values.str.len() == ISO_NS_WIDTH).all()):
+       chars = values.str.code_points().values.astype(cupy.uint8).reshape(-1, ISO_NS_WIDTH)
+       ts_ns, ok = parse_iso_ns_chars(chars, xp=cupy)
+       if bool(ok.all()):
+           return cudf.Series(ts_ns.view('datetime64[ns]'), index=values.index)
+   return cudf.to_datetime(values)
+
+def _gpu_frame(table):
+   """cuDF frame of an arrow table in the loader dtypes (naive UTC timestamps)"""
+   cudf = optional_import('cudf')
+   return cudf.DataFrame.from_arrow(table.cast(pa.schema(
+       _arrow_column_types(table.column_names, tz=None).items())))
+
+def _read_csv_file_gpu(file, columns, cache_dir, cache_entry, row_filter=None):
+   """Load one file onto the GPU from the cache, or parse it with cuDF (and cache it)"""
+   cudf = optional_import('cudf')
+   if cache_entry is not None:
+       return _gpu_frame(read_cached_table(cache_entry, columns, cache_dir, row_filter)), None
+
+   names = _csv_column_names(file)
+   usecols = _loadable_columns(names) if cache_dir or row_filter else columns
+   codec = compression_of(file)
+   if codec == 'zstd':
+       # cuDF's CSV reader has no zstd codec: parse it with pyarrow from the streamed
+       # decompression, so the host holds the parsed columns but never the whole text
+       table = _parse_csv_table(file, usecols, names)
+       entry = write_cached_table(file, table, cache_dir) if cache_dir else None
+       if row_filter:
+           table = filter_table(table, row_filter)
+       return _gpu_frame(table.select(columns)), entry
+
+   # Plain files and gzip archives are read (and inflated) by cuDF itself
+   df = cudf.read_csv(str(file),
+                      compression=codec,
+                      skiprows=1,
+                      names=names,
+                      usecols=usecols,
+                      skipinitialspace=True)
+   if not cache_dir and not row_filter:
+       return df, None
+
+   # Apply the fixed dtypes so the entry matches those written by the CPU engine
+   for col in df.columns:
+       dtype = config.CSV_DTYPES[col]
+       df[col] = _parse_timestamps_gpu(df[col]) if dtype == 'datetime64[ns]' else df[col].astype(dtype)
+   table = df.to_arrow()
+   table = table.cast(pa.schema(_arrow_column_types(table.column_names).items()))
+   entry = write_cached_table(file, table, cache_dir) if cache_dir else None
+   if row_filter:
+       return _gpu_frame(filter_table(table, row_filter).select(columns)), entry
+   return df[columns], entry
+
+def read_and_combine_csv_files_gpu(directory_path=None, engine=config.INGEST_ENGINE,
+                                   columns=None, cache_dir=config.CACHE_DIR, row_filter=None,
+                                   latency=config.INGEST_LATENCY, files=None,
+                                   dedup=config.DEDUP_TICKS, compact=False):
+   """Load and combine CSV files using GPU acceleration (or the parallel CPU engine)
+
+   compact applies to the CPU engine (a TickFrame, see read_and_combine_csv_files_cpu);
+   GPU frames are compacted by adjust_for_splits.
+   """
+   if engine == 'auto':
+       engine = 'gpu' if gpu_available() else 'cpu'
+   if engine == 'cpu':
+       return read_and_combine_csv_files_cpu(directory_path, columns=columns,
+                                             cache_dir=cache_dir, row_filter=row_filter,
+                                             latency=latency, files=files, dedup=dedup,
+                                             compact=compact)
+
+   cudf = optional_import('cudf')
+   dfs = []
+   files = _list_csv_files(directory_path) if files is None else [Path(f) for f in files]
+   columns = list(columns or _default_columns(files))
+
+   manifest = load_cache_manifest(cache_dir) if cache_dir else {}
+   cache_hits = {}
+   if cache_dir:
+       prune_stale_cache_entries(manifest, files, cache_dir)
+       cache_hits = lookup_cached_files(manifest, files, columns, cache_dir)
+   files, n_skipped, _ = _plan_cached_reads(files, cache_hits, row_filter, cache_dir)
+
+   # Read files
+   for file in tqdm(files, desc="Reading CSVs"):
+       try:
+           df, entry = _read_csv_file_gpu(file, columns, cache_dir, cache_hits.get(file),
+                                          row_filter)
+           if entry is not None:
+               manifest[entry['key']] = entry
+
+           # Show sample data for first file
+           if len(dfs) == 1:
+               print("\nSample data:")
+               print(df.head())
+               print("\nColumn types:")
+               print(df.dtypes)
+
+           dfs.append(df)
+
+       except Exception as e:
+           print(f"Error reading {file.name}: {e}")
+
+   if not dfs:
+       raise ValueError(error_msgs.NO_FILES_READ)
+
+   if cache_dir:
+       evict_cache(manifest, cache_dir)
+       save_cache_manifest(manifest, cache_dir)
+
+   # Process data
+   with tqdm(total=3, desc="Processing data") as pbar:
+       # Combine dataframes
+       combined_df = cudf.concat(dfs, ignore_index=True)
+       if dedup:
+           # Overlapping exports repeat rows; keep the first copy of each event
+           from .incremental import DEDUP_COLUMNS
+           subset = [col for col in DEDUP_COLUMNS if col in combined_df.columns]
+           combined_df = combined_df.drop_duplicates(subset=subset, keep='first',
+                                                     ignore_index=True)
+       pbar.update(1)
+
+       # Convert both timestamps (already typed when read through the cache or pyarrow)
+       for col in ('ts_recv', 'ts_event'):
+           if col in combined_df.columns and combined_df[col].dtype == 'object':
+               combined_df[col] = _parse_timestamps_gpu(combined_df[col])
+       if latency and all(col in combined_df.columns for col in LATENCY_INPUTS):
+           for col, values in latency_columns(
+                   combined_df['ts_recv'].values.view('int64'),
+                   combined_df['ts_event'].values.view('int64'),
+                   combined_df['ts_in_delta'].values.astype('int64')).items():
+               combined_df[col] = values
+       pbar.update(1)
+
+       # Print summary
+       print(f"\nProcessed {len(dfs)} files ({n_skipped} skipped by the time index), "
+             f"{len(combined_df):,} total rows")
+       print(f"Time range: {combined_df['ts_event'].min()} to {combined_df['ts_event'].max()}")
+       pbar.update(1)
+
+   return combined_df
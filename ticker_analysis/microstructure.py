@@ -0,0 +1,250 @@
+"""Intraday microstructure features in one chunked pass over the tick arrays.
+
+Realized measures are computed from executions only (Config.TRADE_ACTIONS), so quote
+and cancel events do not move the sampled prices. Per session day they are:
+- realized variance (the sum of squared log returns);
+- bipower variation (pi/2 times the sum of adjacent absolute return products), which
+  is robust to jumps.
+Both use previous-tick sampling at every frequency in Config.MICROSTRUCTURE_FREQS.
+Only the finest frequency reads the ticks; every coarser grid is sampled from the
+finest grid's last ticks, so all frequencies come from the same pass. Activity is
+binned at Config.MICROSTRUCTURE_BIN_FREQ: event and trade counts, volume, VWAP, the
+session-to-date VWAP and trades per second.
+
+Ticks arrive chunk by chunk. The pieces of the session day still open at the end of
+a chunk are held back, and joined once when a later chunk starts the next day, so
+memory is bounded by one chunk plus one day and no row is copied more than once.
+The mean daily realized variance per frequency gives the volatility signature plot.
+"""
+
+import numpy as np
+
+from .bars import bar_index, bucket_ids, freq_ns
+from .config import config, plot_colors, plot_labels
+
+MEASURES = ('rv', 'bv', 'n')
+
+def _group_ends(*keys):
+    """Last position of every run of equal consecutive keys"""
+    change = np.zeros(len(keys[0]) - 1, dtype=bool)
+    for key in keys:
+        change |= key[1:] != key[:-1]
+    return np.append(np.flatnonzero(change), len(keys[0]) - 1)
+
+def _per_day(days, values, out_days):
+    """Sum values by day onto the sorted out_days"""
+    return np.bincount(np.searchsorted(out_days, days), weights=values, minlength=len(out_days))
+
+def realized_measures(ts_ns, price, day, freqs, out_days=None):
+    """(out_days, {freq: (rv, bv, n)}) from time-ordered trade prices and their session days
+
+    out_days (default: the distinct days) must be sorted and include every day given.
+    """
+    out_days = np.unique(day) if out_days is None else out_days
+    widths = sorted((freq_ns(freq), freq) for freq in freqs)
+    measures = {}
+    if not len(price):
+        zeros = np.zeros(len(out_days))
+        return out_days, {freq: (zeros, zeros, zeros) for freq in freqs}
+
+    # Last trade of every finest-grid bucket; coarser grids sample these
+    ends = _group_ends(ts_ns // widths[0][0], day)
+    fine_ts, fine_log, fine_day = ts_ns[ends], np.log(price[ends]), day[ends]
+    for width, freq in widths:
+        ends = _group_ends(fine_ts // width, fine_day)
+        log_close, close_day = fine_log[ends], fine_day[ends]
+        r = np.diff(log_close)
+        same = close_day[1:] == close_day[:-1]
+        r = np.where(same, r, 0.0)
+        adjacent = same[1:] & same[:-1]
+        products = np.abs(r[1:]) * np.abs(r[:-1]) * adjacent
+        measures[freq] = (
+            _per_day(close_day[1:], r * r, out_days),
+            np.pi / 2 * _per_day(close_day[2:], products, out_days),
+            _per_day(close_day[1:], same.astype(np.float64), out_days),
+        )
+    return out_days, measures
+
+class MicrostructureAccumulator:
+    """Realized measures and intraday activity bins, updated chunk by chunk
+
+    The pieces of the last (possibly incomplete) session day are kept as a list and
+    concatenated once, when the day closes; call finalize() after the last chunk.
+    """
+
+    def __init__(self, freqs=config.MICROSTRUCTURE_FREQS,
+                 bin_freq=config.MICROSTRUCTURE_BIN_FREQ):
+        self.freqs = list(freqs)
+        self.bin_freq = bin_freq
+        self.bin_width = freq_ns(bin_freq)
+        self.day_width = freq_ns(config.DAILY_BAR_FREQ)
+        self._carry = []
+        self._carry_day = None
+        self._days = []
+        self._realized = {freq: [] for freq in self.freqs}
+        self._bins = []
+        self.rows = 0
+
+    def update(self, ts_ns, price, size=None, is_trade=None):
+        """Fold one time-ordered chunk in; is_trade marks executions (default: every row)"""
+        n = len(ts_ns)
+        self.rows += n
+        chunk = (np.asarray(ts_ns, dtype=np.int64), np.asarray(price, dtype=np.float64),
+                 np.zeros(n) if size is None else np.asarray(size, dtype=np.float64),
+                 np.ones(n, dtype=bool) if is_trade is None else np.asarray(is_trade, dtype=bool))
+        if not n:
+            return self
+
+        day = bucket_ids(chunk[0], self.day_width)
+        start = 0
+        if self._carry:
+            # Rows continuing the carried day; if the chunk goes past it, the day closes
+            start = int(np.searchsorted(day, self._carry_day, side='right'))
+            self._carry.append(tuple(values[:start] for values in chunk))
+            if start == n:
+                return self
+            self._close_carry()
+
+        done = int(np.searchsorted(day, day[-1], side='left'))
+        if done > start:
+            self._add_days(*(values[start:done] for values in chunk), day[start:done])
+        self._carry = [tuple(values[done:] for values in chunk)]
+        self._carry_day = day[-1]
+        return self
+
+    def _close_carry(self):
+        """Join the carried pieces of the open day (one concatenation) and add the day"""
+        pieces = [np.concatenate(values) for values in zip(*self._carry)]
+        self._carry = []
+        self._add_days(*pieces, np.full(len(pieces[0]), self._carry_day, dtype=np.int64))
+
+    def _add_days(self, ts_ns, price, size, is_trade, day):
+        """Measures and bins of whole session days"""
+        trade = is_trade & (price > 0)
+        days, measures = realized_measures(ts_ns[trade], price[trade], day[trade], self.freqs,
+                                           out_days=np.unique(day))
+        self._days.append(days)
+        for freq in self.freqs:
+            self._realized[freq].append(measures[freq])
+
+        # Activity bins over every event; volume and VWAP over the trades
+        ends = _group_ends(ts_ns // self.bin_width, day)
+        starts = np.append(0, ends[:-1] + 1)
+        traded = np.where(trade, size, 0.0)
+        self._bins.append((
+            ts_ns[starts] // self.bin_width, day[starts], ends - starts + 1,
+            np.add.reduceat(trade.astype(np.int64), starts),
+            np.add.reduceat(traded, starts), np.add.reduceat(traded * price, starts),
+        ))
+
+    def finalize(self):
+        """The feature DataFrames by name (see microstructure_features)"""
+        import pandas as pd
+
+        if self._carry:
+            self._close_carry()
+
+        days = np.concatenate(self._days) if self._days else np.zeros(0, dtype=np.int64)
+        dates = bar_index(days, config.DAILY_BAR_FREQ)
+        realized = pd.DataFrame({
+            (measure, freq): np.concatenate([part[i] for part in self._realized[freq]])
+            if self._days else np.zeros(0)
+            for i, measure in enumerate(MEASURES) for freq in self.freqs
+        }, index=dates)
+        realized.columns = pd.MultiIndex.from_tuples(realized.columns, names=['measure', 'freq'])
+
+        fields = [np.concatenate(values) for values in zip(*self._bins)] or [np.zeros(0)] * 6
+        bucket, bin_day, events, trades, volume, pv = fields
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Session-to-date VWAP: cumulative sums restarted at each session day
+            first = np.searchsorted(bin_day, bin_day, side='left')
+            cum_pv, cum_volume = np.cumsum(pv), np.cumsum(volume)
+            before_pv = np.where(first > 0, cum_pv[first - 1], 0.0)
+            before_volume = np.where(first > 0, cum_volume[first - 1], 0.0)
+            intraday = pd.DataFrame({
+                'events': events.astype(np.int64), 'trades': trades.astype(np.int64),
+                'volume': volume, 'vwap': np.where(volume > 0, pv / volume, np.nan),
+                'session_vwap': (cum_pv - before_pv) / (cum_volume - before_volume),
+                'trade_rate': trades / (self.bin_width / 1e9),
+            }, index=bar_index(bucket.astype(np.int64), self.bin_freq))
+
+        totals = {name: _per_day(bin_day, values, days) if len(days) else np.zeros(0)
+                  for name, values in (('events', events), ('trades', trades),
+                                       ('volume', volume), ('pv', pv))}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily = pd.DataFrame({
+                'events': totals['events'].astype(np.int64),
+                'trades': totals['trades'].astype(np.int64),
+                'volume': totals['volume'],
+                'vwap': totals['pv'] / totals['volume'],
+                'avg_trade_size': totals['volume'] / totals['trades'],
+            }, index=dates)
+        return {'realized': realized, 'daily': daily, 'intraday': intraday,
+                'signature': volatility_signature(realized)}
+
+def volatility_signature(realized, periods_per_year=252):
+    """Mean daily realized variance and bipower variation per sampling frequency
+
+    Annualized volatilities are in percent. At fine sampling, microstructure noise
+    shows as volatility rising above its coarse-frequency plateau.
+    """
+    import pandas as pd
+
+    freqs = list(realized['rv'].columns)
+    rv, bv = realized['rv'].mean().to_numpy(), realized['bv'].mean().to_numpy()
+    return pd.DataFrame({
+        'seconds': [freq_ns(freq) / 1e9 for freq in freqs],
+        'rv': rv, 'bv': bv,
+        'rv_vol (%)': np.sqrt(rv * periods_per_year) * 100,
+        'bv_vol (%)': np.sqrt(bv * periods_per_year) * 100,
+        'jump_share': 1 - bv / rv,
+    }, index=pd.Index(freqs, name='freq'))
+
+def microstructure_features(df, freqs=config.MICROSTRUCTURE_FREQS,
+                            bin_freq=config.MICROSTRUCTURE_BIN_FREQ,
+                            chunk_rows=config.MICROSTRUCTURE_CHUNK_ROWS):
+    """Realized measures, activity bins and the volatility signature of a tick frame
+
+    df: a ts-indexed frame, a TickFrame, or an iterable of time-ordered frames. Returns
+    a dict of DataFrames:
+    - 'realized': per session date, columns (rv | bv | n, freq);
+    - 'daily': events, trades, volume, vwap and avg_trade_size per session date;
+    - 'intraday': per bin_freq bin, events, trades, volume, vwap, session_vwap and
+      trade_rate (trades/s);
+    - 'signature': from volatility_signature.
+    """
+    accumulator = MicrostructureAccumulator(freqs, bin_freq)
+    frames = [df] if hasattr(df, 'columns') else df
+    for frame in frames:
+        ts_ns = frame.index.as_unit('ns').asi8
+        price = frame['price'].to_numpy()
+        size = frame['size'].to_numpy() if 'size' in frame.columns else None
+        is_trade = frame['action'].isin(config.TRADE_ACTIONS).to_numpy() \
+            if 'action' in frame.columns else None
+        for start in range(0, len(ts_ns), chunk_rows):
+            end = start + chunk_rows
+            accumulator.update(ts_ns[start:end], price[start:end],
+                               None if size is None else size[start:end],
+                               None if is_trade is None else is_trade[start:end])
+    features = accumulator.finalize()
+    print(f"\nMicrostructure features: {accumulator.rows:,} ticks, "
+          f"{len(features['realized'])} session days, {len(features['intraday']):,} "
+          f"{bin_freq} bins, {len(accumulator.freqs)} sampling frequencies")
+    return features
+
+def render_volatility_signature(signature, out_dir=config.REPORT_DIR,
+                                ticker=config.TICKER_SYMBOL, fmt=config.REPORT_FORMAT):
+    """Draw the volatility signature plot to <out_dir>/<ticker>_volatility_signature.<fmt>"""
+    from pathlib import Path
+
+    from .report import render_panel
+
+    data = {'x': signature['seconds'].to_numpy(),
+            'series': [(signature['rv_vol (%)'].to_numpy(), 'Realized variance',
+                        plot_colors.TRAINING),
+                       (signature['bv_vol (%)'].to_numpy(), 'Bipower variation',
+                        plot_colors.TESTING)]}
+    labels = {'title': f"{ticker} {plot_labels.Signature.TITLE}",
+              'xlabel': plot_labels.Signature.X_LABEL, 'ylabel': plot_labels.Signature.Y_LABEL}
+    return render_panel(Path(out_dir) / f"{ticker}_volatility_signature.{fmt}", 'signature',
+                        data, labels, ticker)
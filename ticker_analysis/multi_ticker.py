@@ -0,0 +1,196 @@
+"""Multi-ticker mode: many symbols aligned into one returns matrix, scored column-wise."""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ._compat import is_gpu_frame
+from .bars import bar_index, bucket_ids, freq_ns
+from .config import config
+from .corporate_actions import get_split_history
+from .loading import read_and_combine_csv_files_gpu
+from .online_stats import moment_statistics
+from .splits import apply_split_factors
+
+def close_matrix(ts_ns, price, symbol_codes, n_symbols, freq=config.DAILY_BAR_FREQ):
+    """Last price per (bar, symbol) as a dense [bars x symbols] matrix (NaN where no ticks)
+
+    Inputs must be sorted by symbol code, then by timestamp. Rows with a negative code
+    (missing symbol) are ignored.
+    """
+    if len(symbol_codes) and symbol_codes[0] < 0:
+        keep = symbol_codes >= 0
+        ts_ns, price, symbol_codes = ts_ns[keep], price[keep], symbol_codes[keep]
+    buckets = bucket_ids(ts_ns, freq_ns(freq))
+    if not len(buckets):
+        return np.empty(0, dtype=np.int64), np.empty((0, n_symbols))
+
+    # Last row of every (symbol, bucket) run
+    change = (np.diff(symbol_codes) != 0) | (np.diff(buckets) != 0)
+    last = np.append(np.flatnonzero(change), len(buckets) - 1)
+
+    bar_ids = np.unique(buckets[last])
+    closes = np.full((len(bar_ids), n_symbols), np.nan)
+    closes[np.searchsorted(bar_ids, buckets[last]), symbol_codes[last]] = price[last]
+    return bar_ids, closes
+
+def returns_from_closes(closes):
+    """Simple returns against each column's previous valid close, plus the validity mask"""
+    valid_close = ~np.isnan(closes)
+    # Forward-fill the index of the last valid close down each column
+    last_idx = np.where(valid_close, np.arange(len(closes))[:, None], -1)
+    np.maximum.accumulate(last_idx, axis=0, out=last_idx)
+
+    prev_idx = np.vstack([np.full((1, closes.shape[1]), -1), last_idx[:-1]])
+    prev = np.take_along_axis(closes, np.maximum(prev_idx, 0), axis=0)
+    valid = valid_close & (prev_idx >= 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.where(valid, closes / prev - 1, np.nan)
+    return returns, valid
+
+def _with_symbols(row_filter, tickers):
+    """row_filter narrowed to the tickers (as given, upper- and lower-case)"""
+    from .time_index import make_row_filter
+
+    symbols = {variant for t in tickers for variant in (t, t.upper(), t.lower())}
+    row_filter = dict(row_filter or make_row_filter(symbols=symbols))
+    if row_filter['symbol'] is not None:
+        symbols &= set(row_filter['symbol'])
+    row_filter['symbol'] = sorted(symbols)
+    return row_filter
+
+def load_returns_matrix(directory_path=None, tickers=None, freq=config.DAILY_BAR_FREQ,
+                        engine=config.INGEST_ENGINE, cache_dir=config.CACHE_DIR, row_filter=None):
+    """Load many symbols and align their split-adjusted returns into one matrix
+
+    Returns (returns DataFrame [bars x tickers], validity mask ndarray). tickers are
+    pushed into the row filter, so other symbols are dropped while loading.
+    """
+    if tickers is not None:
+        row_filter = _with_symbols(row_filter, tickers)
+    df = read_and_combine_csv_files_gpu(directory_path, engine=engine,
+                                        columns=['ts_event', 'price', 'symbol'],
+                                        cache_dir=cache_dir, row_filter=row_filter)
+    if is_gpu_frame(df):
+        df = df.to_pandas()
+
+    symbols = df['symbol'].astype('category')
+    codes = symbols.cat.codes.to_numpy()
+    names = [str(s).upper() for s in symbols.cat.categories]
+    ts_ns = df['ts_event'].to_numpy().view('int64')
+    price = df['price'].to_numpy(dtype=np.float64, copy=True)
+    del df, symbols
+
+    # Rows without a symbol (code -1) would otherwise land in the last ticker's column
+    keep = codes >= 0
+    if tickers is not None:
+        wanted = {t.upper() for t in tickers}
+        keep &= np.isin(codes, [i for i, name in enumerate(names) if name in wanted])
+    if not keep.all():
+        codes, ts_ns, price = codes[keep], ts_ns[keep], price[keep]
+
+    # Group rows by symbol, time-ordered within each symbol
+    order = np.lexsort((ts_ns, codes))
+    codes, ts_ns, price = codes[order], ts_ns[order], price[order]
+
+    # Split-adjust each symbol's slice in place (only symbols with splits are touched)
+    bounds = np.searchsorted(codes, np.arange(len(names) + 1))
+    for code, name in enumerate(names):
+        lo, hi = bounds[code], bounds[code + 1]
+        if hi > lo:
+            splits = get_split_history(name, pd.Timestamp(ts_ns[lo], tz='UTC'),
+                                       pd.Timestamp(ts_ns[hi - 1], tz='UTC'))
+            if splits:
+                apply_split_factors(ts_ns[lo:hi], price[lo:hi], None, splits)
+
+    bar_ids, closes = close_matrix(ts_ns, price, codes, len(names), freq)
+    present = np.flatnonzero(~np.all(np.isnan(closes), axis=0))
+    returns, valid = returns_from_closes(closes[:, present])
+
+    returns_df = pd.DataFrame(returns, index=bar_index(bar_ids, freq),
+                              columns=[names[i] for i in present])
+    print(f"Aligned {returns_df.shape[1]:,} tickers over {returns_df.shape[0]:,} bars "
+          f"({valid.mean() * 100:.1f}% valid)")
+    return returns_df, valid
+
+def _analyze_matrix_shard(returns, valid, risk_free_rate):
+    """Every analyze_returns_statistics metric, column-wise over one shard"""
+    values = np.where(valid, returns, 0.0)
+    n = valid.sum(axis=0).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = values.sum(axis=0) / n
+        dev = np.where(valid, returns - mean, 0.0)
+        dev2 = dev * dev
+        m2, m3, m4 = dev2.sum(axis=0), (dev2 * dev).sum(axis=0), (dev2 * dev2).sum(axis=0)
+        std, skew, kurt, jb_stat, jb_pvalue = moment_statistics(n, m2, m3, m4)
+
+        # Tickers without any valid return come out as NaN rather than warning
+        masked = np.where(valid, returns, np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            median, var_95, var_99 = np.nanpercentile(masked, [50, 5, 1], axis=0)
+            min_, max_ = np.nanmin(masked, axis=0), np.nanmax(masked, axis=0)
+
+        positive = valid & (returns > 0)
+        negative = valid & (returns < 0)
+        n_pos, n_neg = positive.sum(axis=0), negative.sum(axis=0)
+        avg_pos = np.where(n_pos > 0, np.where(positive, returns, 0).sum(axis=0) / n_pos, 0)
+        avg_neg = np.where(n_neg > 0, np.where(negative, returns, 0).sum(axis=0) / n_neg, 0)
+
+        positive_days, negative_days = n_pos / n * 100, n_neg / n * 100
+
+        annualized_volatility = std * np.sqrt(252)
+        sharpe_ratio = np.where(annualized_volatility > 0,
+                                (mean * 252 - risk_free_rate) / annualized_volatility, np.nan)
+
+    # Too few returns for the moments leave a NaN p-value, which tests nothing
+    normality = np.where(np.isnan(jb_pvalue), 'Insufficient data',
+                         np.where(jb_pvalue < 0.05, 'Rejected', 'Not Rejected'))
+
+    return {
+        'Mean (%)': mean * 100,
+        'Median (%)': median * 100,
+        'Std Dev (%)': std * 100,
+        'Skewness': skew,
+        'Kurtosis': kurt,
+        'Min (%)': min_ * 100,
+        'Max (%)': max_ * 100,
+        'Value at Risk 95% (%)': var_95 * 100,
+        'Value at Risk 99% (%)': var_99 * 100,
+        'Positive Days (%)': positive_days,
+        'Negative Days (%)': negative_days,
+        'Avg Positive Return (%)': avg_pos * 100,
+        'Avg Negative Return (%)': avg_neg * 100,
+        'Sharpe Ratio': sharpe_ratio,
+        'JB Statistic': jb_stat,
+        'P-value': jb_pvalue,
+        'Normal Distribution': normality,
+    }
+
+def analyze_returns_matrix(returns_df, valid=None, risk_free_rate=0.01,
+                           max_workers=None, shard_size=config.MULTI_TICKER_SHARD_SIZE):
+    """Score every ticker column with the analyze_returns_statistics metrics
+
+    Returns a DataFrame indexed by ticker. With max_workers set, column shards are
+    scored in a process pool.
+    """
+    returns = returns_df.to_numpy(dtype=np.float64)
+    if valid is None:
+        valid = ~np.isnan(returns)
+
+    shards = [slice(i, i + shard_size) for i in range(0, returns.shape[1], shard_size)]
+    if max_workers and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(_analyze_matrix_shard,
+                                  [returns[:, s] for s in shards], [valid[:, s] for s in shards],
+                                  [risk_free_rate] * len(shards)))
+    else:
+        parts = [_analyze_matrix_shard(returns[:, s], valid[:, s], risk_free_rate) for s in shards]
+
+    if not parts:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        metric: np.concatenate([part[metric] for part in parts]) for metric in parts[0]
+    }, index=pd.Index(returns_df.columns, name='ticker'))
@@ -0,0 +1,230 @@
+"""Mergeable streaming accumulators reproducing analyze_returns_statistics.
+
+Accumulators can be updated batch by batch and merged across partitions or worker
+processes, so statistics over years of intraday returns run as a map-reduce.
+Only numpy is imported, keeping worker start-up cheap.
+
+Tolerances against analyze_returns_statistics on the same data:
+- mean, std, skewness, kurtosis, Sharpe and Jarque-Bera come from exactly merged
+  central moments and agree to floating point rounding (~1e-9 relative);
+- min, max and the positive/negative day counts and averages are exact;
+- median and VaR come from a quantile sketch and are within the sketch's relative
+  accuracy (Config.STATS_SKETCH_ACCURACY, 0.5% by default) of an order statistic
+  adjacent to the interpolated percentile that np.percentile returns.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import config
+
+def moment_statistics(n, m2, m3, m4):
+    """Std (ddof=1), skewness, excess kurtosis and Jarque-Bera (stat, p) from central moments
+
+    Works elementwise on scalars or arrays. Skewness and kurtosis are bias-adjusted like
+    pandas' skew()/kurtosis(); Jarque-Bera uses the biased moments like scipy, with the
+    closed-form chi2(2) survival function exp(-x/2).
+    """
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        std = np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+        positive = m2 > 0
+        skew = np.where((n > 2) & positive,
+                        n * np.sqrt(n - 1) * m3 / ((n - 2) * m2 ** 1.5), np.nan)
+        kurt = np.where((n > 3) & positive,
+                        n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2)
+                        - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)), np.nan)
+        g1 = (m3 / n) / (m2 / n) ** 1.5
+        g2 = (m4 / n) / (m2 / n) ** 2 - 3
+        jb_stat = np.where(positive, n / 6 * (g1 ** 2 + g2 ** 2 / 4), np.nan)
+    return std, skew, kurt, jb_stat, np.exp(-jb_stat / 2)
+
+class QuantileSketch:
+    """Mergeable relative-accuracy quantile sketch (DDSketch-style log buckets)"""
+
+    def __init__(self, relative_accuracy=config.STATS_SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _add_counts(self, store, values):
+        keys, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values):
+        """Add a batch of values"""
+        values = np.asarray(values, dtype=np.float64)
+        self._add_counts(self.positive, values[values > 0])
+        self._add_counts(self.negative, -values[values < 0])
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+        return self
+
+    def merge(self, other):
+        """Fold another sketch (built with the same accuracy) into this one"""
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Approximate value at quantile q (0..1)"""
+        if not self.count:
+            return np.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        # Walk from the most negative bucket up to the most positive one
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -2 * self.gamma ** key / (self.gamma + 1)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.positive) / (self.gamma + 1)
+
+class ReturnsAccumulator:
+    """Online, mergeable version of analyze_returns_statistics"""
+
+    def __init__(self, relative_accuracy=config.STATS_SKETCH_ACCURACY):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.n_pos = 0
+        self.sum_pos = 0.0
+        self.n_neg = 0
+        self.sum_neg = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def _merge_moments(self, n, mean, m2, m3, m4):
+        """Combine central moments of another sample (Pebay's pairwise formulas)"""
+        na, nb = self.n, n
+        if nb == 0:
+            return
+        if na == 0:
+            self.n, self.mean, self.m2, self.m3, self.m4 = n, mean, m2, m3, m4
+            return
+        total = na + nb
+        delta = mean - self.mean
+        delta_n = delta / total
+        self.m4 = (self.m4 + m4
+                   + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+                   + 6 * delta_n ** 2 * (na * na * m2 + nb * nb * self.m2)
+                   + 4 * delta_n * (na * m3 - nb * self.m3))
+        self.m3 = (self.m3 + m3
+                   + delta * delta_n ** 2 * na * nb * (na - nb)
+                   + 3 * delta_n * (na * m2 - nb * self.m2))
+        self.m2 = self.m2 + m2 + delta * delta_n * na * nb
+        self.mean = self.mean + delta_n * nb
+        self.n = total
+
+    def update(self, returns):
+        """Add a batch of returns (NaNs are dropped, as in analyze_returns_statistics)"""
+        values = np.asarray(returns, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+
+        mean = values.mean()
+        dev = values - mean
+        dev2 = dev * dev
+        self._merge_moments(len(values), mean, dev2.sum(), (dev2 * dev).sum(), (dev2 * dev2).sum())
+
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        positive, negative = values[values > 0], values[values < 0]
+        self.n_pos += len(positive)
+        self.sum_pos += positive.sum()
+        self.n_neg += len(negative)
+        self.sum_neg += negative.sum()
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other):
+        """Fold another accumulator (e.g. from another partition or worker) into this one"""
+        self._merge_moments(other.n, other.mean, other.m2, other.m3, other.m4)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.n_pos += other.n_pos
+        self.sum_pos += other.sum_pos
+        self.n_neg += other.n_neg
+        self.sum_neg += other.sum_neg
+        self.sketch.merge(other.sketch)
+        return self
+
+    def results(self, risk_free_rate=0.01):
+        """Same (stats_dict, risk_metrics_dict, jb_test_results) as analyze_returns_statistics"""
+        n = self.n
+        if n == 0:
+            raise ValueError("The 'returns' column contains no valid data.")
+
+        std, skew, kurt, jb_stat, jb_pvalue = (
+            float(v) for v in moment_statistics(n, self.m2, self.m3, self.m4))
+
+        stats_dict = {
+            'Mean (%)': self.mean * 100,
+            'Median (%)': self.sketch.quantile(0.5) * 100,
+            'Std Dev (%)': std * 100,
+            'Skewness': skew,
+            'Kurtosis': kurt,
+            'Min (%)': self.min * 100,
+            'Max (%)': self.max * 100
+        }
+
+        annualized_return = self.mean * 252
+        annualized_volatility = std * np.sqrt(252)
+        sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility if annualized_volatility > 0 else np.nan
+
+        risk_metrics_dict = {
+            'Value at Risk 95% (%)': self.sketch.quantile(0.05) * 100,
+            'Value at Risk 99% (%)': self.sketch.quantile(0.01) * 100,
+            'Positive Days (%)': (self.n_pos / n) * 100,
+            'Negative Days (%)': (self.n_neg / n) * 100,
+            'Avg Positive Return (%)': self.sum_pos / self.n_pos * 100 if self.n_pos else 0,
+            'Avg Negative Return (%)': self.sum_neg / self.n_neg * 100 if self.n_neg else 0,
+            'Sharpe Ratio': sharpe_ratio
+        }
+
+        jb_test_results = {
+            'JB Statistic': jb_stat,
+            'P-value': jb_pvalue,
+            'Normal Distribution': 'Rejected' if jb_pvalue < 0.05 else 'Not Rejected'
+        }
+        return stats_dict, risk_metrics_dict, jb_test_results
+
+def _accumulate_partition(returns):
+    """Map step: one accumulator per partition"""
+    return ReturnsAccumulator().update(returns)
+
+def accumulate_returns(partitions, max_workers=None):
+    """Map-reduce returns partitions (arrays/Series) into one accumulator
+
+    With max_workers set, the map step runs in a process pool.
+    """
+    total = ReturnsAccumulator()
+    if max_workers:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for acc in pool.map(_accumulate_partition, partitions):
+                total.merge(acc)
+    else:
+        for returns in partitions:
+            total.update(returns)
+    return total
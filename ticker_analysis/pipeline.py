@@ -0,0 +1,189 @@
+"""Pipeline stages, run in dependency order for the CLI and the notebook."""
+
+import os
+
+from .config import config, error_msgs
+
+# Stage name -> stages it needs first (in pipeline order)
+PIPELINE_STAGES = {
+    'load': (),
+    'adjust': ('load',),
+    'returns': ('adjust',),
+    'stats': ('returns',),
+    'rolling': ('returns',),
+    'bootstrap': ('returns',),
+    'book': ('adjust',),
+    'latency': ('adjust',),
+    'microstructure': ('adjust',),
+    'scale': ('adjust',),
+    'log': ('adjust',),
+    'dataset': ('scale',),
+    'plot': ('returns',),
+    'report': ('returns',),
+    'universe': (),
+    'incremental': (),
+}
+
+# Stage name -> (results key it reads rows from, results key of its main output)
+STAGE_ROWS = {
+    'load': (None, 'df'),
+    'adjust': ('df', 'df_adjusted'),
+    'returns': ('df_adjusted', 'daily_returns_df'),
+    'stats': ('daily_returns_df', None),
+    'rolling': ('daily_returns_df', 'rolling_metrics'),
+    'bootstrap': ('daily_returns_df', 'bootstrap_intervals'),
+    'book': ('df_adjusted', 'book'),
+    'latency': ('df_adjusted', 'ingest_latency'),
+    'microstructure': ('df_adjusted', 'realized_measures'),
+    'scale': ('df_adjusted', 'scaled_data'),
+    'log': ('df_adjusted', 'scaled_log_data'),
+    'dataset': ('scaled_data', 'train_windows'),
+    'plot': ('df_adjusted', None),
+    'report': ('df_adjusted', None),
+    'universe': (None, 'returns_matrix'),
+    'incremental': (None, 'daily_returns_df'),
+}
+
+def resolve_stages(stages):
+    """Expand the requested stages with their prerequisites, in pipeline order"""
+    unknown = set(stages) - set(PIPELINE_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {', '.join(sorted(unknown))}")
+
+    needed = set()
+    pending = list(stages)
+    while pending:
+        stage = pending.pop()
+        if stage not in needed:
+            needed.add(stage)
+            pending.extend(PIPELINE_STAGES[stage])
+    return [stage for stage in PIPELINE_STAGES if stage in needed]
+
+def _params_path(name):
+    """Where a fitted transform's parameters are saved (None when disabled)"""
+    if not config.TRANSFORM_DIR:
+        return None
+    return os.path.join(config.TRANSFORM_DIR, f"{config.TICKER_SYMBOL}_{name}.json")
+
+def _run_stage(stage, results, directory_path, engine, cache_dir, tickers, freq, max_workers,
+               row_filter, compact):
+    """Run one stage, storing its outputs in results"""
+    if stage == 'load':
+        from .loading import read_and_combine_csv_files_gpu
+        results['df'] = read_and_combine_csv_files_gpu(directory_path, engine=engine,
+                                                       cache_dir=cache_dir,
+                                                       row_filter=row_filter, compact=compact)
+    elif stage == 'adjust':
+        from .splits import adjust_for_splits
+        results['df_adjusted'] = adjust_for_splits(results.pop('df'), compact=compact)
+    elif stage == 'returns':
+        from .returns import calculate_daily_returns
+        results['daily_returns_df'] = calculate_daily_returns(results['df_adjusted'])
+    elif stage == 'stats':
+        from .returns import analyze_returns_statistics
+        results['stats'], results['risk_metrics'], results['jb_results'] = \
+            analyze_returns_statistics(results['daily_returns_df'])
+    elif stage == 'rolling':
+        from .rolling import print_rolling_summary, rolling_risk_metrics
+        results['rolling_metrics'] = rolling_risk_metrics(results['daily_returns_df'])
+        print_rolling_summary(results['rolling_metrics'])
+    elif stage == 'bootstrap':
+        from .bootstrap import bootstrap_statistics, print_bootstrap_summary
+        results['bootstrap_intervals'] = bootstrap_statistics(
+            results['daily_returns_df']['returns'], max_workers=max_workers)
+        print_bootstrap_summary(results['bootstrap_intervals'])
+    elif stage == 'book':
+        from .orderbook import reconstruct_book
+        if 'order_id' not in results['df_adjusted'].columns:
+            # Price-level replay without order ids would leave modified orders behind
+            print(f"Skipping the book stage: {error_msgs.BOOK_NEEDS_ORDER_IDS}")
+            results['book'] = None
+            return
+        results['book'] = reconstruct_book(results['df_adjusted'])
+        print(results['book'][['mid', 'spread', 'imbalance']].describe().to_string())
+    elif stage == 'latency':
+        from .timestamps import ingest_latency, print_latency_summary
+        results['ingest_latency'] = ingest_latency(results['df_adjusted'])
+        print_latency_summary(results['ingest_latency'])
+    elif stage == 'microstructure':
+        from .microstructure import microstructure_features, render_volatility_signature
+        features = microstructure_features(results['df_adjusted'])
+        results['realized_measures'] = features['realized']
+        results['microstructure_daily'] = features['daily']
+        results['intraday_activity'] = features['intraday']
+        results['volatility_signature'] = features['signature']
+        print(features['signature'].to_string())
+        results['signature_path'] = render_volatility_signature(features['signature'])
+    elif stage == 'scale':
+        from .scaling import scale_data, verify_scaling
+        results['scaled_data'], results['scaler'] = scale_data(
+            results['df_adjusted'], params_path=_params_path('scale'))
+        verify_scaling(results['scaler'])
+    elif stage == 'dataset':
+        from .dataset import build_window_datasets
+        results['train_windows'], results['test_windows'] = build_window_datasets(
+            results['scaled_data'], results['df_adjusted'].index)
+    elif stage == 'log':
+        from .scaling import scale_log_data
+        results['scaled_log_data'], results['log_transform'] = scale_log_data(
+            results['df_adjusted'], params_path=_params_path('log_scale'))
+    elif stage == 'plot':
+        from .plotting import (downsample_for_plotting, visualize_log_price_data,
+                               visualize_price_data)
+        df_downsampled = downsample_for_plotting(results['df_adjusted'])
+        daily_returns = results['daily_returns_df']['returns'].dropna() * 100
+        visualize_price_data(results['df_adjusted'], df_downsampled, daily_returns)
+        visualize_log_price_data(results['df_adjusted'], df_downsampled, daily_returns)
+    elif stage == 'report':
+        from .report import render_report
+        results['report_paths'] = render_report(
+            results['df_adjusted'], results['daily_returns_df']['returns'].dropna() * 100)
+    elif stage == 'universe':
+        from .multi_ticker import analyze_returns_matrix, load_returns_matrix
+        results['returns_matrix'], results['returns_valid'] = load_returns_matrix(
+            directory_path, tickers=tickers, freq=freq, engine=engine, cache_dir=cache_dir,
+            row_filter=row_filter)
+        results['universe_stats'] = analyze_returns_matrix(
+            results['returns_matrix'], results['returns_valid'], max_workers=max_workers)
+        print(results['universe_stats'].to_string(max_rows=20))
+    elif stage == 'incremental':
+        from .incremental import ingest_incremental
+        from .returns import print_returns_statistics
+        update = ingest_incremental(directory_path, engine=engine, cache_dir=cache_dir,
+                                    compact=compact)
+        results['incremental_ticks'] = update['ticks']
+        results['sequence_gaps'] = update['gaps']
+        results['daily_returns_df'] = update['daily_returns_df']
+        results['stats'], results['risk_metrics'], results['jb_results'] = \
+            update['stats'], update['risk_metrics'], update['jb_results']
+        if update['stats'] is not None:
+            print_returns_statistics(update['stats'], update['risk_metrics'],
+                                     update['jb_results'])
+
+def run_pipeline(stages=tuple(PIPELINE_STAGES), directory_path=None,
+                 engine=config.INGEST_ENGINE, cache_dir=config.CACHE_DIR,
+                 tickers=None, freq=config.DAILY_BAR_FREQ, max_workers=None,
+                 row_filter=None, metrics=None, compact=config.COMPACT_TICKS):
+    """Run the selected stages and return their outputs by name
+
+    Every stage is measured by metrics (a StageMetrics, by default one writing to
+    Config.METRICS_PATH); the records are returned under 'metrics'. With compact, the
+    adjusted ticks are held as a TickFrame.
+    """
+    from .instrumentation import StageMetrics, count_rows
+
+    metrics = metrics or StageMetrics()
+    results = {}
+    selected = resolve_stages(stages)
+    for step, stage in enumerate(selected, 1):
+        input_key, output_key = STAGE_ROWS[stage]
+        with metrics.stage(stage, rows_in=count_rows(results.get(input_key)),
+                           step=step, steps=len(selected)) as record:
+            _run_stage(stage, results, directory_path, engine, cache_dir, tickers, freq,
+                       max_workers, row_filter, compact)
+            if output_key is not None:
+                record['rows_out'] = count_rows(results[output_key])
+                record['output'] = results[output_key]
+    metrics.print_summary()
+    results['metrics'] = metrics.records
+    return results
@@ -0,0 +1,181 @@
+"""Downsampling and price/returns visualizations."""
+
+import numpy as np
+
+from .config import config, plot_colors, plot_labels
+from .corporate_actions import get_split_history
+from .downsampling import downsample_indices
+
+def downsample_for_plotting(df, target_points=config.DOWNSAMPLE_TARGET_POINTS,
+                            method=config.DOWNSAMPLE_METHOD, column=None):
+    """Downsample data for visualization, keeping the extremes of `column` (default: price)"""
+    if len(df) <= target_points:
+        return df
+    column = column or ('price' if 'price' in df.columns else df.columns[0])
+    x = df.index.as_unit('ns').asi8 if hasattr(df.index, 'as_unit') else None
+    return df.iloc[downsample_indices(df[column].to_numpy(dtype=np.float64), target_points,
+                                      method, x)]
+
+def visualize_price_data(df_adjusted, df_downsampled, daily_returns):
+    """Create comprehensive price visualization plots"""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    from .features import cached_bars
+
+    plt.figure(figsize=config.PLOT_FIGSIZE)
+
+    # Plot 1: Split-adjusted prices
+    plt.subplot(4, 1, 1)
+    plt.plot(df_downsampled.index, df_downsampled['price'],
+            color=plot_colors.TRAINING,
+            label=f'{config.TICKER_SYMBOL} Adjusted Price',
+            alpha=config.PLOT_ALPHA)
+
+    # Add split lines
+    for (split_date, ratio), color in zip(get_split_history(), plot_colors.SPLIT_LINES):
+        split_datetime = pd.to_datetime(split_date)
+        if split_datetime.tz is None:
+            split_datetime = split_datetime.tz_localize('UTC')
+        plt.axvline(x=split_datetime, color=color, linestyle='--',
+                   label=f'Split ({ratio}:1)', alpha=config.PLOT_ALPHA)
+    plt.title(plot_labels.TimeSeries.ADJUSTED)
+    plt.xlabel(plot_labels.TimeSeries.X_LABEL)
+    plt.ylabel(plot_labels.TimeSeries.Y_LABEL)
+    plt.legend()
+    plt.grid(True)
+
+    # Plot 2: Price distribution (binned over every tick, not the downsampled rows)
+    plt.subplot(4, 1, 2)
+    plt.stairs(*np.histogram(df_adjusted['price'].to_numpy(), bins=config.HISTOGRAM_BINS),
+               fill=True,
+               alpha=config.PLOT_ALPHA,
+               color=plot_colors.TRAINING)
+    plt.title(plot_labels.Distribution.ADJUSTED)
+    plt.xlabel(plot_labels.Distribution.X_LABEL)
+    plt.ylabel(plot_labels.Distribution.Y_LABEL)
+
+    # Plot 3: Daily returns distribution
+    plt.subplot(4, 1, 3)
+    plt.hist(daily_returns,
+            bins=config.HISTOGRAM_BINS,
+            alpha=config.PLOT_ALPHA,
+            color=plot_colors.TRAINING)
+    plt.title(plot_labels.Returns.TITLE)
+    plt.xlabel(plot_labels.Returns.X_LABEL)
+    plt.ylabel(plot_labels.Returns.Y_LABEL)
+    plt.grid(True)
+
+    # Plot 4: Volatility
+    plt.subplot(4, 1, 4)
+    vol_df = cached_bars(df_adjusted, freq=config.VOLATILITY_RESAMPLE_FREQ)[['std']].dropna()
+    vol_df_plot = downsample_for_plotting(vol_df)
+
+    plt.plot(vol_df_plot.index, vol_df_plot['std'],
+            color=plot_colors.VOLATILITY)
+
+    # Add split lines to volatility plot
+    for (split_date, ratio), color in zip(get_split_history(), plot_colors.SPLIT_LINES):
+        split_datetime = pd.to_datetime(split_date)
+        if split_datetime.tz is None:
+            split_datetime = split_datetime.tz_localize('UTC')
+        plt.axvline(x=split_datetime, color=color, linestyle='--',
+                   alpha=config.PLOT_ALPHA/2)
+    plt.title(plot_labels.Volatility.TITLE)
+    plt.xlabel(plot_labels.Volatility.X_LABEL)
+    plt.ylabel(plot_labels.Volatility.Y_LABEL)
+    plt.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+    # Print statistics summary
+    print(f"\n{config.TICKER_SYMBOL} Data Statistics Summary:")
+    print(f"Price range: ${df_adjusted['price'].min():.2f} to ${df_adjusted['price'].max():.2f}")
+    print(f"Daily returns range: {daily_returns.min():.2f}% to {daily_returns.max():.2f}%")
+    print(f"Time range: {df_adjusted.index.min()} to {df_adjusted.index.max()}")
+
+def visualize_log_price_data(df_adjusted, df_downsampled, daily_returns):
+    """Create comprehensive visualization plots with log-transformed data"""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    from .features import cached_bars, cached_log_prices
+
+    # Apply log transform to prices and returns (log prices come from the feature cache)
+    log_prices = cached_log_prices(df_adjusted, np.e, config.LOG_EPSILON)
+    log_downsampled = np.log(df_downsampled['price'] + config.LOG_EPSILON)
+    log_returns = np.log(daily_returns + config.LOG_EPSILON)
+
+    plt.figure(figsize=config.PLOT_FIGSIZE)
+
+    # Plot 1: Log-transformed prices
+    plt.subplot(4, 1, 1)
+    plt.plot(df_downsampled.index, log_downsampled,
+            color=plot_colors.TRAINING,
+            label=f'{config.TICKER_SYMBOL} Log Price',
+            alpha=config.PLOT_ALPHA)
+
+    # Add split lines
+    for (split_date, ratio), color in zip(get_split_history(), plot_colors.SPLIT_LINES):
+        split_datetime = pd.to_datetime(split_date)
+        if split_datetime.tz is None:
+            split_datetime = split_datetime.tz_localize('UTC')
+        plt.axvline(x=split_datetime, color=color, linestyle='--',
+                   label=f'Split ({ratio}:1)', alpha=config.PLOT_ALPHA)
+    plt.title(plot_labels.LogTimeSeries.ADJUSTED)
+    plt.xlabel(plot_labels.LogTimeSeries.X_LABEL)
+    plt.ylabel(plot_labels.LogTimeSeries.Y_LABEL)
+    plt.legend()
+    plt.grid(True)
+
+    # Plot 2: Log-transformed price distribution (binned over every tick)
+    plt.subplot(4, 1, 2)
+    plt.stairs(*np.histogram(log_prices.to_numpy(), bins=config.HISTOGRAM_BINS),
+               fill=True,
+               alpha=config.PLOT_ALPHA,
+               color='red')
+    plt.title(plot_labels.LogDistribution.ADJUSTED)
+    plt.xlabel(plot_labels.LogDistribution.X_LABEL)
+    plt.ylabel(plot_labels.LogDistribution.Y_LABEL)
+
+    # Plot 3: Log-transformed returns distribution
+    plt.subplot(4, 1, 3)
+    plt.hist(log_returns,
+            bins=config.HISTOGRAM_BINS,
+            alpha=config.PLOT_ALPHA,
+            color='red')
+    plt.title(plot_labels.LogReturns.TITLE)
+    plt.xlabel(plot_labels.LogReturns.X_LABEL)
+    plt.ylabel(plot_labels.LogReturns.Y_LABEL)
+    plt.grid(True)
+
+    # Plot 4: Log-transformed volatility
+    plt.subplot(4, 1, 4)
+    vol_df = cached_bars(log_prices.to_frame('price'),
+                         freq=config.VOLATILITY_RESAMPLE_FREQ)[['std']].dropna()
+    vol_df_plot = downsample_for_plotting(vol_df)
+
+    plt.plot(vol_df_plot.index, vol_df_plot['std'],
+            color=plot_colors.VOLATILITY)
+
+    # Add split lines to volatility plot
+    for (split_date, ratio), color in zip(get_split_history(), plot_colors.SPLIT_LINES):
+        split_datetime = pd.to_datetime(split_date)
+        if split_datetime.tz is None:
+            split_datetime = split_datetime.tz_localize('UTC')
+        plt.axvline(x=split_datetime, color=color, linestyle='--',
+                   alpha=config.PLOT_ALPHA/2)
+    plt.title(plot_labels.LogVolatility.TITLE)
+    plt.xlabel(plot_labels.LogVolatility.X_LABEL)
+    plt.ylabel(plot_labels.LogVolatility.Y_LABEL)
+    plt.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+    # Print statistics summary
+    print(f"\n{config.TICKER_SYMBOL} Log-Transformed Statistics Summary:")
+    print(f"Log price range: {log_prices.min():.2f} to {log_prices.max():.2f}")
+    print(f"Log returns range: {log_returns.min():.2f} to {log_returns.max():.2f}")
+    print(f"Log volatility range: {vol_df['std'].min():.2f} to {vol_df['std'].max():.2f}")
@@ -0,0 +1,268 @@
+"""Headless report rendering: full-data panel aggregates, drawn in parallel to image files.
+
+One chunked pass over each ticker's ticks builds every panel's aggregate. That
+pass produces hourly bars of price and log price (envelope, close and volatility)
+and sparse 2D counts of (hour, log-spaced price key). Those counts give a price
+density map and exact full-data price histograms, with nothing plotted point by
+point and no downsampling bias. The aggregates are a few MB however many ticks go
+in. Panels are then drawn from them with the Agg backend by a pool of worker
+processes, one image file per panel.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .bars import _merge_boundary, bar_arrays, bar_index, freq_ns
+from .config import config, plot_colors, plot_labels
+
+class PanelAggregator:
+    """Mergeable per-ticker aggregates of every report panel, updated chunk by chunk
+
+    Prices are keyed by ceil(log(price) / log(gamma)), gamma = (1 + r) / (1 - r)
+    with r = price_resolution, so histogram bins are exact to that relative width.
+    """
+
+    def __init__(self, freq=config.REPORT_TIME_BIN,
+                 price_resolution=config.REPORT_PRICE_RESOLUTION):
+        self.freq = freq
+        self.width_ns = freq_ns(freq)
+        self.log_gamma = math.log((1 + price_resolution) / (1 - price_resolution))
+        self.bars = None
+        self.log_bars = None
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.rows = 0
+        self.non_positive = 0
+
+    def update(self, ts_ns, price, size=None):
+        """Fold one time-ordered chunk of ticks into the aggregates"""
+        ts_ns = np.asarray(ts_ns, dtype=np.int64)
+        price = np.asarray(price, dtype=np.float64)
+        self.rows += len(price)
+        if not len(price):
+            return self
+
+        bars = bar_arrays(ts_ns, price, size, self.freq)
+        log_price = np.log(price + config.LOG_EPSILON)
+        log_bars = bar_arrays(ts_ns, log_price, None, self.freq)
+        self.bars = bars if self.bars is None else _merge_boundary(self.bars, bars)
+        self.log_bars = log_bars if self.log_bars is None else \
+            _merge_boundary(self.log_bars, log_bars)
+
+        # Sparse (time bin, price key) counts: one packed int64 key per tick
+        positive = price > 0
+        self.non_positive += int(np.count_nonzero(~positive))
+        price_key = np.ceil(np.log(price[positive]) / self.log_gamma).astype(np.int64)
+        packed = (ts_ns[positive] // self.width_ns) << 24 | (price_key + (1 << 23))
+        keys, counts = np.unique(packed, return_counts=True)
+        self._add_counts(keys, counts)
+        return self
+
+    def _add_counts(self, keys, counts):
+        if len(self.keys):
+            keys = np.concatenate([self.keys, keys])
+            counts = np.concatenate([self.counts, counts])
+            keys, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        self.keys, self.counts = keys, counts
+
+    def merge(self, other):
+        """Fold another aggregator over a later time range into this one"""
+        for name in ('bars', 'log_bars'):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            setattr(self, name, theirs if mine is None else
+                    mine if theirs is None else _merge_boundary(mine, theirs))
+        self._add_counts(other.keys, other.counts)
+        self.rows += other.rows
+        self.non_positive += other.non_positive
+        return self
+
+    def price_cells(self):
+        """(time bin, upper price of the key, count) of every non-empty cell"""
+        time_bin = self.keys >> 24
+        price_key = (self.keys & ((1 << 24) - 1)) - (1 << 23)
+        return time_bin, np.exp(price_key * self.log_gamma), self.counts
+
+def aggregate_panels(df, freq=config.REPORT_TIME_BIN, chunk_rows=config.REPORT_CHUNK_ROWS,
+                     price_resolution=config.REPORT_PRICE_RESOLUTION):
+    """PanelAggregator over a ts-indexed frame (or TickFrame), chunk by chunk
+
+    df may also be an iterable of time-ordered frames, as read chunk by chunk.
+    """
+    aggregator = PanelAggregator(freq, price_resolution)
+    frames = [df] if hasattr(df, 'columns') else df
+    for frame in frames:
+        ts_ns = frame.index.as_unit('ns').asi8
+        price = frame['price'].to_numpy()
+        size = frame['size'].to_numpy() if 'size' in frame.columns else None
+        for start in range(0, len(ts_ns), chunk_rows):
+            end = start + chunk_rows
+            aggregator.update(ts_ns[start:end], price[start:end],
+                              None if size is None else size[start:end].astype(np.float64))
+    return aggregator
+
+def _density_grid(aggregator, columns=config.REPORT_DENSITY_COLUMNS,
+                  rows=config.REPORT_DENSITY_ROWS):
+    """(x edges as bar starts, y edges, counts[y, x]) of the price density map"""
+    time_bin, values, counts = aggregator.price_cells()
+    x_edges = np.linspace(time_bin.min(), time_bin.max() + 1, min(columns, int(
+        time_bin.max() - time_bin.min()) + 1) + 1)
+    y_edges = np.linspace(values.min(), values.max(), rows + 1)
+    grid, _, _ = np.histogram2d(values, time_bin, bins=[y_edges, x_edges], weights=counts)
+    x_edges = (x_edges * aggregator.width_ns).astype(np.int64).view('datetime64[ns]')
+    return x_edges, y_edges, grid
+
+def report_panels(aggregator, daily_returns, ticker=config.TICKER_SYMBOL,
+                  bins=config.HISTOGRAM_BINS):
+    """(panel name, draw kind, data, labels) for every report panel of one ticker
+
+    daily_returns: daily returns in percent, as visualize_price_data takes them.
+    """
+    bars, log_bars = aggregator.bars, aggregator.log_bars
+    if bars is None:
+        return []
+    index = bar_index(bars['bucket'], aggregator.freq).tz_localize(None).to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.where(bars['trades'] > 1, np.sqrt(bars['m2'] / (bars['trades'] - 1)), np.nan)
+        log_std = np.where(log_bars['trades'] > 1,
+                           np.sqrt(log_bars['m2'] / (log_bars['trades'] - 1)), np.nan)
+    _, price, counts = aggregator.price_cells()
+    returns = np.asarray(daily_returns, dtype=np.float64)
+    returns = returns[~np.isnan(returns)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # As in visualize_log_price_data, returns at or below -epsilon have no log
+        log_returns = np.log(returns + config.LOG_EPSILON)
+    log_returns = log_returns[np.isfinite(log_returns)]
+    labels = plot_labels
+
+    def hist(values, weights=None):
+        return np.histogram(values, bins=bins, weights=weights)
+
+    def envelope(b):
+        return {'x': index, 'low': b['low'], 'high': b['high'], 'close': b['close']}
+
+    return [
+        ('price', 'envelope', envelope(bars),
+         dict(title=labels.TimeSeries.ADJUSTED, xlabel=labels.TimeSeries.X_LABEL,
+              ylabel=labels.TimeSeries.Y_LABEL, color=plot_colors.TRAINING,
+              label=f'{ticker} Adjusted Price', splits=True)),
+        ('price_density', 'density', dict(zip(('x', 'y', 'grid'), _density_grid(aggregator))),
+         dict(title=f'{ticker} Price Density', xlabel=labels.TimeSeries.X_LABEL,
+              ylabel=labels.TimeSeries.Y_LABEL, splits=True)),
+        ('price_hist', 'hist', dict(zip(('counts', 'edges'), hist(price, counts))),
+         dict(title=labels.Distribution.ADJUSTED, xlabel=labels.Distribution.X_LABEL,
+              ylabel=labels.Distribution.Y_LABEL, color=plot_colors.TRAINING)),
+        ('returns_hist', 'hist', dict(zip(('counts', 'edges'), hist(returns))),
+         dict(title=labels.Returns.TITLE, xlabel=labels.Returns.X_LABEL,
+              ylabel=labels.Returns.Y_LABEL, color=plot_colors.TRAINING)),
+        ('volatility', 'line', {'x': index, 'y': std},
+         dict(title=labels.Volatility.TITLE, xlabel=labels.Volatility.X_LABEL,
+              ylabel=labels.Volatility.Y_LABEL, color=plot_colors.VOLATILITY, splits=True)),
+        ('log_price', 'envelope', envelope(log_bars),
+         dict(title=labels.LogTimeSeries.ADJUSTED, xlabel=labels.LogTimeSeries.X_LABEL,
+              ylabel=labels.LogTimeSeries.Y_LABEL, color=plot_colors.TRAINING,
+              label=f'{ticker} Log Price', splits=True)),
+        ('log_price_hist', 'hist', dict(zip(('counts', 'edges'), hist(np.log(price), counts))),
+         dict(title=labels.LogDistribution.ADJUSTED, xlabel=labels.LogDistribution.X_LABEL,
+              ylabel=labels.LogDistribution.Y_LABEL, color='red')),
+        ('log_returns_hist', 'hist', dict(zip(('counts', 'edges'), hist(log_returns))),
+         dict(title=labels.LogReturns.TITLE, xlabel=labels.LogReturns.X_LABEL,
+              ylabel=labels.LogReturns.Y_LABEL, color='red')),
+        ('log_volatility', 'line', {'x': index, 'y': log_std},
+         dict(title=labels.LogVolatility.TITLE, xlabel=labels.LogVolatility.X_LABEL,
+              ylabel=labels.LogVolatility.Y_LABEL, color=plot_colors.VOLATILITY, splits=True)),
+    ]
+
+def _draw_split_lines(ax, ticker):
+    import pandas as pd
+
+    from .corporate_actions import get_split_history
+
+    for (split_date, ratio), color in zip(get_split_history(ticker), plot_colors.SPLIT_LINES):
+        ax.axvline(x=pd.Timestamp(split_date).tz_localize(None).to_datetime64(), color=color,
+                   linestyle='--', label=f'Split ({ratio}:1)', alpha=config.PLOT_ALPHA)
+
+def render_panel(path, kind, data, labels, ticker=config.TICKER_SYMBOL,
+                 figsize=config.REPORT_FIGSIZE, dpi=config.REPORT_DPI):
+    """Draw one panel with the Agg backend and save it to path (runs in a worker)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figsize)
+    if kind == 'envelope':
+        ax.fill_between(data['x'], data['low'], data['high'], step='post',
+                        color=labels['color'], alpha=config.PLOT_ALPHA / 2, linewidth=0)
+        ax.plot(data['x'], data['close'], color=labels['color'], linewidth=0.6,
+                label=labels.get('label'), alpha=config.PLOT_ALPHA)
+    elif kind == 'density':
+        from matplotlib.colors import LogNorm
+        from matplotlib.dates import date2num
+
+        # The grid is uniform, so it is drawn as one image rather than a mesh of cells
+        x = date2num(data['x'][[0, -1]])
+        image = ax.imshow(np.ma.masked_equal(data['grid'], 0), origin='lower', aspect='auto',
+                          extent=(x[0], x[1], data['y'][0], data['y'][-1]), norm=LogNorm(),
+                          cmap='viridis', interpolation='nearest')
+        ax.xaxis_date()
+        fig.colorbar(image, ax=ax, label='Ticks')
+    elif kind == 'signature':
+        for values, label, color in data['series']:
+            ax.plot(data['x'], values, marker='o', color=color, label=label)
+        ax.set_xscale('log')
+    elif kind == 'hist':
+        ax.stairs(data['counts'], data['edges'], fill=True, color=labels['color'],
+                  alpha=config.PLOT_ALPHA)
+    else:
+        ax.plot(data['x'], data['y'], color=labels['color'], linewidth=0.8)
+    if labels.get('splits'):
+        _draw_split_lines(ax, ticker)
+    ax.set_title(labels['title'])
+    ax.set_xlabel(labels['xlabel'])
+    ax.set_ylabel(labels['ylabel'])
+    if kind in ('envelope', 'line', 'signature'):
+        ax.grid(True)
+    if kind != 'line' and ax.get_legend_handles_labels()[0]:
+        ax.legend(loc='upper left')
+    fig.tight_layout()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return str(path)
+
+def render_panels(jobs, max_workers=config.REPORT_WORKERS):
+    """Render (path, kind, data, labels, ticker) jobs, in a process pool when
+    max_workers > 1; returns the written paths"""
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1 or len(jobs) <= 1:
+        return [render_panel(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        return list(pool.map(render_panel, *zip(*jobs)))
+
+def render_report(df, daily_returns, out_dir=config.REPORT_DIR, ticker=config.TICKER_SYMBOL,
+                  fmt=config.REPORT_FORMAT, max_workers=config.REPORT_WORKERS):
+    """Write every report panel of one ticker as <out_dir>/<ticker>_<panel>.<fmt>"""
+    return render_reports({ticker: (df, daily_returns)}, out_dir, fmt, max_workers)[ticker]
+
+def render_reports(inputs, out_dir=config.REPORT_DIR, fmt=config.REPORT_FORMAT,
+                   max_workers=config.REPORT_WORKERS):
+    """Report panels of many tickers, rendered by one shared worker pool
+
+    inputs: {ticker: (ticks frame or PanelAggregator, daily returns in percent)}.
+    Each ticker's ticks are read once; returns {ticker: [image paths]}.
+    """
+    jobs, owners = [], []
+    for ticker, (ticks, daily_returns) in inputs.items():
+        aggregator = ticks if isinstance(ticks, PanelAggregator) else aggregate_panels(ticks)
+        for name, kind, data, labels in report_panels(aggregator, daily_returns, ticker):
+            jobs.append((Path(out_dir) / f"{ticker}_{name}.{fmt}", kind, data, labels, ticker))
+            owners.append(ticker)
+    paths = {ticker: [] for ticker in inputs}
+    for ticker, path in zip(owners, render_panels(jobs, max_workers)):
+        paths[ticker].append(path)
+    print(f"\nRendered {len(jobs)} panels for {len(inputs)} ticker(s) into {out_dir}")
+    return paths
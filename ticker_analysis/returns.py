@@ -0,0 +1,102 @@
+"""Daily returns and their summary statistics."""
+
+import numpy as np
+
+from .config import config
+
+def calculate_daily_returns(df, bars=None):
+    """Calculate daily returns from adjusted prices (session-day closing prices)"""
+    from .features import cached_bars
+
+    # Daily bars can be passed in when already built (e.g. chunk by chunk)
+    if bars is None:
+        bars = cached_bars(df, freq=config.DAILY_BAR_FREQ)
+    returns = bars['close'].pct_change()
+
+    # Create DataFrame with returns
+    daily_returns_df = returns.to_frame('returns')
+    daily_returns_df.index.name = 'date'
+
+    print(f"Daily returns range: {returns.min()*100:.2f}% to {returns.max()*100:.2f}%")
+    return daily_returns_df
+
+def analyze_returns_statistics(daily_returns_df, risk_free_rate=0.01):
+    """
+    Perform detailed statistical analysis on daily returns.
+
+    Parameters:
+    - daily_returns_df (DataFrame): DataFrame with a column named 'returns'.
+    - risk_free_rate (float): Annualized risk-free rate, default is 0.01 (1%).
+
+    Returns:
+    - stats_dict (dict): Basic statistics of returns.
+    - risk_metrics_dict (dict): Risk-related metrics of returns.
+    """
+    from scipy import stats
+
+    if 'returns' not in daily_returns_df.columns:
+        raise ValueError("The input DataFrame must contain a 'returns' column.")
+
+    returns = daily_returns_df['returns'].dropna()
+
+    if returns.empty:
+        raise ValueError("The 'returns' column contains no valid data.")
+
+    # Basic statistics
+    stats_dict = {
+        'Mean (%)': returns.mean() * 100,
+        'Median (%)': returns.median() * 100,
+        'Std Dev (%)': returns.std() * 100,
+        'Skewness': returns.skew(),
+        'Kurtosis': returns.kurtosis(),
+        'Min (%)': returns.min() * 100,
+        'Max (%)': returns.max() * 100
+    }
+
+    # Risk metrics
+    negative_returns = returns[returns < 0]
+    positive_returns = returns[returns > 0]
+
+    # Value at Risk (VaR)
+    var_95 = np.percentile(returns, 5) * 100
+    var_99 = np.percentile(returns, 1) * 100
+
+    # Sharpe Ratio
+    annualized_return = returns.mean() * 252
+    annualized_volatility = returns.std() * np.sqrt(252)
+    sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility if annualized_volatility > 0 else np.nan
+
+    risk_metrics_dict = {
+        'Value at Risk 95% (%)': var_95,
+        'Value at Risk 99% (%)': var_99,
+        'Positive Days (%)': (len(positive_returns) / len(returns)) * 100,
+        'Negative Days (%)': (len(negative_returns) / len(returns)) * 100,
+        'Avg Positive Return (%)': positive_returns.mean() * 100 if not positive_returns.empty else 0,
+        'Avg Negative Return (%)': negative_returns.mean() * 100 if not negative_returns.empty else 0,
+        'Sharpe Ratio': sharpe_ratio
+    }
+
+    # Perform Jarque-Bera test for normality
+    jb_stat, jb_pvalue = stats.jarque_bera(returns)
+    jb_test_results = {
+        'JB Statistic': jb_stat,
+        'P-value': jb_pvalue,
+        'Normal Distribution': 'Rejected' if jb_pvalue < 0.05 else 'Not Rejected'
+    }
+
+    print_returns_statistics(stats_dict, risk_metrics_dict, jb_test_results)
+    return stats_dict, risk_metrics_dict, jb_test_results
+
+def print_returns_statistics(stats_dict, risk_metrics_dict, jb_test_results):
+    """Print the statistics dicts in a structured format"""
+    print("\n--- Basic Statistics ---")
+    for metric, value in stats_dict.items():
+        print(f"{metric:<20}: {value:>8.3f}")
+
+    print("\n--- Risk Metrics ---")
+    for metric, value in risk_metrics_dict.items():
+        print(f"{metric:<20}: {value:>8.3f}")
+
+    print("\n--- Jarque-Bera Test ---")
+    for metric, value in jb_test_results.items():
+        print(f"{metric:<20}: {value}")
@@ -0,0 +1,119 @@
+"""Rolling risk metrics over count- or time-based windows, many window lengths per pass.
+
+Windowed moments come from one set of prefix power sums shared by every window
+length, so each extra window costs O(n) subtractions. Rolling VaR keeps an order
+statistics structure per window (pandas' skiplist quantiles, fed the same window
+bounds), O(n log w).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import config
+from .online_stats import moment_statistics
+
+_ROLLING_METRICS = ('count', 'mean', 'std', 'volatility', 'sharpe', 'skew', 'kurt',
+                    'var_95', 'var_99')
+
+def window_bounds(ts_ns, window):
+    """[start, end) row bounds per row for a count window (int) or a time window ('30D', '1h')
+
+    Time windows cover (t - window, t], like pandas' offset windows.
+    """
+    n = len(ts_ns)
+    end = np.arange(1, n + 1, dtype=np.int64)
+    if isinstance(window, (int, np.integer)):
+        return np.maximum(end - int(window), 0), end
+    width = pd.Timedelta(window).value
+    return np.searchsorted(ts_ns, ts_ns - width, side='right').astype(np.int64), end
+
+def _prefix_power_sums(values):
+    """Prefix count and sums of x..x^4 (standardized, NaNs excluded), each with a leading 0"""
+    valid = ~np.isnan(values)
+    # Standardizing keeps the prefix sums O(n) in magnitude, so window differences stay accurate
+    center = values[valid].mean() if valid.any() else 0.0
+    scale = values[valid].std() if valid.sum() > 1 else 0.0
+    scale = scale if scale > 0 else 1.0
+    z = np.where(valid, (values - center) / scale, 0.0)
+
+    sums = np.zeros((5, len(values) + 1))
+    z2 = z * z
+    np.cumsum(valid, out=sums[0, 1:])
+    np.cumsum(z, out=sums[1, 1:])
+    np.cumsum(z2, out=sums[2, 1:])
+    np.cumsum(z2 * z, out=sums[3, 1:])
+    np.cumsum(z2 * z2, out=sums[4, 1:])
+    return sums, center, scale
+
+def _window_moments(sums, center, scale, start, end):
+    """Count, mean and central moment sums (m2, m3, m4) for each [start, end) window"""
+    n, s1, s2, s3, s4 = sums[:, end] - sums[:, start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mu = s1 / n
+        m2 = s2 - s1 * mu
+        m3 = s3 - 3 * mu * s2 + 2 * mu ** 2 * s1
+        m4 = s4 - 4 * mu * s3 + 6 * mu ** 2 * s2 - 3 * mu ** 3 * s1
+    # Cancellation can leave tiny negative variances on constant windows
+    m2 = np.maximum(m2, 0.0)
+    return n, center + mu * scale, m2 * scale ** 2, m3 * scale ** 3, m4 * scale ** 4
+
+class _BoundsIndexer(pd.api.indexers.BaseIndexer):
+    """Hands precomputed window bounds to pandas' rolling aggregations"""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None,
+                          step=None):
+        return self.start, self.end
+
+def rolling_risk_metrics(returns, windows=config.ROLLING_WINDOWS, min_periods=None,
+                         risk_free_rate=0.01, periods_per_year=config.ROLLING_PERIODS_PER_YEAR):
+    """Rolling mean, std, annualized volatility, Sharpe, skewness, kurtosis and VaR
+
+    returns: Series (or 'returns' frame) of daily or intraday returns; time windows need
+    a DatetimeIndex. windows mixes counts (21) and offsets ('30D'). Returns a DataFrame
+    with (window, metric) columns; windows with fewer than min_periods observations
+    (default: the window length for count windows, 2 for time windows) are NaN.
+    """
+    if isinstance(returns, pd.DataFrame):
+        returns = returns['returns']
+    values = returns.to_numpy(dtype=np.float64)
+    ts_ns = returns.index.as_unit('ns').asi8 if isinstance(returns.index, pd.DatetimeIndex) else None
+
+    sums, center, scale = _prefix_power_sums(values)
+    series = pd.Series(values)
+    columns = {}
+    for window in windows:
+        if not isinstance(window, (int, np.integer)) and ts_ns is None:
+            raise ValueError(f"Time window {window!r} needs a DatetimeIndex on the returns")
+        start, end = window_bounds(ts_ns if ts_ns is not None else np.empty(len(values)), window)
+        required = min_periods or (int(window) if isinstance(window, (int, np.integer)) else 2)
+
+        n, mean, m2, m3, m4 = _window_moments(sums, center, scale, start, end)
+        std, skew, kurt, _, _ = moment_statistics(n, m2, m3, m4)
+        volatility = std * np.sqrt(periods_per_year)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sharpe = np.where(volatility > 0,
+                              (mean * periods_per_year - risk_free_rate) / volatility, np.nan)
+
+        # Order statistics per window (skiplist); NaNs are skipped like the moments above
+        indexer = _BoundsIndexer(start=start, end=end)
+        rolling = series.rolling(indexer, min_periods=required)
+        var_95 = rolling.quantile(0.05).to_numpy()
+        var_99 = rolling.quantile(0.01).to_numpy()
+
+        enough = n >= required
+        label = str(window)
+        for metric, value in zip(_ROLLING_METRICS, (n, mean, std, volatility, sharpe, skew,
+                                                    kurt, var_95, var_99)):
+            columns[(label, metric)] = np.where(enough, value, np.nan) if metric != 'count' else n
+
+    result = pd.DataFrame(columns, index=returns.index)
+    result.columns.names = ['window', 'metric']
+    return result
+
+def print_rolling_summary(metrics):
+    """Print the latest value of every rolling metric, one row per window"""
+    latest = metrics.ffill().iloc[-1].unstack('metric')
+    latest = latest.reindex(index=metrics.columns.unique('window'),
+                            columns=metrics.columns.unique('metric'))
+    print("\n--- Rolling Risk Metrics (latest) ---")
+    print(latest.to_string(float_format=lambda v: f"{v:.4f}"))
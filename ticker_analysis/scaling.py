@@ -0,0 +1,84 @@
+"""Price scaling and log transforms."""
+
+import numpy as np
+
+from .config import config
+
+def scale_data(df, buffer_factor=config.SCALER_BUFFER_FACTOR, params_path=None):
+    """Scale the split-adjusted price data"""
+    from .transforms import PriceTransform
+
+    # Range with buffer from a chunked min/max pass, then scale chunk by chunk
+    transform = PriceTransform(buffer_factor=buffer_factor).fit(df['price'])
+    scaled_data = transform.transform(df['price']).reshape(-1, 1)
+    scaler = transform.to_sklearn()
+    if params_path:
+        transform.save(params_path)
+
+    # Print summary
+    feature_range = transform.feature_range
+    print("\nScaling Summary:")
+    print(f"Original price range: {transform.data_min:.2f} to {transform.data_max:.2f}")
+    print(f"Buffer range: {feature_range[0]:.2f} to {feature_range[1]:.2f}")
+    print(f"Scaled range: {scaled_data.min():.4f} to {scaled_data.max():.4f}")
+
+    return scaled_data, scaler
+
+def scale_log_data(df, buffer_factor=config.SCALER_BUFFER_FACTOR, log_base=config.LOG_BASE,
+                   epsilon=config.LOG_EPSILON, dtype='float64', out_path=None, params_path=None):
+    """Log transform and scale the price data in one fused chunked pass
+
+    Same values as scale_data(log_transform_data(df)) without the intermediate frame
+    and column; out_path writes the result to a memory-mapped .npy instead of RAM.
+    """
+    from .transforms import PriceTransform
+
+    transform = PriceTransform(log=True, log_base=log_base, epsilon=epsilon,
+                               buffer_factor=buffer_factor, dtype=dtype).fit(df['price'])
+    scaled_data = transform.transform(df['price'], out_path=out_path).reshape(-1, 1)
+    if params_path:
+        transform.save(params_path)
+
+    feature_range = transform.feature_range
+    print("\nLog Scaling Summary:")
+    print(f"Original price range: {transform.data_min:.2f} to {transform.data_max:.2f}")
+    print(f"Log buffer range: {feature_range[0]:.4f} to {feature_range[1]:.4f}")
+    print(f"Scaled range: {scaled_data.min():.4f} to {scaled_data.max():.4f}")
+
+    return scaled_data, transform
+
+def verify_scaling(scaler):
+    """Verify scaler with sample points"""
+    # Test standard scaling points
+    sample_points = np.asarray(config.SAMPLE_SCALE_POINTS)
+    sample_restored = scaler.inverse_transform(sample_points)
+
+    print("Standard Scale Test:")
+    for scale, orig in zip(sample_points.flatten(), sample_restored.flatten()):
+        print(f"Scaled {scale:.4f} -> Original {orig:.4f}")
+
+    # Test specific price points
+    test_prices = np.asarray(config.TEST_PRICE_POINTS)
+    scaled = scaler.transform(test_prices)
+    restored = scaler.inverse_transform(scaled)
+
+    print("\nPrice Point Test:")
+    for orig, scale, rest in zip(test_prices.flatten(), scaled.flatten(), restored.flatten()):
+        print(f"Original {orig:.2f} -> Scaled {scale:.4f} -> Restored {orig:.2f}")
+
+def log_transform_data(df, log_base=config.LOG_BASE, epsilon=config.LOG_EPSILON):
+    """Log transform the split-adjusted price data"""
+    from .features import cached_log_prices
+
+    # Log prices are shared with the log visualizations through the feature cache
+    log_data = cached_log_prices(df, log_base, epsilon)
+
+    # New DataFrame with log prices (other columns are shared, not copied)
+    df_logged = df.assign(price=log_data)
+
+    # Print summary
+    print("\nLog Transform Summary:")
+    print(f"Original price range: {df['price'].min():.2f} to {df['price'].max():.2f}")
+    print(f"Log price range: {log_data.min():.4f} to {log_data.max():.4f}")
+
+    return df_logged
@@ -0,0 +1,298 @@
+"""Long-lived local analysis server over resident, split-adjusted tick arrays.
+
+The ticks are loaded and adjusted once. After that the server keeps only the sorted
+ts_event, price and size arrays, the session-day closes and a min/max downsampling
+pyramid, and answers HTTP GET queries with JSON:
+
+- /bars: OHLCV bars of any frequency;
+- /stats: daily returns statistics over a date window;
+- /series: a downsampled price series for plotting;
+- /info: the resident data.
+
+Windows are located by binary search on the sorted timestamps. Full-history bars are
+built once per frequency and memoized in the feature cache, so repeated queries take
+milliseconds. Connections are served concurrently by asyncio, and queries run on
+worker threads. A cold bar build holds a lock for its own frequency only, so it does
+not stall queries for other frequencies or other routes. Only the standard
+library is used (asyncio streams for the server, urllib for query_server), and the
+server binds to Config.SERVER_HOST (localhost) by default.
+"""
+
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+
+from .config import config, error_msgs
+from .time_index import to_epoch_ns
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+def _json_values(values):
+    """List of an array's values for JSON, with NaN as null"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        return np.where(np.isnan(values), None, values.astype(object)).tolist()
+    return values.tolist()
+
+def _iso(ts_ns):
+    """ISO-8601 strings for int64 epoch ns"""
+    return np.datetime_as_string(np.asarray(ts_ns, dtype=np.int64).view('datetime64[ns]'),
+                                 unit='ns').tolist()
+
+class TickStore:
+    """Resident, time-sorted tick arrays with windowed bar, stats and series queries"""
+
+    def __init__(self, ts_ns, price, size=None):
+        self.ts_ns = np.asarray(ts_ns, dtype=np.int64)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.size = np.zeros(len(self.price)) if size is None else \
+            np.asarray(size, dtype=np.float64)
+        if len(self.ts_ns) and np.any(self.ts_ns[1:] < self.ts_ns[:-1]):
+            raise ValueError(error_msgs.UNSORTED_TICKS)
+        # One lock per bar frequency, so concurrent cold builds of a frequency run once
+        self._lock = threading.Lock()
+        self._bar_locks = {}
+
+        from .bars import bar_arrays, bar_index
+        from .downsampling import DownsamplePyramid
+        from .features import data_fingerprint
+
+        # The resident arrays never change, so they are hashed for the cache key once
+        self._fingerprint = ''.join(data_fingerprint(values)
+                                    for values in (self.ts_ns, self.price, self.size))
+
+        daily = bar_arrays(self.ts_ns, self.price, self.size, config.DAILY_BAR_FREQ)
+        self.dates = bar_index(daily['bucket'], config.DAILY_BAR_FREQ).asi8
+        close = daily['close']
+        self.daily_returns = np.append(np.nan, close[1:] / close[:-1] - 1)
+        self.pyramid = DownsamplePyramid(self.ts_ns, self.price)
+
+    @classmethod
+    def from_frame(cls, df, trades_only=config.BARS_TRADES_ONLY):
+        """Store over a split-adjusted ts-indexed frame or TickFrame"""
+        from .bars import _frame_arrays
+
+        return cls(*_frame_arrays(df, trades_only=trades_only))
+
+    def __len__(self):
+        return len(self.ts_ns)
+
+    def _window(self, values, start, end):
+        """[lo, hi) positions of sorted epoch ns values within [start, end]"""
+        start, end = to_epoch_ns(start), to_epoch_ns(end)
+        lo = 0 if start is None else int(np.searchsorted(values, start, side='left'))
+        hi = len(values) if end is None else int(np.searchsorted(values, end, side='right'))
+        return lo, max(hi, lo)
+
+    def info(self):
+        """Rows, time range and memory of the resident data"""
+        nbytes = self.ts_ns.nbytes + self.price.nbytes + self.size.nbytes
+        return {
+            'rows': len(self),
+            'start': _iso(self.ts_ns[:1])[0] if len(self) else None,
+            'end': _iso(self.ts_ns[-1:])[0] if len(self) else None,
+            'days': len(self.dates),
+            'resident_mib': round(nbytes / 2**20, 1),
+        }
+
+    def bars(self, freq='1min', start=None, end=None, limit=config.SERVER_MAX_ROWS):
+        """OHLCV bars starting within [start, end], cut from memoized full-history bars"""
+        from .bars import bar_arrays, bars_to_frame
+        from .features import feature_cache
+
+        with self._lock:
+            lock = self._bar_locks.setdefault(freq, threading.Lock())
+        with lock:
+            bars = feature_cache.get_or_compute(
+                'server_bars', self.ts_ns, dict(freq=freq),
+                lambda: bars_to_frame(bar_arrays(self.ts_ns, self.price, self.size, freq), freq),
+                fingerprint=self._fingerprint)
+        starts = bars.index.asi8
+        lo, hi = self._window(starts, start, end)
+        limit = int(limit)
+        if hi - lo > limit:
+            raise ValueError(error_msgs.SERVER_TOO_MANY_ROWS.format(hi - lo, limit))
+        window = bars.iloc[lo:hi]
+        payload = {'freq': freq, 'ts': _iso(starts[lo:hi])}
+        payload.update({name: _json_values(window[name].to_numpy()) for name in window.columns})
+        return payload
+
+    def stats(self, start=None, end=None, risk_free_rate=0.01):
+        """analyze_returns_statistics metrics for the session days within [start, end]"""
+        from .bootstrap import replicate_metrics
+        from .online_stats import moment_statistics
+
+        lo, hi = self._window(self.dates, start, end)
+        returns = self.daily_returns[lo:hi]
+        returns = returns[~np.isnan(returns)]
+        payload = {'days': len(returns), 'start': _iso(self.dates[lo:lo + 1])[0] if hi > lo
+                   else None, 'end': _iso(self.dates[hi - 1:hi])[0] if hi > lo else None}
+        if len(returns) < 2:
+            return payload
+
+        metrics = replicate_metrics(returns[None, :], float(risk_free_rate))
+        payload.update({name: float(values[0]) for name, values in metrics.items()})
+        dev = returns - returns.mean()
+        _, _, _, jb_stat, jb_pvalue = moment_statistics(
+            len(returns), (dev ** 2).sum(), (dev ** 3).sum(), (dev ** 4).sum())
+        payload.update({
+            'Median (%)': float(np.median(returns)) * 100,
+            'Min (%)': float(returns.min()) * 100,
+            'Max (%)': float(returns.max()) * 100,
+            'Positive Days (%)': float((returns > 0).mean()) * 100,
+            'Negative Days (%)': float((returns < 0).mean()) * 100,
+            'JB Statistic': float(jb_stat),
+            'P-value': float(jb_pvalue),
+        })
+        return {name: (None if isinstance(value, float) and np.isnan(value) else value)
+                for name, value in payload.items()}
+
+    def series(self, start=None, end=None, points=config.DOWNSAMPLE_TARGET_POINTS):
+        """Min/max-downsampled prices over [start, end] from the pyramid"""
+        points = min(int(points), config.SERVER_MAX_ROWS)
+        positions = self.pyramid.view_indices(to_epoch_ns(start), to_epoch_ns(end), points)
+        return {'ts': _iso(self.ts_ns[positions]), 'price': _json_values(self.price[positions])}
+
+class AnalysisServer:
+    """asyncio HTTP/1.1 server answering JSON GET queries against a TickStore
+
+    Routes: /info, /bars?freq=&start=&end=, /stats?start=&end=, /series?start=&end=&points=.
+    Use serve_forever() to block, or start_in_thread() to serve from a notebook or test.
+    """
+
+    def __init__(self, store, host=config.SERVER_HOST, port=config.SERVER_PORT):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.routes = {'/info': store.info, '/bars': store.bars, '/stats': store.stats,
+                       '/series': store.series}
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        """Bind and start accepting connections (port 0 picks a free port)"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"Serving {len(self.store):,} ticks on http://{self.host}:{self.port}")
+        return self
+
+    async def _serve(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def serve_forever(self):
+        """Serve until interrupted"""
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            pass
+
+    def start_in_thread(self):
+        """Serve from a daemon thread with its own event loop; returns the bound port"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='analysis-server', daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.port
+
+    def stop(self):
+        """Stop a server started with start_in_thread"""
+        if self._loop is None:
+            return
+
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    async def _handle(self, reader, writer):
+        """Answer requests on one keep-alive connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                status, payload = await self._dispatch(request_line.decode('latin-1').split())
+                body = json.dumps(payload, allow_nan=False).encode()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                             f"\r\n".encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request):
+        """(status, JSON payload) for one parsed request line"""
+        if len(request) != 3:
+            return 400, {'error': error_msgs.SERVER_BAD_REQUEST}
+        method, target, _ = request
+        if method != 'GET':
+            return 405, {'error': error_msgs.SERVER_BAD_METHOD.format(method)}
+        url = urlsplit(target)
+        handler = self.routes.get(url.path)
+        if handler is None:
+            return 404, {'error': error_msgs.SERVER_UNKNOWN_ROUTE.format(url.path,
+                                                                        ', '.join(self.routes))}
+        params = dict(parse_qsl(url.query))
+        try:
+            payload = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: handler(**params))
+        except (TypeError, ValueError, KeyError) as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+        return 200, payload
+
+def query_server(route, host=config.SERVER_HOST, port=config.SERVER_PORT, timeout=30,
+                 **params):
+    """GET one route of a running server and return its decoded JSON (urllib client)"""
+    from urllib.request import urlopen
+
+    query = urlencode({name: value for name, value in params.items() if value is not None})
+    url = f"http://{host}:{port}/{route.lstrip('/')}" + (f"?{query}" if query else '')
+    with urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+def serve_directory(directory_path, host=config.SERVER_HOST, port=config.SERVER_PORT,
+                    engine=config.INGEST_ENGINE, cache_dir=config.CACHE_DIR, row_filter=None,
+                    compact=config.COMPACT_TICKS):
+    """Load and split-adjust a directory once, then serve it until interrupted"""
+    from .pipeline import run_pipeline
+
+    results = run_pipeline(['adjust'], directory_path=directory_path, engine=engine,
+                           cache_dir=cache_dir, row_filter=row_filter, compact=compact)
+    store = TickStore.from_frame(results.pop('df_adjusted'))
+    AnalysisServer(store, host, port).serve_forever()
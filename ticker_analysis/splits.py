@@ -0,0 +1,175 @@
+"""Vectorized stock split adjustment."""
+
+import numpy as np
+
+from ._compat import is_gpu_frame, optional_import
+from .config import config
+from .corporate_actions import _utc_timestamp, get_split_history
+
+def split_adjustment_table(splits):
+    """Sorted split times (int64 UTC ns) and the cumulative factor for each era"""
+    bounds, ratios = [], []
+    for split_date, ratio in sorted(splits, key=lambda s: _utc_timestamp(s[0])):
+        bounds.append(_utc_timestamp(split_date).value)
+        ratios.append(float(ratio))
+
+    # factors[k] applies to rows after k splits: the product of all later ratios
+    factors = np.ones(len(ratios) + 1)
+    if ratios:
+        factors[:-1] = np.cumprod(ratios[::-1])[::-1]
+    return np.array(bounds, dtype=np.int64), factors
+
+def apply_split_factors(ts_ns, price, size=None, splits=None, assume_sorted=True):
+    """Split-adjust price (and size, inversely) in place from int64 ns timestamps
+
+    Works on numpy arrays, or cupy arrays for data that is still on the GPU.
+    """
+    xp = np if isinstance(price, np.ndarray) else optional_import('cupy')
+    bounds, factors = split_adjustment_table(get_split_history() if splits is None else splits)
+    if not len(bounds):
+        return price, size
+
+    if assume_sorted:
+        # One binary search per split, then a slice-wise multiply per era
+        edges = [0] + [int(i) for i in xp.searchsorted(ts_ns, xp.asarray(bounds), side='left')]
+        edges.append(len(price))
+        for era, factor in enumerate(factors):
+            lo, hi = edges[era], edges[era + 1]
+            if factor == 1.0 or lo == hi:
+                continue
+            price[lo:hi] /= factor
+            if size is not None:
+                if np.issubdtype(size.dtype, np.integer):
+                    size[lo:hi] = xp.rint(size[lo:hi] * factor).astype(size.dtype)
+                else:
+                    size[lo:hi] *= factor
+    else:
+        era_factor = xp.asarray(factors)[xp.searchsorted(xp.asarray(bounds), ts_ns, side='right')]
+        price /= era_factor
+        if size is not None:
+            size[:] = (xp.rint(size * era_factor) if np.issubdtype(size.dtype, np.integer)
+                       else size * era_factor).astype(size.dtype)
+    return price, size
+
+def adjust_tick_frame(ticks, splits=None, price_dtype=config.TICK_PRICE_DTYPE,
+                      price_scale=config.TICK_PRICE_SCALE, block_rows=config.COMPACT_BLOCK_ROWS):
+    """Split-adjusted copy of a TickFrame, prices encoded straight into price_dtype
+
+    Prices and sizes are adjusted block_rows at a time into their final encodings, so
+    no full-width float64 price column is allocated; sizes are re-narrowed to the width
+    the adjusted values need. The other columns are shared with ticks.
+    """
+    from .ticks import TickFrame, encode_price, narrow_int_dtype
+
+    bounds, factors = split_adjustment_table(get_split_history() if splits is None else splits)
+    ts_ns = ticks.index.asi8
+    arrays, encodings = ticks.arrays, ticks.encodings
+    n = len(ticks)
+
+    price_kind, price_meta = encodings['price']
+    source_price = arrays['price']
+    empty, encodings['price'] = encode_price(np.empty(0), price_dtype, price_scale)
+    price = np.empty(n, dtype=empty.dtype)
+    source_size = arrays.get('size')
+    if source_size is not None:
+        size_dtype = source_size.dtype
+        if size_dtype.kind in 'iu' and n:
+            size_dtype = narrow_int_dtype(np.array(
+                [int(source_size.min()), int(np.ceil(int(source_size.max()) * factors.max()))]))
+        size = np.empty(n, dtype=size_dtype)
+
+    for lo in range(0, n, block_rows):
+        hi = min(lo + block_rows, n)
+        factor = factors[np.searchsorted(bounds, ts_ns[lo:hi], side='right')]
+        block = source_price[lo:hi] / price_meta if price_kind == 'fixed' else \
+            source_price[lo:hi].astype(np.float64)
+        price[lo:hi] = encode_price(block / factor, price_dtype, price_scale)[0]
+        if source_size is not None:
+            adjusted = source_size[lo:hi] * factor
+            size[lo:hi] = np.rint(adjusted) if size.dtype.kind in 'iu' else adjusted
+
+    arrays['price'] = price
+    if source_size is not None:
+        arrays['size'] = size
+    return TickFrame(ticks.index, arrays, encodings)
+
+def adjust_for_splits(df, splits=None, price_dtype=None, to_pandas=True,
+                      compact=config.COMPACT_TICKS):
+    """Adjust price data for stock splits (and trade sizes inversely)
+
+    With compact, returns a TickFrame (narrow struct-of-arrays encodings) rather than
+    a DataFrame; price_dtype then defaults to Config.TICK_PRICE_DTYPE. A frame is
+    encoded one column at a time and dropped, so when the caller holds no other
+    reference to df (as the pipeline does) its memory is released while the TickFrame
+    is built; the adjusted prices are then encoded block by block (adjust_tick_frame).
+    A TickFrame df (from the compact loader) is adjusted that way directly.
+    """
+    from .ticks import TickFrame
+
+    if isinstance(df, TickFrame):
+        return _adjusted_ticks(df, splits, price_dtype)
+
+    # Sort once, on the GPU when the data is still in cuDF; skip it if already ordered
+    if not df['ts_event'].is_monotonic_increasing:
+        adjusted_df = df.sort_values('ts_event')
+    else:
+        adjusted_df = df.copy(deep=False)
+    del df
+
+    on_gpu = is_gpu_frame(adjusted_df)
+    if compact:
+        if on_gpu:
+            # Strings leave the GPU as categoricals rather than Python objects
+            for col in adjusted_df.columns:
+                if adjusted_df[col].dtype == 'object':
+                    adjusted_df[col] = adjusted_df[col].astype('category')
+            adjusted_df = adjusted_df.to_pandas()
+        # Encoded as is (prices still float64), then adjusted into the final encodings
+        ticks = TickFrame.from_frame(adjusted_df, price_dtype='float64', consume=True)
+        del adjusted_df
+        return _adjusted_ticks(ticks, splits, price_dtype)
+
+    # Adjust fresh copies of just the price and size columns
+    price_dtype = price_dtype or adjusted_df['price'].dtype
+    has_size = 'size' in adjusted_df.columns
+    if on_gpu:
+        ts_ns = adjusted_df['ts_event'].values.view('int64')
+        price = adjusted_df['price'].values.astype(price_dtype)
+        size = adjusted_df['size'].values.copy() if has_size else None
+    else:
+        ts_ns = adjusted_df['ts_event'].to_numpy().view('int64')
+        price = adjusted_df['price'].to_numpy(dtype=price_dtype, copy=True)
+        size = adjusted_df['size'].to_numpy(copy=True) if has_size else None
+    apply_split_factors(ts_ns, price, size, splits)
+    adjusted_df['price'] = price
+    if size is not None:
+        adjusted_df['size'] = size
+
+    if on_gpu and not to_pandas:
+        return adjusted_df
+
+    # Convert to pandas for easier timezone handling (the CPU engine is already pandas)
+    if on_gpu:
+        adjusted_df = adjusted_df.to_pandas()
+    adjusted_df = adjusted_df.set_index('ts_event')
+
+    # Localize timezone if needed
+    if adjusted_df.index.tz is None:
+        adjusted_df.index = adjusted_df.index.tz_localize('UTC')
+
+    _print_adjustment_summary(adjusted_df)
+    return adjusted_df
+
+def _adjusted_ticks(ticks, splits, price_dtype):
+    """adjust_tick_frame with Config.TICK_PRICE_DTYPE by default, and its summaries"""
+    ticks = adjust_tick_frame(ticks, splits, price_dtype or config.TICK_PRICE_DTYPE)
+    n_bytes = int(ticks.memory_usage().sum())
+    print(f"\nCompact ticks: {n_bytes / 2**20:,.1f} MiB "
+          f"({n_bytes / max(len(ticks), 1):.1f} bytes/row)")
+    _print_adjustment_summary(ticks)
+    return ticks
+
+def _print_adjustment_summary(adjusted_df):
+    print("\nSplit Adjustment Summary:")
+    print(f"Time range: {adjusted_df.index.min()} to {adjusted_df.index.max()}")
+    print(f"Price range: {adjusted_df['price'].min():.2f} to {adjusted_df['price'].max():.2f}")
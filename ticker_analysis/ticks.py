@@ -0,0 +1,276 @@
+"""Compact struct-of-arrays tick container that the analysis functions accept like a frame.
+
+TickFrame keeps one numpy array per column, each in the narrowest encoding that fits:
+- low-cardinality text (action, side, symbol) as int8/int16 categorical codes;
+- integers narrowed to the smallest width holding their range;
+- columns holding a single value as a zero-stride view, which costs one element;
+- ts_recv as a narrow offset from ts_event;
+- prices as float32 or fixed-point int64.
+Columns are decoded to pandas objects only when read, as zero-copy views where the
+encoding allows. Analysis code that reads df['col'], df.index, df.columns, df.iloc
+and boolean masks therefore runs unchanged.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import config, error_msgs
+
+def narrow_int_dtype(values):
+    """Smallest integer dtype that holds every value of an integer array"""
+    if not len(values):
+        return values.dtype
+    lo, hi = int(values.min()), int(values.max())
+    kinds = (np.uint8, np.uint16, np.uint32, np.uint64) if lo >= 0 else \
+        (np.int8, np.int16, np.int32, np.int64)
+    for dtype in kinds:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return values.dtype
+
+def _constant_or(values):
+    """A zero-stride view when every value is the same, else the array itself"""
+    if len(values) > 1 and (values == values[0]).all():
+        # Of a one-element copy, so the full array can be released
+        return np.broadcast_to(values[:1].copy(), values.shape)
+    return values
+
+def encode_price(price, price_dtype=config.TICK_PRICE_DTYPE, price_scale=config.TICK_PRICE_SCALE):
+    """Prices in a TickFrame price encoding: (encoded array, encoding)"""
+    if price_dtype == 'fixed':
+        return np.rint(price * price_scale).astype(np.int64), ('fixed', price_scale)
+    if price_dtype in ('float32', 'float64'):
+        return price.astype(price_dtype, copy=False), ('plain', None)
+    raise ValueError(error_msgs.INVALID_PRICE_DTYPE.format(price_dtype))
+
+def _stored_bytes(values):
+    """Memory actually held by an encoded array (one element for zero-stride views)"""
+    if values.ndim and values.strides[0] == 0:
+        return values.itemsize
+    return values.nbytes
+
+class _ILocIndexer:
+    def __init__(self, frame):
+        self._frame = frame
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._frame.take(np.arange(len(self._frame))[key])
+        return self._frame.take(key)
+
+class TickFrame:
+    """Struct-of-arrays ticks indexed by ts_event (UTC) with compact column encodings
+
+    ts_ns: sorted int64 epoch ns of ts_event, or the UTC DatetimeIndex over them.
+    arrays: name -> encoded numpy array.
+    encodings: name -> ('category', categories), ('ts_offset', None),
+    ('fixed', scale) or ('plain', None).
+    """
+
+    def __init__(self, ts_ns, arrays, encodings):
+        if not isinstance(ts_ns, pd.DatetimeIndex):
+            # Built once per frame: pandas copies the values to attach the time zone
+            ts_ns = pd.DatetimeIndex(np.asarray(ts_ns).view('datetime64[ns]'),
+                                     dtype=pd.DatetimeTZDtype('ns', 'UTC'), copy=False,
+                                     name='ts_event')
+        self._index = ts_ns
+        self._ts_ns = ts_ns.asi8
+        self._arrays = dict(arrays)
+        self._encodings = dict(encodings)
+        self.iloc = _ILocIndexer(self)
+
+    @classmethod
+    def from_frame(cls, df, price_dtype=config.TICK_PRICE_DTYPE,
+                   price_scale=config.TICK_PRICE_SCALE, consume=False):
+        """Encode a loader or split-adjusted frame (ts_event column or index)
+
+        price_dtype: 'float32' (7 significant digits), 'fixed' (int64 multiples of
+        1 / price_scale) or 'float64'. consume drops each column from df as soon as it
+        is encoded, so a frame nothing else references is released column by column
+        and peak memory stays near one frame instead of the frame plus its encoding.
+        """
+        if 'ts_event' in df.columns:
+            ts_event = df['ts_event']
+            names = [name for name in df.columns if name != 'ts_event']
+        else:
+            ts_event = df.index
+            names = list(df.columns)
+        ts_ns = pd.DatetimeIndex(ts_event).as_unit('ns').asi8
+        if len(ts_ns) and np.any(ts_ns[1:] < ts_ns[:-1]):
+            raise ValueError(error_msgs.UNSORTED_TICKS)
+
+        arrays, encodings = {}, {}
+        if consume and 'ts_event' in df.columns:
+            del df['ts_event']
+        for name in names:
+            column = df.pop(name) if consume else df[name]
+            if name == 'price':
+                arrays[name], encodings[name] = encode_price(
+                    column.to_numpy(dtype=np.float64), price_dtype, price_scale)
+            elif column.dtype.kind == 'M':
+                # Timestamps other than ts_event are stored as an offset from it
+                offset = pd.DatetimeIndex(column).as_unit('ns').asi8 - ts_ns
+                arrays[name] = _constant_or(offset.astype(narrow_int_dtype(offset)))
+                encodings[name] = ('ts_offset', column.dt.tz)
+            elif column.dtype.kind in 'iub':
+                values = column.to_numpy()
+                if values.dtype.kind != 'b':
+                    values = values.astype(narrow_int_dtype(values), copy=False)
+                arrays[name], encodings[name] = _constant_or(values), ('plain', None)
+            elif column.dtype.kind == 'f':
+                arrays[name], encodings[name] = _constant_or(column.to_numpy()), ('plain', None)
+            else:
+                # Text and categoricals: signed codes (-1 is missing), as pandas stores them
+                categorical = pd.Categorical(column)
+                codes = categorical.codes
+                arrays[name] = _constant_or(codes.astype(narrow_int_dtype(
+                    np.array([-1, len(categorical.categories)])), copy=False))
+                encodings[name] = ('category', categorical.categories)
+            del column
+        return cls(ts_ns, arrays, encodings)
+
+    @classmethod
+    def from_encoded(cls, ts_ns, arrays, encodings):
+        """TickFrame over arrays already in their encodings (the compact loader's columns)
+
+        Rows are put in ts_ns order, one column at a time, when they are not in it
+        already, and single-valued columns are stored as one element. arrays is
+        updated in place, so its original arrays can be released as that happens.
+        """
+        order = None
+        if len(ts_ns) and np.any(ts_ns[1:] < ts_ns[:-1]):
+            order = np.argsort(ts_ns, kind='stable')
+            ts_ns = ts_ns[order]
+        for name in list(arrays):
+            values = arrays[name] if order is None else arrays[name][order]
+            arrays[name] = _constant_or(values)
+        return cls(ts_ns, arrays, encodings)
+
+    def __len__(self):
+        return len(self._ts_ns)
+
+    @property
+    def shape(self):
+        return len(self), len(self._arrays)
+
+    @property
+    def columns(self):
+        return pd.Index(list(self._arrays))
+
+    @property
+    def index(self):
+        """ts_event as a UTC DatetimeIndex (shared, not rebuilt per access)"""
+        return self._index
+
+    @property
+    def arrays(self):
+        """The encoded column arrays by name (read-only views)"""
+        return {name: _readonly(values) for name, values in self._arrays.items()}
+
+    @property
+    def encodings(self):
+        """The encoding of every column by name (see the class docstring)"""
+        return dict(self._encodings)
+
+    @property
+    def dtypes(self):
+        return pd.Series({name: self._decoded_dtype(name) for name in self._arrays},
+                         dtype=object)
+
+    def _decoded_dtype(self, name):
+        kind, meta = self._encodings[name]
+        if kind == 'category':
+            return pd.CategoricalDtype(meta)
+        if kind == 'ts_offset':
+            return np.dtype('datetime64[ns]') if meta is None else pd.DatetimeTZDtype('ns', meta)
+        if kind == 'fixed':
+            return np.dtype(np.float64)
+        return self._arrays[name].dtype
+
+    def _decode(self, name):
+        values = self._arrays[name]
+        kind, meta = self._encodings[name]
+        if kind == 'category':
+            if values.strides[0] == 0:
+                values = np.ascontiguousarray(values)
+            return pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(meta))
+        if kind == 'ts_offset':
+            ts = (self._ts_ns + values).view('datetime64[ns]')
+            return ts if meta is None else pd.DatetimeIndex(ts, tz=meta).array
+        if kind == 'fixed':
+            return values / meta
+        return _readonly(values)
+
+    def __contains__(self, name):
+        return name in self._arrays
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._arrays:
+                raise KeyError(key)
+            return pd.Series(self._decode(key), index=self.index, name=key, copy=False)
+        if isinstance(key, list) and all(isinstance(name, str) for name in key):
+            missing = [name for name in key if name not in self._arrays]
+            if missing:
+                raise KeyError(missing)
+            return TickFrame(self._index, {name: self._arrays[name] for name in key},
+                             {name: self._encodings[name] for name in key})
+        mask = np.asarray(key)
+        if mask.dtype != bool:
+            raise KeyError(key)
+        return self.take(np.flatnonzero(mask))
+
+    def take(self, indices):
+        """Rows at integer positions, still encoded"""
+        indices = np.asarray(indices)
+        n = len(self._ts_ns[indices])
+        arrays = {name: (np.broadcast_to(values[:1], (n,)) if values.strides[0] == 0
+                         else values[indices])
+                  for name, values in self._arrays.items()}
+        return TickFrame(self._ts_ns[indices], arrays, self._encodings)
+
+    def assign(self, **columns):
+        """New TickFrame sharing every column except the assigned ones"""
+        arrays, encodings = dict(self._arrays), dict(self._encodings)
+        for name, values in columns.items():
+            values = np.asarray(values.to_numpy() if hasattr(values, 'to_numpy') else values)
+            if len(values) != len(self):
+                raise ValueError(error_msgs.LENGTH_MISMATCH.format(
+                    name, len(values), len(self)))
+            arrays[name], encodings[name] = values, ('plain', None)
+        return TickFrame(self._index, arrays, encodings)
+
+    def memory_usage(self, index=True, deep=False):
+        """Bytes held per column (and by the ts_event index), like DataFrame.memory_usage"""
+        usage = {'Index': self._ts_ns.nbytes} if index else {}
+        usage.update({name: _stored_bytes(values) for name, values in self._arrays.items()})
+        return pd.Series(usage, dtype=np.int64)
+
+    def to_pandas(self):
+        """The equivalent ts_event-indexed DataFrame (decodes every column)"""
+        return pd.DataFrame({name: self._decode(name) for name in self._arrays},
+                            index=self.index, copy=True)
+
+    def __repr__(self):
+        return (f"TickFrame({len(self):,} rows x {len(self._arrays)} columns, "
+                f"{self.memory_usage().sum() / 2**20:,.1f} MiB)")
+
+def _readonly(values):
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+def compact_ticks(df, price_dtype=config.TICK_PRICE_DTYPE, price_scale=config.TICK_PRICE_SCALE,
+                  consume=False):
+    """TickFrame of a frame, with a summary of the column bytes saved
+
+    consume: see TickFrame.from_frame. The process's peak RSS is in the stage metrics.
+    """
+    before = int(df.memory_usage(index=True, deep=True).sum())
+    ticks = TickFrame.from_frame(df, price_dtype=price_dtype, price_scale=price_scale,
+                                 consume=consume)
+    after = int(ticks.memory_usage().sum())
+    print(f"\nCompact ticks: {before / 2**20:,.1f} MiB -> {after / 2**20:,.1f} MiB "
+          f"({before / max(after, 1):.1f}x smaller, {after / max(len(ticks), 1):.1f} bytes/row)")
+    return ticks
@@ -0,0 +1,132 @@
+"""Per-partition time-range index and row filters pushed down into the loaders.
+
+Every cached partition (one source file, one trading date) records its row count,
+min/max ts_event and the distinct rtype/action/symbol values it holds. Loads with a
+row filter skip files and partitions the index rules out, and filter the remaining
+rows in Arrow before anything is converted to numpy.
+"""
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .config import config
+
+# Columns summarized per partition (distinct values) and filterable by value
+SUMMARY_COLUMNS = ('rtype', 'action', 'symbol')
+
+def to_epoch_ns(value):
+    """Epoch ns for an ISO string, Timestamp, datetime64 or int (naive taken as UTC)"""
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    import pandas as pd
+
+    ts = pd.Timestamp(value)
+    return (ts.tz_localize('UTC') if ts.tz is None else ts).value
+
+def make_row_filter(window=None, start=None, end=None, rtypes=None, actions=None,
+                    symbols=None):
+    """Row filter for the loaders, or None when nothing is filtered
+
+    window: 'train' or 'test' for the Config date ranges; start/end (inclusive)
+    override its bounds. rtypes/actions/symbols keep only the listed values.
+    """
+    if window is not None:
+        bounds = {
+            'train': (config.TRAIN_START_DATE, config.TRAIN_END_DATE),
+            'test': (config.TEST_START_DATE, config.TEST_END_DATE),
+        }
+        if window not in bounds:
+            raise ValueError(f"Unknown load window: {window!r} (expected 'train' or 'test')")
+        start = bounds[window][0] if start is None else start
+        end = bounds[window][1] if end is None else end
+
+    row_filter = {
+        'start': to_epoch_ns(start),
+        'end': to_epoch_ns(end),
+        'rtype': None if rtypes is None else sorted(int(r) for r in rtypes),
+        'action': None if actions is None else sorted(str(a) for a in actions),
+        'symbol': None if symbols is None else sorted(str(s) for s in symbols),
+    }
+    if all(value is None for value in row_filter.values()):
+        return None
+    return row_filter
+
+def filter_columns(row_filter):
+    """Columns a row filter needs to read"""
+    if row_filter is None:
+        return []
+    needed = ['ts_event'] if row_filter['start'] is not None or row_filter['end'] is not None else []
+    return needed + [col for col in SUMMARY_COLUMNS if row_filter[col] is not None]
+
+def partition_summary(table):
+    """Index entry for one partition's rows: count, min/max ts_event and distinct values"""
+    summary = {'rows': table.num_rows}
+    ts = table.column('ts_event').cast(pa.int64())
+    bounds = pc.min_max(ts)
+    summary['ts_min'] = bounds['min'].as_py()
+    summary['ts_max'] = bounds['max'].as_py()
+    for col in SUMMARY_COLUMNS:
+        if col in table.column_names:
+            values = pc.unique(table.column(col).combine_chunks())
+            if pa.types.is_dictionary(values.type):
+                values = values.dictionary_decode()
+            summary[col] = sorted(v for v in values.to_pylist() if v is not None)
+    return summary
+
+def partition_matches(summary, row_filter):
+    """False when the partition's index proves no row can pass the filter"""
+    if row_filter is None or summary is None:
+        return True
+    if not summary['rows']:
+        return False
+    if row_filter['start'] is not None and summary['ts_max'] < row_filter['start']:
+        return False
+    if row_filter['end'] is not None and summary['ts_min'] > row_filter['end']:
+        return False
+    for col in SUMMARY_COLUMNS:
+        wanted = row_filter[col]
+        if wanted is not None and col in summary and not set(wanted) & set(summary[col]):
+            return False
+    return True
+
+def filter_table(table, row_filter):
+    """Rows of an Arrow table that pass the filter (the table itself when all do)"""
+    if row_filter is None or not table.num_rows:
+        return table
+    masks = []
+    if row_filter['start'] is not None or row_filter['end'] is not None:
+        ts = table.column('ts_event').cast(pa.int64())
+        if row_filter['start'] is not None:
+            masks.append(pc.greater_equal(ts, row_filter['start']))
+        if row_filter['end'] is not None:
+            masks.append(pc.less_equal(ts, row_filter['end']))
+    for col in SUMMARY_COLUMNS:
+        if row_filter[col] is not None:
+            values = table.column(col)
+            if pa.types.is_dictionary(values.type):
+                values = values.cast(values.type.value_type)
+            masks.append(pc.is_in(values, value_set=pa.array(row_filter[col],
+                                                            type=values.type)))
+    mask = masks[0]
+    for other in masks[1:]:
+        mask = pc.and_(mask, other)
+    if pc.all(mask).as_py():
+        return table
+    return table.filter(mask)
+
+def load_time_index(cache_dir=config.CACHE_DIR):
+    """The partition index of every cached file as a DataFrame (one row per partition)"""
+    import pandas as pd
+
+    from .cache import load_cache_manifest
+
+    rows = []
+    for entry in load_cache_manifest(cache_dir).values():
+        for date, summary in (entry.get('index') or {}).items():
+            rows.append({'source': entry['source'], 'date': date, **summary})
+    index = pd.DataFrame(rows)
+    for col in ('ts_min', 'ts_max'):
+        if col in index:
+            index[col] = pd.to_datetime(index[col], utc=True)
+    return index
@@ -0,0 +1,182 @@
+"""Fixed-format ISO-8601 nanosecond timestamp parsing and ingest latency series.
+
+The feed writes every timestamp as 'YYYY-MM-DDTHH:MM:SS.nnnnnnnnnZ' (30 bytes), so
+parsing needs no format detection: the bytes of n values are an (n, 30) matrix,
+transposed once so each character position is a contiguous row, and every field is
+a few integer multiply-adds over those rows. The civil date is turned into epoch
+days arithmetically. Every field is range checked, so impossible dates and times are
+flagged instead of rolling over. The same code runs on numpy or cupy arrays; the GPU
+loader uses it and hands flagged columns to cudf.to_datetime, and parse_iso_ns hands
+flagged values to Arrow's general parser, which raises on them.
+"""
+
+import numpy as np
+import pyarrow as pa
+
+from .config import config
+
+ISO_NS_WIDTH = 30
+# Byte positions of the separators in 'YYYY-MM-DDTHH:MM:SS.nnnnnnnnnZ'
+_SEPARATORS = {4: '-', 7: '-', 10: 'T', 13: ':', 16: ':', 19: '.', 29: 'Z'}
+_DIGITS = [i for i in range(ISO_NS_WIDTH) if i not in _SEPARATORS]
+# Days per month (index 0 unused); February gains a day in leap years
+_MONTH_DAYS = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+def days_from_civil(year, month, day, xp=np):
+    """Days since 1970-01-01 of proleptic Gregorian dates (vectorized)"""
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + xp.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+def _day_table(y0, y1, xp=np):
+    """Epoch days for every (year - y0) * 416 + month * 32 + day key of years y0..y1"""
+    key = xp.arange((y1 - y0 + 1) * 416, dtype=xp.int32)
+    return days_from_civil(key // 416 + y0, key % 416 // 32, key % 32, xp).astype(xp.int32)
+
+def parse_iso_ns_chars(chars, xp=np, chunk_rows=config.TIMESTAMP_CHUNK_ROWS):
+    """Epoch ns (int64) and a validity mask from an (n, 30) uint8 matrix of timestamp bytes
+
+    Rows that are not exactly 'YYYY-MM-DDTHH:MM:SS.nnnnnnnnnZ', or whose fields are out
+    of range (month 1-12, day within the month, hour < 24, minute and second < 60),
+    are False in the mask and their values are meaningless.
+    """
+    n = len(chars)
+    out = xp.empty(n, dtype=xp.int64)
+    valid = xp.empty(n, dtype=bool)
+    separators = xp.asarray([(ord(c) - ord('0')) % 256 for c in _SEPARATORS.values()],
+                            dtype=xp.uint8)[:, None]
+    month_days = xp.asarray(_MONTH_DAYS, dtype=xp.int32)
+    for start in range(0, n, chunk_rows):
+        # One row per character position, so every step below is a contiguous pass
+        digits = xp.ascontiguousarray((chars[start:start + chunk_rows] - xp.uint8(ord('0'))).T)
+        ok = (digits[list(_SEPARATORS)] == separators).all(axis=0)
+        ok &= digits[_DIGITS].max(axis=0) <= 9
+
+        def number(pos, width):
+            value = digits[pos].astype(xp.int32)
+            for k in range(1, width):
+                value *= 10
+                value += digits[pos + k]
+            return value
+
+        # Impossible dates and times are invalid rather than silently rolled over
+        year, month, day = number(0, 4), number(5, 2), number(8, 2)
+        hour, minute, second = number(11, 2), number(14, 2), number(17, 2)
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        ok &= (month >= 1) & (month <= 12) & (day >= 1)
+        ok &= day <= month_days[xp.clip(month, 0, 12)] + ((month == 2) & leap)
+        ok &= (hour < 24) & (minute < 60) & (second < 60)
+
+        # Few distinct dates per chunk: look epoch days up by (year, month, day) key
+        y0, y1 = int(year.min()), int(year.max())
+        key = (year - y0) * 416 + month * 32 + day
+        if y1 - y0 < 64:
+            table = _day_table(y0, y1, xp)
+            days = table[xp.clip(key, 0, len(table) - 1)]
+        else:
+            days = days_from_civil(year, month, day, xp)
+        seconds = hour * 3600 + minute * 60 + second
+        nanos = number(20, 5).astype(xp.int64) * 10_000 + number(25, 4)
+        end = start + digits.shape[1]
+        out[start:end] = (days.astype(xp.int64) * 86_400 + seconds) * 1_000_000_000 + nanos
+        valid[start:end] = ok
+    return out, valid
+
+def parse_iso_ns(values):
+    """Parse ISO-8601 UTC timestamp strings into a timestamp[ns, UTC] Arrow array
+
+    values: an Arrow string/binary array (or chunked array) or a numpy str/bytes array.
+    Fixed-format values with in-range fields are decoded straight from the string
+    buffer. Every other value (other widths, UTC offsets, nulls, impossible dates or
+    times) goes through Arrow's parser, which keeps nulls and raises ArrowInvalid on
+    anything it cannot parse. Reference implementation for parse_iso_ns_chars; the
+    loaders' CPU path leaves timestamps to Arrow's CSV reader, which is faster there.
+    """
+    ts_type = pa.timestamp('ns', tz='UTC')
+    if isinstance(values, np.ndarray):
+        values = pa.array(values.astype('S') if values.dtype.kind == 'U' else values)
+    if isinstance(values, pa.ChunkedArray):
+        return pa.chunked_array([parse_iso_ns(chunk) for chunk in values.chunks], ts_type)
+    if pa.types.is_large_string(values.type) or pa.types.is_large_binary(values.type):
+        values = values.cast(pa.binary())
+    n = len(values)
+    if not n:
+        return pa.array([], ts_type)
+
+    offsets = np.frombuffer(values.buffers()[1], dtype=np.int32)[values.offset:
+                                                                 values.offset + n + 1]
+    data = np.frombuffer(values.buffers()[2], dtype=np.uint8) if values.buffers()[2] else \
+        np.empty(0, dtype=np.uint8)
+    fixed = np.diff(offsets) == ISO_NS_WIDTH
+    if values.null_count:
+        fixed &= values.is_valid().to_numpy(zero_copy_only=False)
+
+    if fixed.all():
+        # Zero-copy: the value bytes are back to back
+        ts_ns, ok = parse_iso_ns_chars(data[offsets[0]:offsets[-1]].reshape(n, ISO_NS_WIDTH))
+    else:
+        ts_ns, ok = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+        rows = np.flatnonzero(fixed)
+        if len(rows):
+            chars = data[offsets[rows][:, None] + np.arange(ISO_NS_WIDTH)]
+            ts_ns[rows], ok[rows] = parse_iso_ns_chars(chars)
+
+    if ok.all():
+        return pa.array(ts_ns, ts_type)
+    rest = np.flatnonzero(~ok)
+    parsed = values.take(pa.array(rest)).cast(pa.string()).cast(ts_type)
+    ts_ns[rest] = parsed.cast(pa.int64()).fill_null(0).to_numpy(zero_copy_only=False)
+    null = np.zeros(n, dtype=bool)
+    null[rest] = parsed.is_null().to_numpy(zero_copy_only=False)
+    return pa.array(ts_ns, ts_type, mask=null if null.any() else None)
+
+# Columns the loaders add when Config.INGEST_LATENCY is set
+LATENCY_DTYPES = {'latency_ns': 'int64', 'venue_latency_ns': 'int64'}
+LATENCY_INPUTS = ('ts_recv', 'ts_event', 'ts_in_delta')
+
+def latency_columns(ts_recv_ns, ts_event_ns, ts_in_delta):
+    """Ingest latency (int64 ns) per row from the two timestamps and ts_in_delta
+
+    latency_ns is event to capture (ts_recv - ts_event). ts_in_delta is the
+    venue-send to capture delay, so venue_latency_ns = latency_ns - ts_in_delta is
+    event to venue send.
+    """
+    latency = ts_recv_ns - ts_event_ns
+    return {'latency_ns': latency, 'venue_latency_ns': latency - ts_in_delta}
+
+def ingest_latency(df):
+    """Latency series indexed by ts_event: latency_ns, ts_in_delta, venue_latency_ns
+
+    Uses the latency columns when the loader already computed them
+    (Config.INGEST_LATENCY); otherwise derives them from ts_recv, ts_event and
+    ts_in_delta in one vectorized pass.
+    """
+    import pandas as pd
+
+    if 'ts_event' in df.columns:
+        index = pd.DatetimeIndex(df['ts_event'])
+    else:
+        index = df.index
+    index = index.tz_localize('UTC') if index.tz is None else index
+    if 'latency_ns' in df.columns:
+        columns = {name: df[name].to_numpy() for name in ('latency_ns', 'venue_latency_ns')}
+    else:
+        columns = latency_columns(pd.DatetimeIndex(df['ts_recv']).as_unit('ns').asi8,
+                                  index.as_unit('ns').asi8,
+                                  df['ts_in_delta'].to_numpy(dtype=np.int64))
+    columns['ts_in_delta'] = df['ts_in_delta'].to_numpy(dtype=np.int64)
+    return pd.DataFrame(columns, index=index)[['latency_ns', 'ts_in_delta',
+                                               'venue_latency_ns']]
+
+def print_latency_summary(latency, percentiles=(50, 90, 99, 99.9)):
+    """Percentiles of each latency series in microseconds"""
+    print("\nIngest latency (microseconds):")
+    print(f"{'series':<18}" + ''.join(f"{'p' + format(p, 'g'):>10}" for p in percentiles)
+          + f"{'max':>10}")
+    for name in latency.columns:
+        values = latency[name].to_numpy() / 1e3
+        row = np.percentile(values, percentiles) if len(values) else [np.nan] * len(percentiles)
+        print(f"{name:<18}" + ''.join(f"{v:>10.1f}" for v in row)
+              + f"{values.max() if len(values) else np.nan:>10.1f}")
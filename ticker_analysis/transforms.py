@@ -0,0 +1,167 @@
+"""Fused, chunked price transform: epsilon-log, buffered min/max scaling and dtype cast.
+
+fit() needs only the running min/max of the raw prices (the log is monotonic), and
+transform() applies every step in place on one chunk-sized buffer, writing into a
+preallocated array or a memory-mapped .npy file. Peak extra memory is one chunk,
+however long the series. Fitted parameters are saved as JSON and reloaded without
+a refit; the scaling matches scale_data's MinMaxScaler exactly.
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .config import config, error_msgs
+
+def _iter_chunks(source, chunk_rows):
+    """Float64 chunks of a 1-D array-like (array, memmap, Series) or a chunk iterable factory"""
+    if callable(source):
+        for chunk in source():
+            # A copy, since the transform then works in place on it
+            yield np.array(chunk, dtype=np.float64).reshape(-1)
+        return
+    values = source.to_numpy() if hasattr(source, 'to_numpy') else source
+    values = values.reshape(-1)
+    for start in range(0, len(values), chunk_rows):
+        yield np.array(values[start:start + chunk_rows], dtype=np.float64)
+
+class PriceTransform:
+    """log(price + epsilon) / log(base) (optional), then min/max scaling with a buffer"""
+
+    def __init__(self, log=False, log_base=config.LOG_BASE, epsilon=config.LOG_EPSILON,
+                 buffer_factor=config.SCALER_BUFFER_FACTOR, dtype='float64',
+                 chunk_rows=config.TRANSFORM_CHUNK_ROWS):
+        self.log = log
+        self.log_base = log_base
+        self.epsilon = epsilon
+        self.buffer_factor = buffer_factor
+        self.dtype = dtype
+        self.chunk_rows = chunk_rows
+        self.data_min = None
+        self.data_max = None
+        self.n_rows = 0
+
+    def _log_in_place(self, buf):
+        if self.log:
+            np.add(buf, self.epsilon, out=buf)
+            np.log(buf, out=buf)
+            if self.log_base != math.e:
+                np.divide(buf, math.log(self.log_base), out=buf)
+        return buf
+
+    @property
+    def feature_range(self):
+        """Buffered (low, high) of the transformed values that map to 0 and 1"""
+        lo, hi = self._log_in_place(np.array([self.data_min, self.data_max], dtype=np.float64))
+        buffer = (hi - lo) * self.buffer_factor
+        return lo - buffer, hi + buffer
+
+    @property
+    def scale(self):
+        """Multiplier and offset applied after the log (MinMaxScaler's scale_ and min_)"""
+        lo, hi = self.feature_range
+        scale = 1.0 / (hi - lo) if hi > lo else 1.0
+        return scale, -lo * scale
+
+    def fit(self, source):
+        """Running min/max of the raw prices in one pass over the chunks"""
+        data_min, data_max, n_rows = np.inf, -np.inf, 0
+        for chunk in _iter_chunks(source, self.chunk_rows):
+            if len(chunk):
+                data_min = min(data_min, float(chunk.min()))
+                data_max = max(data_max, float(chunk.max()))
+                n_rows += len(chunk)
+        self.data_min, self.data_max, self.n_rows = data_min, data_max, n_rows
+        return self
+
+    def transform(self, source, out=None, out_path=None, n_rows=None):
+        """Transformed values, chunk by chunk, into out, a new .npy memmap, or a new array
+
+        The row count is that of the source being transformed, not of the fitted data.
+        A chunk iterable factory has no length, so it needs n_rows (or out, whose
+        length is used) and must yield exactly that many rows.
+        """
+        if self.data_min is None:
+            raise ValueError("PriceTransform must be fitted (or loaded) before transform")
+        scale, offset = self.scale
+        if not callable(source):
+            n_rows = len(source)
+        elif n_rows is None:
+            if out is None:
+                raise ValueError(error_msgs.TRANSFORM_ROWS_UNKNOWN)
+            n_rows = len(out)
+        if out is None and out_path is not None:
+            Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+            out = np.lib.format.open_memmap(out_path, mode='w+', dtype=self.dtype,
+                                            shape=(n_rows,))
+        elif out is None:
+            out = np.empty(n_rows, dtype=self.dtype)
+
+        start = 0
+        for buf in _iter_chunks(source, self.chunk_rows):
+            if start + len(buf) > n_rows:
+                raise ValueError(error_msgs.TRANSFORM_ROWS_MISMATCH.format(
+                    f"more than {n_rows}", n_rows))
+            # Every step works in place on the chunk buffer
+            self._log_in_place(buf)
+            np.multiply(buf, scale, out=buf)
+            np.add(buf, offset, out=buf)
+            out[start:start + len(buf)] = buf
+            start += len(buf)
+        if start != n_rows:
+            raise ValueError(error_msgs.TRANSFORM_ROWS_MISMATCH.format(start, n_rows))
+        if isinstance(out, np.memmap):
+            out.flush()
+        return out
+
+    def fit_transform(self, source, out=None, out_path=None):
+        """fit then transform (two reads of the source, one written output)"""
+        self.fit(source)
+        return self.transform(source, out=out, out_path=out_path, n_rows=self.n_rows)
+
+    def inverse_transform(self, values):
+        """Back from scaled values to prices"""
+        scale, offset = self.scale
+        values = (np.asarray(values, dtype=np.float64) - offset) / scale
+        if self.log:
+            values = np.power(self.log_base, values) - self.epsilon
+        return values
+
+    def to_sklearn(self):
+        """An equivalent fitted MinMaxScaler over the (log) prices, as scale_data returns"""
+        from sklearn.preprocessing import MinMaxScaler
+
+        lo, hi = self.feature_range
+        return MinMaxScaler(feature_range=(0, 1)).fit(np.array([[lo], [hi]]))
+
+    def params(self):
+        """Fitted parameters as a JSON-serializable dict"""
+        return {
+            'log': self.log, 'log_base': self.log_base, 'epsilon': self.epsilon,
+            'buffer_factor': self.buffer_factor, 'dtype': str(np.dtype(self.dtype)),
+            'data_min': self.data_min, 'data_max': self.data_max, 'n_rows': self.n_rows,
+        }
+
+    def save(self, path):
+        """Persist the fitted parameters (atomic write)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(self.params(), indent=1))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path, chunk_rows=config.TRANSFORM_CHUNK_ROWS):
+        """A fitted transform from saved parameters"""
+        params = json.loads(Path(path).read_text())
+        transform = cls(log=params['log'], log_base=params['log_base'],
+                        epsilon=params['epsilon'], buffer_factor=params['buffer_factor'],
+                        dtype=params['dtype'], chunk_rows=chunk_rows)
+        transform.data_min = params['data_min']
+        transform.data_max = params['data_max']
+        transform.n_rows = params['n_rows']
+        return transform